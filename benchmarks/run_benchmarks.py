@@ -0,0 +1,190 @@
+"""账务、存储和表格热点路径的基准测试
+
+用确定性的合成数据（固定随机种子）生成 N 条交易和资金变动，在 offscreen Qt 平台下计时，
+结果写成 JSON，便于在不同版本之间比较：
+
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000 --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 1000 --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 期货记账软件.core import (  # noqa: E402
+    CapitalManager, TradeRecorder, load_account, save_account
+)
+
+PRODUCTS = ["沪铜", "沪铝", "螺纹", "铁矿", "豆粕", "棉花", "白糖", "甲醇", "原油", "黄金"]
+MULTIPLIERS = [5, 10, 20]
+START_ORDINAL = date(2015, 1, 5).toordinal()
+
+def generate_trades(count, seed=20230801):
+    """生成 count 条确定性的交易记录（字典形式，与 add_trade 的输入一致）"""
+    rng = random.Random(seed)
+    trades = []
+    for index in range(count):
+        ordinal = START_ORDINAL + index * 3650 // max(count, 1)
+        product = PRODUCTS[rng.randrange(len(PRODUCTS))]
+        month = rng.randrange(1, 13)
+        open_price = round(rng.uniform(1000, 80000), 0)
+        close_price = open_price + rng.randint(-200, 200)
+        per_point = MULTIPLIERS[rng.randrange(len(MULTIPLIERS))]
+        open_fee = round(rng.uniform(1, 20), 2)
+        close_fee = round(rng.uniform(1, 20), 2)
+        trades.append({
+            'date': date.fromordinal(ordinal).strftime("%Y-%m-%d"),
+            'name': f"{product}{23 + month // 12:02d}{month:02d}",
+            'open_price': open_price,
+            'close_price': close_price,
+            'profit_per_point': per_point,
+            'open_fee': open_fee,
+            'close_fee': close_fee,
+            'profit': (close_price - open_price) * per_point - open_fee - close_fee,
+        })
+    return trades
+
+def generate_capital(count, seed=20230801):
+    """生成约 count/100 条资金变动（入金为主，少量出金）"""
+    rng = random.Random(seed + 1)
+    capital_manager = CapitalManager()
+    for index in range(max(count // 100, 1)):
+        moment = datetime.fromordinal(START_ORDINAL + index).strftime("%Y-%m-%d %H:%M")
+        if index % 5 == 4:
+            capital_manager.restore_transaction("出金", -round(rng.uniform(100, 5000), 2), moment)
+        else:
+            capital_manager.restore_transaction("入金", round(rng.uniform(1000, 50000), 2), moment)
+    return capital_manager
+
+def timed(results, size, name, func, ops=1):
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        results.append({'size': size, 'name': name, 'error': f"{type(e).__name__}: {e}"})
+        return
+    seconds = time.perf_counter() - start
+    results.append({'size': size, 'name': name, 'seconds': seconds, 'ops': ops,
+                    'per_op_us': seconds / ops * 1e6})
+
+def bench_core(size, results, workdir):
+    trades = generate_trades(size)
+    capital_manager = generate_capital(size)
+    trade_recorder = TradeRecorder()
+
+    def add_trades():
+        for trade in trades:
+            trade_recorder.add_trade(trade)
+    timed(results, size, "TradeRecorder.add_trade", add_trades, ops=size)
+
+    dates = [trade['date'] for trade in trades[::max(size // 1000, 1)]]
+    timed(results, size, "TradeRecorder.calculate_daily_profit",
+          lambda: [trade_recorder.calculate_daily_profit(d) for d in dates], ops=len(dates))
+    timed(results, size, "TradeRecorder.get_daily_profits", trade_recorder.get_daily_profits)
+    timed(results, size, "TradeRecorder.recompute_profits",
+          lambda: trade_recorder.recompute_profits(trade_recorder.select_rows(), 1.0 + 1e-9), ops=size)
+
+    for suffix in (".csv", ".snap"):
+        path = os.path.join(workdir, f"bench_{size}{suffix}")
+        timed(results, size, f"save{suffix}",
+              lambda: save_account(path, capital_manager, trade_recorder))
+        timed(results, size, f"load{suffix}", lambda: load_account(path))
+    return capital_manager, trade_recorder
+
+def bench_gui(size, results, capital_manager, trade_recorder):
+    from PyQt6.QtWidgets import QApplication
+    from 期货记账软件.gui import FuturesAccountingApp
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = FuturesAccountingApp()
+    window.capital_manager = capital_manager
+    window.trade_recorder = trade_recorder
+    # 标签页默认在第一次切换过去时才构建，全部构建后各视图的重绘函数才会真正执行
+    for attr, *_ in window.TABS:
+        window.ensure_tab(attr)
+    # 日历默认显示当前月份，合成数据不在其中；翻到交易日最多的月份再计时
+    if trade_recorder.month_days:
+        year, month = max(trade_recorder.month_days, key=lambda key: len(trade_recorder.month_days[key]))
+        window.calendar.setCurrentPage(year, month)
+    window.show()
+    app.processEvents()
+
+    def run(method):
+        def call():
+            method()
+            app.processEvents()
+        return call
+
+    # 逐个计时 RefreshScheduler 中注册的重绘函数，即界面实际执行的刷新；
+    # 页面不可见时部分视图跳过重绘，所以先切换到视图所在的页面
+    view_tabs = {view: attr for attr, _, _, views in window.TABS for view in views}
+    view_tabs["summary"] = "summary_tab"
+    for view, callback in window.refresh.views():
+        if view in view_tabs:
+            window.tabs.setCurrentWidget(getattr(window, view_tabs[view]))
+            app.processEvents()
+        timed(results, size, f"FuturesAccountingApp.{callback.__name__}", run(callback))
+    # 交易和资金同时变动后的一轮完整刷新（停在汇总页，汇总视图也会重绘）
+    window.mark_trades_changed()
+    window.mark_capital_changed()
+    window.refresh.mark("positions")
+    timed(results, size, "RefreshScheduler.flush", run(window.refresh.flush))
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = {(r['size'], r['name']): r for r in json.load(file)['results'] if 'seconds' in r}
+    print(f"{'size':>9}  {'benchmark':<45}{'old(s)':>10}{'new(s)':>10}{'ratio':>8}")
+    for result in results:
+        old = baseline.get((result['size'], result['name']))
+        if old is None or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        print(f"{result['size']:>9}  {result['name']:<45}{old['seconds']:>10.4f}"
+              f"{result['seconds']:>10.4f}{ratio:>8.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--output", default="bench.json", help="结果 JSON 文件")
+    parser.add_argument("--skip-gui", action="store_true", help="不测界面刷新（无 PyQt6 时使用）")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            capital_manager, trade_recorder = bench_core(size, results, workdir)
+            if not args.skip_gui:
+                bench_gui(size, results, capital_manager, trade_recorder)
+            for result in results:
+                if result['size'] == size:
+                    timing = f"{result['seconds']:.4f}s" if 'seconds' in result else result['error']
+                    print(f"{size:>9}  {result['name']:<45}{timing}")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
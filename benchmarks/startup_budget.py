@@ -0,0 +1,68 @@
+"""冷启动预算检查：多次启动界面到第一轮事件循环，取中位数与预算比较
+
+以 --profile-startup=文件 启动程序，从启动子进程到报告中出现 startup.total 的墙钟时间即一次冷启动
+（打包程序还包括解压和加载 DLL 的时间），超出预算时退出码为 1：
+
+    python benchmarks/startup_budget.py                                    # 源码方式启动
+    python benchmarks/startup_budget.py --exe dist/期货记账软件/期货记账软件.exe --budget 1.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(command, timeout, env):
+    """启动一次，返回 (墙钟秒数, 程序报告的各阶段)"""
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, "startup.txt")
+        started = time.perf_counter()
+        process = subprocess.Popen(command + [f"--profile-startup={report_path}"], cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                if os.path.exists(report_path):
+                    with open(report_path, encoding='utf-8') as file:
+                        report = file.read()
+                    if "startup.total" in report:
+                        return time.perf_counter() - started, report
+                if process.poll() is not None:
+                    raise RuntimeError(f"程序在启动完成前退出，退出码 {process.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError(f"{timeout} 秒内没有完成启动")
+                time.sleep(0.005)
+        finally:
+            process.kill()
+            process.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--exe", help="打包后的程序；默认用当前 Python 以 -m 期货记账软件 启动")
+    parser.add_argument("--budget", type=float, default=1.0, help="冷启动预算（秒），默认 1.0")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--offscreen", action="store_true", help="使用 offscreen Qt 平台（无显示环境）")
+    args = parser.parse_args(argv)
+
+    command = [args.exe] if args.exe else [sys.executable, "-m", "期货记账软件"]
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    timings = []
+    report = ""
+    for _ in range(args.runs):
+        seconds, report = measure(command, args.timeout, env)
+        timings.append(seconds)
+        print(f"{seconds * 1000:8.1f} ms")
+    median = statistics.median(timings)
+    # 最后一次的分阶段耗时，便于看出超出预算的原因
+    print(report.rstrip())
+    print(f"中位数 {median * 1000:.1f} ms，预算 {args.budget * 1000:.0f} ms")
+    return 0 if median <= args.budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""账务核心的测试：只依赖 core 包，不需要 PyQt6"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 期货记账软件.core import CapitalManager, TradeRecorder  # noqa: E402
+
+
+# 一多一空两笔持仓，保存后应原样读回
+OPEN_LOTS = [
+    ("cu2309", 1, "2023-08-03", 68150.0, 2, 6.0),
+    ("rb2310", -1, "2023-08-03", 3690.0, 1, 2.0),
+]
+
+
+def make_trade(date_str, name="cu2309", open_price=68000.0, close_price=68100.0,
+               per_point=5.0, open_fee=3.0, close_fee=3.0):
+    return {
+        'date': date_str, 'name': name, 'open_price': open_price, 'close_price': close_price,
+        'profit_per_point': per_point, 'open_fee': open_fee, 'close_fee': close_fee,
+        'profit': (close_price - open_price) * per_point - open_fee - close_fee,
+    }
+
+
+@pytest.fixture
+def account():
+    """含入金、出金、保证金和三笔交易的账户"""
+    trade_recorder = TradeRecorder()
+    capital_manager = CapitalManager(trade_recorder)
+    capital_manager.restore_transactions([
+        ("入金", 100000.0, "2023-08-01 09:00"),
+        ("出金", -2000.0, "2023-08-02 15:30"),
+        ("保证金", 30000.0, "2023-08-03 10:00"),
+    ])
+    trade_recorder.add_trades([
+        make_trade("2023-08-01"),
+        make_trade("2023-08-02", "rb2310", 3700.0, 3680.0, -10.0, 2.0, 2.0),
+        make_trade("2023-08-03", "沪铜2308", 68200.0, 68000.0, 5.0, 3.0, 3.0),
+    ])
+    return capital_manager, trade_recorder
+
+
+def assert_same_account(left, right):
+    (left_capital, left_trades), (right_capital, right_trades) = left, right
+    assert right_capital.transactions == left_capital.transactions
+    assert right_capital.margin == left_capital.margin
+    assert right_capital.open_lots == left_capital.open_lots
+    assert [dict(trade) for trade in right_trades.trades] == [dict(trade) for trade in left_trades.trades]
+    assert right_trades.get_daily_profits() == left_trades.get_daily_profits()
+    assert right_capital.balance == pytest.approx(left_capital.balance)
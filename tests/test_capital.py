@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from 期货记账软件.core import CapitalManager, TradeRecorder, load_account, save_account
+
+from conftest import make_trade
+
+
+def test_state_at():
+    trade_recorder = TradeRecorder()
+    capital_manager = CapitalManager(trade_recorder)
+    capital_manager.restore_transactions([
+        ("入金", 100.0, "2023-08-01 09:00"),
+        ("入金", 10.0, "2023-08-01 23:59"),
+        ("入金", 1.0, "2023-08-02 00:00"),
+        ("保证金", 50.0, "2023-08-02 10:00"),
+    ])
+    trade_recorder.add_trade(make_trade("2023-08-01"))
+    assert capital_manager.state_at("2023-07-31") == (0.0, 0.0, 0.0, 0.0)
+    # 只给日期时为当日结束，不含次日零点的记录
+    assert capital_manager.state_at("2023-08-01") == (110.0, 494.0, 6.0, 0.0)
+    assert capital_manager.state_at("2023-08-01 09:00") == (100.0, 494.0, 6.0, 0.0)
+    assert capital_manager.state_at("2023-08-02")[::3] == (111.0, 50.0)
+    assert capital_manager.balance_at("2023-08-02 00:00") == 111.0 + 494.0
+    with pytest.raises(ValueError):
+        capital_manager.state_at("2023-08-01 99:99")
+
+
+def test_state_at_across_snapshots():
+    capital_manager = CapitalManager()
+    rng = random.Random(3)
+    records = [("入金", float(rng.randrange(1, 100)), f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 10:00")
+               for _ in range(CapitalManager.SNAPSHOT_INTERVAL * 3)]
+    capital_manager.restore_transactions(records)
+    for moment in ("2023-03-15", "2023-06-30", "2023-12-31"):
+        expected = sum(amount for _, amount, time in records if time[:10] <= moment)
+        assert capital_manager.state_at(moment)[0] == pytest.approx(expected)
+
+
+def test_balance_folds_in_realized_profit():
+    trade_recorder = TradeRecorder()
+    capital_manager = CapitalManager(trade_recorder)
+    capital_manager.restore_transactions([("入金", 1000.0, "2023-08-01 09:00"), ("出金", -100.0, "2023-08-02 09:00")])
+    trade_recorder.add_trade(make_trade("2023-08-02"))
+    assert capital_manager.balance == pytest.approx(900.0 + 494.0)
+    # 出金不能超过含已实现盈亏的总资金
+    assert not capital_manager.withdraw(1400.0) and capital_manager.withdraw(1394.0)
+    assert capital_manager.balance == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".snap", ".db", ".ledger"])
+def test_checkpoints_built_on_load(tmp_path, account, suffix):
+    path = str(tmp_path / f"account{suffix}")
+    save_account(path, *account)
+    capital_manager, _ = load_account(path)
+    # 载入时已建立快照，首次查询不再扫描全部记录
+    assert capital_manager._history_indexed == len(capital_manager.transactions) == 3
+    assert capital_manager.state_at("2023-08-02")[0] == pytest.approx(98000.0)
+
+
+def test_checkpoints_follow_appends_in_any_order():
+    rng = random.Random(9)
+    capital_manager = CapitalManager()
+    records = []
+    for _ in range(6):
+        batch = [(rng.choice(["入金", "出金", "保证金"]), float(rng.randrange(-500, 500)),
+                  f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 10:00")
+                 for _ in range(rng.randrange(100, 700))]
+        if rng.random() < 0.5:
+            capital_manager.restore_transactions(batch)
+        else:
+            for record in batch:
+                capital_manager.restore_transaction(*record)
+        records += batch
+        for moment in ("2023-02-10", "2023-07-01", "2023-12-31"):
+            ordered = sorted((record for record in records if record[2][:10] <= moment), key=lambda record: record[2])
+            margins = [amount for kind, amount, _ in ordered if kind == "保证金"]
+            cash, _, _, margin = capital_manager.state_at(moment)
+            assert cash == pytest.approx(sum(amount for kind, amount, _ in ordered if kind != "保证金"))
+            assert margin == (margins[-1] if margins else 0.0)
@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_core_imports_without_pyqt6():
+    # 把 PyQt6 置为 None 后 import 即失败，core 和命令行都不应依赖它
+    code = ("import sys; sys.modules['PyQt6'] = None\n"
+            "import 期货记账软件.core, 期货记账软件.cli\n"
+            "assert not any(name.startswith('PyQt6.') for name in sys.modules)\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
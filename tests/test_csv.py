@@ -0,0 +1,62 @@
+import csv
+
+import pytest
+
+from 期货记账软件.core import CapitalManager, TradeRecorder, load_account, read_csv, save_account
+from 期货记账软件.core.csv_format import parse_data_rows
+
+from conftest import OPEN_LOTS, assert_same_account
+
+
+def test_round_trip(tmp_path, account):
+    path = str(tmp_path / "account.csv")
+    save_account(path, *account)
+    assert_same_account(account, load_account(path))
+
+
+def test_round_trip_positions(tmp_path, account):
+    account[0].open_lots = list(OPEN_LOTS)
+    path = str(tmp_path / "account.csv")
+    save_account(path, *account)
+    assert load_account(path)[0].open_lots == OPEN_LOTS
+
+
+def test_round_trip_empty_account(tmp_path):
+    path = str(tmp_path / "empty.csv")
+    trade_recorder = TradeRecorder()
+    save_account(path, CapitalManager(trade_recorder), trade_recorder)
+    capital_manager, trade_recorder = load_account(path)
+    assert capital_manager.transactions == [] and len(trade_recorder.trades) == 0
+    assert capital_manager.balance == 0.0
+
+
+def test_load_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_account(str(tmp_path / "missing.csv"))
+
+
+def test_skips_blank_and_unknown_rows(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text('type,data\n\ncapital,"入金,10.0,2023-08-01 09:00"\nnote,whatever\n'
+                    'trade,"2023-08-01,cu2309,68000.0,68100.0,5.0,3.0,3.0,494.0"\n', encoding='utf-8')
+    capital_rows, trades, _ = read_csv(str(path))
+    assert capital_rows == [("入金", 10.0, "2023-08-01 09:00")]
+    assert [(trade['name'], trade['profit']) for trade in trades] == [("cu2309", 494.0)]
+
+
+def test_reads_position_rows(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text('type,data\nposition,"cu2309,-1,2023-08-01,68000.0,2,4.0"\n', encoding='utf-8')
+    assert read_csv(str(path))[2] == [("cu2309", -1, "2023-08-01", 68000.0, 2, 4.0)]
+
+
+def test_rows_parse_in_batches(tmp_path, account):
+    # 后台加载按批解析，分批的结果与整个文件一次解析相同
+    path = str(tmp_path / "account.csv")
+    save_account(path, *account)
+    capital_rows, trades, _ = read_csv(path)
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))[1:]
+    batches = [parse_data_rows(rows[start:start + 2]) for start in range(0, len(rows), 2)]
+    assert [row for batch in batches for row in batch[0]] == capital_rows
+    assert [trade for batch in batches for trade in batch[1]] == trades
@@ -0,0 +1,61 @@
+import pytest
+
+from 期货记账软件.core import (
+    CapitalManager, TradeRecorder, import_into_store, import_statement_into_store, load_account, save_account
+)
+
+from conftest import make_trade
+
+
+def test_trade_dedup_is_a_multiset():
+    trade_recorder = TradeRecorder()
+    trade = make_trade("2023-08-01")
+    trade_recorder.add_trades([trade, trade])
+    # 同一天两笔相同的交易都保留，文件中第三次出现的才是新记录
+    assert trade_recorder.unseen([trade, trade]) == []
+    assert trade_recorder.unseen([trade, trade, trade]) == [trade]
+    # 同一次导入的各批共用 seen
+    seen = {}
+    assert trade_recorder.unseen([trade], seen) == []
+    assert trade_recorder.unseen([trade, trade], seen) == [trade]
+
+
+def test_unseen_indexes_rows_added_later():
+    trade_recorder = TradeRecorder()
+    assert trade_recorder.unseen([make_trade("2023-08-01")]) == [make_trade("2023-08-01")]
+    trade_recorder.add_trade(make_trade("2023-08-01"))
+    assert trade_recorder.unseen([make_trade("2023-08-01")]) == []
+
+
+def test_capital_dedup():
+    capital_manager = CapitalManager()
+    record = ("入金", 100.0, "2023-08-01 09:00")
+    capital_manager.restore_transactions([record])
+    # 金额按数值比较，100 与 100.0 是同一条记录
+    assert capital_manager.unseen([("入金", 100, "2023-08-01 09:00"), record]) == [record]
+
+
+@pytest.mark.parametrize("suffix", [".db", ".ledger"])
+def test_import_into_store_twice(tmp_path, account, suffix):
+    source = str(tmp_path / "source.csv")
+    save_account(source, *account)
+    store_path = str(tmp_path / f"account{suffix}")
+    assert import_into_store(source, store_path) == (3, 3, 0)
+    assert import_into_store(source, store_path) == (0, 0, 6)
+    capital_manager, trade_recorder = load_account(store_path)
+    assert len(capital_manager.transactions) == 3 and len(trade_recorder.trades) == 3
+
+
+@pytest.mark.parametrize("suffix", [".db", ".ledger"])
+def test_statement_into_store_twice(tmp_path, suffix):
+    path = tmp_path / "fills.csv"
+    path.write_text("成交日期,成交时间,合约,买/卖,开平,成交价,手数,手续费\n"
+                    "20230801,09:00:00,cu2309,买,开仓,68000,2,10\n"
+                    "20230801,10:00:00,cu2309,卖,平仓,68100,1,5\n", encoding='utf-8')
+    store_path = str(tmp_path / f"account{suffix}")
+    assert len(import_statement_into_store(str(path), store_path).trades) == 1
+    result = import_statement_into_store(str(path), store_path)
+    assert result.trades == [] and result.duplicates == 2
+    capital_manager, trade_recorder = load_account(store_path)
+    assert len(trade_recorder.trades) == 1
+    assert capital_manager.open_lots == [("cu2309", 1, "2023-08-01", 68000.0, 1, 5.0)]
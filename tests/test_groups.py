@@ -0,0 +1,37 @@
+import pytest
+
+from 期货记账软件.core import TradeRecorder, product_group
+
+from conftest import make_trade
+
+
+def test_product_group_merges_code_and_alias():
+    assert product_group("沪铜2308") == product_group("cu2309") == "cu"
+    assert product_group("xx2309") == "xx"
+
+
+def test_instrument_and_product_totals(account):
+    _, trade_recorder = account
+    assert set(trade_recorder.instrument_stats) == {"cu2309", "rb2310", "沪铜2308"}
+    copper = trade_recorder.product_stats["cu"]
+    assert (copper.count, copper.wins, copper.losses) == (2, 1, 1)
+    assert copper.profit == pytest.approx(494.0 - 1006.0)
+    assert copper.fees == pytest.approx(12.0)
+    assert [product for product, _ in trade_recorder.leaderboard()] == ["rb", "cu"]
+
+
+def test_select_rows_by_product_and_date(account):
+    _, trade_recorder = account
+    assert list(trade_recorder.select_rows("CU")) == list(trade_recorder.select_rows("沪铜")) == [0, 2]
+    assert len(trade_recorder.product_trades("cu")) == 2
+    start = trade_recorder.trades.dates[1]
+    assert list(trade_recorder.select_rows("cu", start_ordinal=start)) == [2]
+    assert list(trade_recorder.select_rows(end_ordinal=start)) == [0, 1]
+    assert list(trade_recorder.select_rows("ag")) == []
+
+
+def test_totals_follow_recompute():
+    trade_recorder = TradeRecorder()
+    trade_recorder.add_trades([make_trade("2023-08-01"), make_trade("2023-08-02")])
+    trade_recorder.recompute_profits([0], multiplier_scale=2.0)
+    assert trade_recorder.instrument_stats["cu2309"].profit == pytest.approx(994.0 + 494.0)
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from 期货记账软件.core import JournalStore, CapitalManager, TradeRecorder, load_account, open_store, save_account
+
+from conftest import OPEN_LOTS, assert_same_account, make_trade
+
+
+def _write_account(path, account):
+    """保存为快照后再追加两笔交易，后两笔只在日志中"""
+    save_account(path, *account)
+    store = open_store(path)
+    store.load_into(CapitalManager(), TradeRecorder())
+    store.add_trades([make_trade("2023-08-04"), make_trade("2023-08-05")])
+    store.close()
+
+
+def test_round_trip(tmp_path, account):
+    path = str(tmp_path / "account.ledger")
+    save_account(path, *account)
+    assert_same_account(account, load_account(path))
+
+
+def test_round_trip_positions(tmp_path, account):
+    account[0].open_lots = list(OPEN_LOTS)
+    path = str(tmp_path / "account.ledger")
+    save_account(path, *account)
+    assert load_account(path)[0].open_lots == OPEN_LOTS
+
+
+def test_refuses_to_overwrite(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    save_account(path, *account)
+    with pytest.raises(ValueError):
+        save_account(path, *account)
+
+
+def test_replay_after_snapshot(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    with open(path, encoding='utf-8') as file:
+        assert sum(line.startswith("trade,") for line in file) == 3
+    assert len(load_account(path)[1].trades) == 5
+
+
+def test_appends_and_updates(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    store = open_store(path)
+    capital_manager, trade_recorder = CapitalManager(), TradeRecorder()
+    capital_manager.trade_recorder = trade_recorder
+    store.load_into(capital_manager, trade_recorder)
+    store.add_capital([("入金", 500.0, "2023-08-05 09:00")])
+    store.set_margin(12000.0)
+    trade_recorder.recompute_profits([0], multiplier_scale=2.0)
+    store.update_trades([0], [trade_recorder.trades[0]])
+    store.close()
+
+    capital_manager, trade_recorder = load_account(path)
+    assert trade_recorder.trades[0]['profit'] == pytest.approx(100.0 * 10.0 - 6.0)
+    assert capital_manager.cash == pytest.approx(98500.0)
+    assert capital_manager.margin == 12000.0
+
+
+def test_torn_tail(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    journal_path = path + ".journal"
+    with open(journal_path, 'ab') as file:
+        file.write(b'3,trade,"2023-08-06,cu2309,680')
+    torn_size = os.path.getsize(journal_path)
+
+    # 只读加载跳过写了一半的行，且不改动文件
+    assert len(load_account(path)[1].trades) == 5
+    assert os.path.getsize(journal_path) == torn_size
+
+    # 以写入方式打开时截掉残行，之后追加的记录不会与其拼在一起
+    store = open_store(path)
+    store.load_into(CapitalManager(), TradeRecorder())
+    store.add_trades([make_trade("2023-08-07")])
+    store.close()
+    trades = load_account(path)[1].trades
+    assert len(trades) == 6 and trades[5]['date'] == "2023-08-07"
+
+
+def test_read_only(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    store = JournalStore(path, read_only=True)
+    store.load_into(CapitalManager(), TradeRecorder())
+    with pytest.raises(ValueError):
+        store.add_trades([make_trade("2023-08-06")])
+    with pytest.raises(ValueError):
+        store.save_from(CapitalManager(), TradeRecorder())
+    store.close()
+
+
+def test_compaction(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    store = open_store(path)
+    store.load_into(CapitalManager(), TradeRecorder())
+    store.compact()
+    store.close()
+
+    assert os.path.getsize(path + ".journal") == 0
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("a.ledger.journal.")]
+    with open(path, encoding='utf-8') as file:
+        assert sum(line.startswith("trade,") for line in file) == 5
+    assert len(load_account(path)[1].trades) == 5
+
+
+def test_positions_survive_replay_and_compaction(tmp_path, account):
+    path = str(tmp_path / "a.ledger")
+    _write_account(path, account)
+    store = open_store(path)
+    capital_manager, trade_recorder = CapitalManager(), TradeRecorder()
+    store.load_into(capital_manager, trade_recorder)
+    capital_manager.open_lots = list(OPEN_LOTS)
+    store.set_positions(capital_manager.open_lots)
+    store.close()
+    # 持仓记录在日志中，重放后读回
+    assert load_account(path)[0].open_lots == OPEN_LOTS
+
+    store = open_store(path)
+    capital_manager, trade_recorder = CapitalManager(), TradeRecorder()
+    store.load_into(capital_manager, trade_recorder)
+    capital_manager.open_lots = OPEN_LOTS[:1]
+    store.set_positions(capital_manager.open_lots)
+    store.compact()
+    store.close()
+    assert os.path.getsize(path + ".journal") == 0
+    assert load_account(path)[0].open_lots == OPEN_LOTS[:1]
@@ -0,0 +1,54 @@
+import random
+from datetime import date
+
+import pytest
+
+from 期货记账软件.core import PerformanceStats, TradeRecorder
+
+from conftest import make_trade
+
+
+def test_online_matches_bulk_and_date_order():
+    rng = random.Random(11)
+    trades = [make_trade(date.fromordinal(738000 + rng.randrange(200)).isoformat(),
+                         close_price=68000.0 + rng.uniform(-50, 50)) for _ in range(500)]
+    online = TradeRecorder()
+    online.add_trades(trades)
+    bulk = TradeRecorder()
+    bulk.trades.extend_rows([tuple(trade[field] for field in bulk.trades.FIELDS) for trade in trades])
+    bulk.rebuild_indexes()
+
+    equity = peak = drawdown = 0.0
+    for trade in sorted(trades, key=lambda trade: trade['date']):
+        equity += trade['profit']
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+    for stats in (online.performance, bulk.performance):
+        assert stats.equity[-1] == pytest.approx(equity)
+        assert stats.max_drawdown == pytest.approx(drawdown)
+    for name in ("count", "wins", "losses", "total_profit", "std", "sharpe", "profit_factor"):
+        assert getattr(online.performance, name) == pytest.approx(getattr(bulk.performance, name))
+
+
+def test_stable_variance():
+    profits = [1e9 + value for value in (4.0, 7.0, 13.0, 16.0)]
+    bulk = PerformanceStats.from_columns(profits, [0, 1, 2, 3], profits)
+    online = PerformanceStats()
+    for ordinal, profit in enumerate(profits):
+        online.add(profit, ordinal, 0.0, True)
+    assert bulk.std == pytest.approx(30.0 ** 0.5) and online.std == pytest.approx(30.0 ** 0.5)
+    assert bulk.sharpe == pytest.approx(online.sharpe) and bulk.sharpe > 0
+
+
+def test_back_dated_trade_after_reading_the_curve():
+    online = PerformanceStats()
+    online.add(100.0, 5, 0.0, True)
+    online.add(-3.0, 3, 0.0, True)
+    # 读取曲线会按日期重排，之后日期仍早于已有最晚日期的交易不能直接追加到末尾
+    assert list(online.equity) == [-3.0, 97.0]
+    online.add(10.0, 4, 0.0, True)
+    bulk = PerformanceStats.from_columns([100.0, -3.0, 10.0], [5, 3, 4], [-3.0, 10.0, 100.0])
+    assert list(online.equity) == list(bulk.equity) == [-3.0, 7.0, 107.0]
+    assert online.max_drawdown == bulk.max_drawdown == 3.0
+    online.add(1.0, 5, 100.0, False)
+    assert list(online.equity) == [-3.0, 7.0, 107.0, 108.0]
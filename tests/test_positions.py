@@ -0,0 +1,97 @@
+import pytest
+
+from 期货记账软件.core import PositionBook, TradeRecorder, unseen_lots
+from 期货记账软件.core.positions import CLOSE_TODAY, CLOSE_YESTERDAY
+
+
+def test_fifo_close_across_lots():
+    book = PositionBook()
+    book.open("2023-08-01", "cu2309", 1, 68000.0, 2, 10.0)
+    book.open("2023-08-02", "cu2309", 1, 68100.0, 2, 10.0)
+    trades, remaining = book.close("2023-08-03", "cu2309", 1, 68200.0, 3, 15.0)
+    assert remaining == 0
+    assert [(trade['open_price'], trade['profit_per_point']) for trade in trades] == [(68000.0, 10.0), (68100.0, 5.0)]
+    # 开仓费按手数分摊到各段，平仓费按本段手数占比分摊
+    assert [trade['open_fee'] for trade in trades] == [10.0, 5.0]
+    assert [trade['close_fee'] for trade in trades] == [10.0, 5.0]
+    assert trades[0]['profit'] == pytest.approx(200.0 * 10.0 - 20.0)
+    assert book.open_lots() == [("cu2309", 1, "2023-08-02", 68100.0, 1, 5.0)]
+
+
+def test_short_positions_and_sides_are_separate():
+    book = PositionBook()
+    book.open("2023-08-01", "rb2310", -1, 3700.0, 1)
+    book.open("2023-08-01", "rb2310", 1, 3690.0, 1)
+    trades, _ = book.close("2023-08-02", "rb2310", -1, 3650.0, 1)
+    assert trades[0]['open_price'] == 3700.0
+    assert trades[0]['profit'] == pytest.approx(50.0 * 10.0)
+    assert book.open_lots() == [("rb2310", 1, "2023-08-01", 3690.0, 1, 0.0)]
+
+
+def test_close_today_and_close_yesterday():
+    book = PositionBook()
+    book.open("2023-08-01", "cu2309", 1, 68000.0, 1)
+    book.open("2023-08-02", "cu2309", 1, 68100.0, 1)
+    trades, _ = book.close("2023-08-02", "cu2309", 1, 68200.0, 1, offset=CLOSE_TODAY)
+    assert trades[0]['open_price'] == 68100.0
+    trades, remaining = book.close("2023-08-02", "cu2309", 1, 68200.0, 2, offset=CLOSE_YESTERDAY)
+    assert [trade['open_price'] for trade in trades] == [68000.0] and remaining == 1
+    assert len(book) == 0
+
+
+def test_unmatched_close_and_invalid_lots():
+    book = PositionBook()
+    trades, remaining = book.close("2023-08-01", "cu2309", 1, 68000.0, 2)
+    assert trades == [] and remaining == 2
+    with pytest.raises(ValueError):
+        book.open("2023-08-01", "cu2309", 1, 68000.0, 0)
+    with pytest.raises(ValueError):
+        book.open("2023-08-01", "unknown2309", 1, 1.0, 1)
+
+
+def test_closes_are_recorded():
+    trade_recorder = TradeRecorder()
+    book = PositionBook(trade_recorder)
+    book.open("2023-08-01", "cu2309", 1, 68000.0, 1)
+    book.close("2023-08-01", "cu2309", 1, 68100.0, 1)
+    assert trade_recorder.calculate_daily_profit("2023-08-01") == pytest.approx(500.0)
+
+
+def test_compaction_keeps_queues():
+    book = PositionBook(multipliers={"xx": 1})
+    count = PositionBook.COMPACT_THRESHOLD * 3
+    for index in range(count):
+        book.open("2023-08-01", "xx2309", 1, float(index), 1, 1.0)
+    trades, _ = book.close("2023-08-02", "xx2309", 1, 0.0, count - 2)
+    assert len(trades) == count - 2
+    # 压缩后只剩未平的两行，队列中的行号随之更新
+    assert len(book.name_ids) == 2 and book._closed == 0
+    trades, _ = book.close("2023-08-02", "xx2309", 1, 0.0, 2)
+    assert [trade['open_price'] for trade in trades] == [count - 2.0, count - 1.0]
+
+
+def test_mark_to_market():
+    book = PositionBook()
+    book.open("2023-08-01", "cu2309", 1, 68000.0, 2)
+    book.open("2023-08-01", "rb2310", -1, 3700.0, 1)
+    assert book.unrealized({"cu2309": 68100.0, "rb2310": 3710.0}) == pytest.approx(1000.0 - 100.0)
+    # 没有给出价格的合约沿用上一次的盯市价
+    assert book.unrealized_by_instrument({"rb2310": 3690.0}) == {"cu2309": 1000.0, "rb2310": 100.0}
+
+
+def test_restore_lots_round_trip():
+    book = PositionBook()
+    book.open("2023-08-01", "cu2309", 1, 68000.0, 3, 9.0)
+    book.close("2023-08-02", "cu2309", 1, 68100.0, 1)
+    restored = PositionBook()
+    restored.restore_lots(book.open_lots())
+    assert restored.open_lots() == book.open_lots() == [("cu2309", 1, "2023-08-01", 68000.0, 2, 6.0)]
+    trades, _ = restored.close("2023-08-03", "cu2309", 1, 68100.0, 2)
+    assert trades[0]['open_fee'] == pytest.approx(6.0)
+
+
+def test_unseen_lots_is_a_multiset():
+    lot = ("cu2309", 1, "2023-08-01", 68000.0, 1, 3.0)
+    other = ("cu2309", -1, "2023-08-01", 68000.0, 1, 3.0)
+    assert unseen_lots([lot], [lot, lot, other]) == [lot, other]
+    assert unseen_lots([], []) == []
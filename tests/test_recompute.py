@@ -0,0 +1,40 @@
+import pytest
+
+from 期货记账软件.core import TradeRecorder, default_registry, load_account, recompute_account, save_account
+
+from conftest import make_trade
+
+
+def test_recompute_profits():
+    trade_recorder = TradeRecorder()
+    trade_recorder.add_trades([make_trade("2023-08-01"), make_trade("2023-08-02", "rb2310", 3700.0, 3710.0, 10.0)])
+    rows = trade_recorder.select_rows("cu")
+    changed = trade_recorder.recompute_profits(rows, multiplier_scale=2.0)
+    assert list(changed) == [0]
+    assert trade_recorder.trades[0]['profit'] == pytest.approx(100.0 * 10.0 - 6.0)
+    # 聚合已重建
+    assert trade_recorder.calculate_daily_profit("2023-08-01") == pytest.approx(994.0)
+    assert trade_recorder.performance.total_profit == pytest.approx(994.0 + 94.0)
+    # 没有变化时不重建
+    assert len(trade_recorder.recompute_profits(rows)) == 0
+
+
+def test_recompute_fees_from_spec():
+    registry = default_registry()
+    spec = registry.get("rb2310")
+    trade_recorder = TradeRecorder()
+    trade_recorder.add_trade(make_trade("2023-08-01", "rb2310", 3700.0, 3710.0, spec.multiplier * 2, 0.0, 0.0))
+    trade_recorder.recompute_profits([0], registry=registry)
+    trade = trade_recorder.trades[0]
+    assert trade['open_fee'] == round(spec.fee(3700.0, 2, "open"), 2)
+    assert trade['profit'] == pytest.approx(10.0 * spec.multiplier * 2 - trade['open_fee'] - trade['close_fee'])
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".db", ".ledger"])
+def test_recompute_account(tmp_path, account, suffix):
+    path = str(tmp_path / f"account{suffix}")
+    save_account(path, *account)
+    assert recompute_account(path, product="沪铜", start_date="2023-08-02", multiplier_scale=2.0) == 1
+    trades = load_account(path)[1].trades
+    assert trades[2]['profit_per_point'] == 10.0 and trades[0]['profit_per_point'] == 5.0
+    assert recompute_account(path, product="ag") == 0
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from 期货记账软件.core import ReplayFeed, RiskMonitor, SimulatedFeed
+
+
+def test_monitor_incremental_matches_resum():
+    warnings = []
+    monitor = RiskMonitor(100000.0, [("cu2309", 1, "2023-08-01", 68000.0, 2, 6.0)],
+                          on_warning=lambda ratio, moment: warnings.append(moment))
+    monitor.on_tick("t1", "cu2309", 68100.0)
+    monitor.on_tick("t2", "rb2310", 3700.0)
+    assert monitor.snapshot[2] == pytest.approx(1000.0)
+    margin = monitor.snapshot[1]
+    monitor.reset()
+    assert monitor.snapshot[1] == pytest.approx(margin)
+    # 总资金变小后越过预警线，只在越过的那一跳通知
+    monitor.set_balance(1.0)
+    assert monitor.on_tick("t3", "cu2309", 68100.0) and not monitor.on_tick("t4", "cu2309", 68110.0)
+    assert warnings == ["t3"]
+
+
+def test_monitor_reset_replaces_positions():
+    monitor = RiskMonitor(100000.0, [("cu2309", 1, "2023-08-01", 68000.0, 2, 6.0)])
+    monitor.on_tick("t1", "cu2309", 68100.0)
+    # 运行中加仓并开了新合约、总资金变化：与按最新价重新建立的监控一致
+    positions = [("cu2309", 1, "2023-08-01", 68000.0, 2, 6.0), ("cu2309", -1, "2023-08-02", 68200.0, 1, 3.0),
+                 ("rb2310", 1, "2023-08-02", 3700.0, 5, 2.0)]
+    monitor.set_balance(90000.0)
+    monitor.reset(positions)
+    fresh = RiskMonitor(90000.0, positions)
+    fresh.on_tick("", "cu2309", 68100.0)
+    assert monitor.snapshot[1:] == pytest.approx(fresh.snapshot[1:])
+    monitor.on_tick("t2", "rb2310", 3710.0)
+    fresh.on_tick("t2", "rb2310", 3710.0)
+    assert monitor.snapshot == pytest.approx(fresh.snapshot)
+    # 缺少乘数时保持原有持仓；全部平仓后不再占用保证金
+    with pytest.raises(ValueError):
+        monitor.reset([("xx2309", 1, "2023-08-02", 100.0, 1, 0.0)])
+    assert monitor.snapshot[1] == pytest.approx(fresh.snapshot[1])
+    monitor.reset([])
+    assert monitor.snapshot[1:4] == (0.0, 0.0, 90000.0)
+
+
+def test_replay_feed_caps_gap_and_stops(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text("时间,合约,价格\n"
+                    "2023-08-04 14:59:00,cu2309,68000\n"
+                    "坏行\n"
+                    "2023-08-07 09:00:00,cu2309,68100\n"
+                    "2023-08-07 09:00:01,cu2309,68200\n", encoding='utf-8')
+    assert [price for _, _, price in ReplayFeed(str(path))] == [68000.0, 68100.0, 68200.0]
+    assert len(list(ReplayFeed(str(path), speed=1.0, max_gap=0.01))) == 3
+
+    feed = ReplayFeed(str(path), speed=1.0)
+    threading.Timer(0.05, feed.stop).start()
+    started = time.perf_counter()
+    assert len(list(feed)) == 1
+    assert time.perf_counter() - started < 5.0
+
+
+def test_simulated_feed_stops():
+    feed = SimulatedFeed({"cu2309": 68000.0}, interval=60.0, seed=1)
+    threading.Timer(0.05, feed.stop).start()
+    started = time.perf_counter()
+    ticks = list(feed)
+    assert len(ticks) <= 1 and time.perf_counter() - started < 5.0
+    assert len(list(SimulatedFeed({"cu2309": 68000.0}, count=5, seed=1))) == 5
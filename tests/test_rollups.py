@@ -0,0 +1,53 @@
+import random
+from datetime import date
+
+import pytest
+
+from 期货记账软件.core import DateRangeIndex, TradeRecorder, period_ranges
+
+from conftest import make_trade
+
+
+def test_range_index_matches_brute_force():
+    rng = random.Random(7)
+    index = DateRangeIndex()
+    days = {}
+    base = date(2020, 1, 1).toordinal()
+    # 乱序加入，覆盖向前和向后扩容
+    for _ in range(2000):
+        ordinal = base + rng.randrange(-800, 1500)
+        profit = rng.uniform(-100, 100)
+        index.add(ordinal, profit, 1.0, 1, 1 if profit > 0 else 0)
+        days[ordinal] = days.get(ordinal, 0.0) + profit
+    for _ in range(200):
+        start = base + rng.randrange(-1000, 1700)
+        end = start + rng.randrange(0, 600)
+        expected = sum(profit for ordinal, profit in days.items() if start <= ordinal <= end)
+        assert index.query(start, end)['profit'] == pytest.approx(expected, abs=1e-6)
+
+
+def test_empty_range_index():
+    assert DateRangeIndex().query(0, 10**6) == {'profit': 0.0, 'fees': 0.0, 'count': 0, 'wins': 0}
+
+
+def test_period_ranges():
+    start, end = date(2023, 12, 28).toordinal(), date(2024, 1, 2).toordinal()
+    assert period_ranges("week", start, end) == [
+        ("2023年第52周", date(2023, 12, 25).toordinal(), date(2023, 12, 31).toordinal()),
+        ("2024年第1周", date(2024, 1, 1).toordinal(), date(2024, 1, 7).toordinal()),
+    ]
+    assert [label for label, _, _ in period_ranges("month", start, end)] == ["2023-12", "2024-01"]
+    assert [label for label, _, _ in period_ranges("year", start, end)] == ["2023年", "2024年"]
+    assert period_ranges("custom", start, end) == [("2023-12-28 ~ 2024-01-02", start, end)]
+    with pytest.raises(ValueError):
+        period_ranges("quarter", start, end)
+
+
+def test_range_summary_and_rollup():
+    trade_recorder = TradeRecorder()
+    trade_recorder.add_trades([make_trade("2023-07-31"), make_trade("2023-08-01"), make_trade("2023-08-15")])
+    months = dict(trade_recorder.rollup("month"))
+    assert months["2023-07"]['count'] == 1 and months["2023-08"]['count'] == 2
+    start = date(2023, 8, 1).toordinal()
+    assert trade_recorder.range_summary(start, start + 30)['profit'] == pytest.approx(2 * 494.0)
+    assert TradeRecorder().rollup("month") == []
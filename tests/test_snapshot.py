@@ -0,0 +1,55 @@
+import pytest
+
+from 期货记账软件.core import SNAPSHOT_SUFFIX, CapitalManager, TradeRecorder, load_account, save_account
+from 期货记账软件.core.snapshot import SNAPSHOT_VERSION, _SNAPSHOT_HEADER
+
+from conftest import OPEN_LOTS, assert_same_account, make_trade
+
+
+def test_round_trip(tmp_path, account):
+    path = str(tmp_path / f"account{SNAPSHOT_SUFFIX}")
+    save_account(path, *account)
+    assert_same_account(account, load_account(path))
+
+
+def test_round_trip_positions(tmp_path, account):
+    account[0].open_lots = list(OPEN_LOTS)
+    path = str(tmp_path / f"account{SNAPSHOT_SUFFIX}")
+    save_account(path, *account)
+    assert load_account(path)[0].open_lots == OPEN_LOTS
+
+
+def test_round_trip_empty_account(tmp_path):
+    path = str(tmp_path / f"empty{SNAPSHOT_SUFFIX}")
+    trade_recorder = TradeRecorder()
+    save_account(path, CapitalManager(trade_recorder), trade_recorder)
+    capital_manager, trade_recorder = load_account(path)
+    assert capital_manager.transactions == [] and len(trade_recorder.trades) == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / f"bad{SNAPSHOT_SUFFIX}"
+    path.write_bytes(b"not a snapshot".ljust(_SNAPSHOT_HEADER.size, b"\0"))
+    with pytest.raises(ValueError):
+        load_account(str(path))
+
+
+def test_overwrites_itself_while_mapped(tmp_path, account):
+    path = str(tmp_path / f"a{SNAPSHOT_SUFFIX}")
+    save_account(path, *account)
+    capital_manager, trade_recorder = load_account(path)
+    trade_recorder.add_trade(make_trade("2023-08-04"))
+    save_account(path, capital_manager, trade_recorder)
+    assert len(load_account(path)[1].trades) == 4
+
+
+def test_reads_version_1(tmp_path, account):
+    # 版本 1 与版本 2 的区别只是文件头之后的持仓段，去掉后改写版本号即为版本 1 的文件
+    path = tmp_path / f"a{SNAPSHOT_SUFFIX}"
+    save_account(str(path), *account)
+    data = bytearray(path.read_bytes())
+    assert int.from_bytes(data[8:12], 'little') == SNAPSHOT_VERSION == 2
+    data[8:12] = (1).to_bytes(4, 'little')
+    del data[_SNAPSHOT_HEADER.size:_SNAPSHOT_HEADER.size + 8]
+    path.write_bytes(bytes(data))
+    assert_same_account(account, load_account(str(path)))
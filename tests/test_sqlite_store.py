@@ -0,0 +1,69 @@
+import pytest
+
+from 期货记账软件.core import CapitalManager, TradeRecorder, load_account, open_store, save_account
+
+from conftest import OPEN_LOTS, assert_same_account, make_trade
+
+
+def test_round_trip(tmp_path, account):
+    path = str(tmp_path / "account.db")
+    save_account(path, *account)
+    assert_same_account(account, load_account(path))
+
+
+def test_round_trip_positions(tmp_path, account):
+    account[0].open_lots = list(OPEN_LOTS)
+    path = str(tmp_path / "account.db")
+    save_account(path, *account)
+    assert load_account(path)[0].open_lots == OPEN_LOTS
+
+
+def test_round_trip_empty_account(tmp_path):
+    path = str(tmp_path / "empty.db")
+    trade_recorder = TradeRecorder()
+    save_account(path, CapitalManager(trade_recorder), trade_recorder)
+    capital_manager, trade_recorder = load_account(path)
+    assert capital_manager.transactions == [] and len(trade_recorder.trades) == 0
+
+
+def test_refuses_to_overwrite(tmp_path, account):
+    path = str(tmp_path / "a.db")
+    save_account(path, *account)
+    with pytest.raises(ValueError):
+        save_account(path, *account)
+
+
+def test_appends_and_updates(tmp_path, account):
+    path = str(tmp_path / "a.db")
+    save_account(path, *account)
+    store = open_store(path)
+    capital_manager, trade_recorder = CapitalManager(), TradeRecorder()
+    capital_manager.trade_recorder = trade_recorder
+    store.load_into(capital_manager, trade_recorder)
+    trade = make_trade("2023-08-05", close_price=68300.0)
+    trade_recorder.add_trade(trade)
+    store.add_trades([trade])
+    store.add_capital([("入金", 500.0, "2023-08-05 09:00")])
+    store.set_margin(12000.0)
+    trade_recorder.recompute_profits([0], multiplier_scale=2.0)
+    store.update_trades([0], [trade_recorder.trades[0]])
+    store.close()
+
+    capital_manager, trade_recorder = load_account(path)
+    assert len(trade_recorder.trades) == 4
+    assert trade_recorder.trades[0]['profit_per_point'] == 10.0
+    assert trade_recorder.trades[0]['profit'] == pytest.approx(100.0 * 10.0 - 6.0)
+    assert capital_manager.cash == pytest.approx(98500.0)
+    assert capital_manager.margin == 12000.0
+
+
+def test_set_positions(tmp_path, account):
+    account[0].open_lots = list(OPEN_LOTS)
+    path = str(tmp_path / "a.db")
+    save_account(path, *account)
+    store = open_store(path)
+    store.load_into(CapitalManager(), TradeRecorder())
+    assert store.get_positions() == OPEN_LOTS
+    store.set_positions(OPEN_LOTS[1:])
+    store.close()
+    assert load_account(path)[0].open_lots == OPEN_LOTS[1:]
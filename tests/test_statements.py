@@ -0,0 +1,138 @@
+import pytest
+
+from 期货记账软件.core import (
+    TradeRecorder, import_statement, import_statement_into_store, load_account, pair_fills, parse_statement,
+    unapplied_fills
+)
+
+HEADER = "成交日期,成交时间,合约,买/卖,开平,成交价,手数,手续费\n"
+
+
+def write(tmp_path, text, name="fills.csv", encoding='utf-8'):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return str(path)
+
+
+def test_pairing_fifo_and_open_lots(tmp_path):
+    path = write(tmp_path, HEADER +
+                 "20230801,09:01:00,cu2309,买,开仓,68000,2,10\n"
+                 "20230801,09:05:00,cu2309,买,开仓,68100,1,5\n"
+                 "20230802,10:00:00,cu2309,卖,平仓,68200,2,10\n"
+                 "20230802,10:01:00,rb2310,卖,平仓,3700,1,1\n")
+    result = import_statement(path)
+    assert result.fill_count == 4
+    assert [(trade['open_price'], trade['profit']) for trade in result.trades] == [(68000.0, 200.0 * 10 - 20.0)]
+    assert result.open_lots == [("cu2309", 1, "2023-08-01", 68100.0, 1, 5.0)]
+    assert result.unmatched == [("2023-08-02", "rb2310", 1)]
+
+
+def test_gbk_and_time_only_columns(tmp_path):
+    path = write(tmp_path, "成交时间,合约,买卖,开平,成交价,成交手数\n"
+                           "2023-08-03 14:00:00,rb2310,买,平今,3680,1\n"
+                           "2023-08-03 09:05:00,rb2310,卖,开仓,3700,1\n", encoding='gbk')
+    result = import_statement(path)
+    assert [trade['profit'] for trade in result.trades] == [pytest.approx(200.0)]
+
+
+def test_text_settlement_statement(tmp_path):
+    path = write(tmp_path, "成交记录\n"
+                           "|成交日期|合约|买/卖|成交价|手数|开平|手续费|\n"
+                           "|--------|----|-----|------|----|----|------|\n"
+                           "|20230801|cu2309|买|68000|1|开|3|\n"
+                           "|20230801|cu2309|卖|68100|1|平|3|\n"
+                           "|合计|||||||\n", name="settle.txt")
+    result = import_statement(path)
+    assert len(result.trades) == 1 and result.trades[0]['profit'] == pytest.approx(494.0)
+
+
+def test_night_session_calendar_dates(tmp_path):
+    # 周五夜盘开仓、周六凌晨和周一白天平今，都属于周一这个交易日
+    path = write(tmp_path, HEADER +
+                 "20230804,21:05:00,cu2309,买,开仓,68000,2,10\n"
+                 "20230807,10:00:00,cu2309,卖,平今,68100,1,5\n"
+                 "20230805,01:30:00,cu2309,卖,平今,68200,1,5\n")
+    fills = parse_statement(path)
+    assert fills['date'] == ["2023-08-07"] * 3
+    assert fills['time'] == ["21:05:00", "01:30:00", "10:00:00"]
+    result = import_statement(path)
+    assert [trade['close_price'] for trade in result.trades] == [68200.0, 68100.0]
+    assert result.unmatched == [] and result.open_lots == []
+
+
+def test_night_session_trading_day_column(tmp_path):
+    # 只有交易日的文件中夜盘成交排在同一交易日的日盘之前
+    path = write(tmp_path, "交易日,成交时间,合约,买/卖,开平,成交价,手数,手续费\n"
+                           "20230807,09:30:00,cu2309,卖,平今,68100,1,5\n"
+                           "20230807,21:05:00,cu2309,买,开仓,68000,2,10\n"
+                           "20230807,00:30:00,cu2309,卖,平今,68200,1,5\n")
+    result = import_statement(path)
+    assert [trade['close_price'] for trade in result.trades] == [68200.0, 68100.0]
+    assert all(trade['date'] == "2023-08-07" for trade in result.trades)
+
+
+def test_missing_header_and_multiplier(tmp_path):
+    with pytest.raises(ValueError):
+        import_statement(write(tmp_path, "a,b,c\n1,2,3\n"))
+    path = write(tmp_path, HEADER + "20230801,09:00:00,xx2309,买,开仓,100,1,0\n", name="xx.csv")
+    with pytest.raises(ValueError):
+        import_statement(path)
+    assert import_statement(path, {"xx": 10}).open_lots == [("xx2309", 1, "2023-08-01", 100.0, 1, 0.0)]
+
+
+def test_pairing_closes_existing_lots_first(tmp_path):
+    fills = parse_statement(write(tmp_path, HEADER +
+                                  "20230802,09:01:00,cu2309,买,开仓,68100,1,5\n"
+                                  "20230802,10:00:00,cu2309,卖,平仓,68200,1,5\n"))
+    result = pair_fills(fills, open_lots=[("cu2309", 1, "2023-08-01", 68000.0, 1, 3.0)])
+    assert [(trade['open_price'], trade['open_fee']) for trade in result.trades] == [(68000.0, 3.0)]
+    assert result.open_lots == [("cu2309", 1, "2023-08-02", 68100.0, 1, 5.0)]
+    with pytest.raises(ValueError):
+        pair_fills(fills, open_lots=[("xx2309", 1, "2023-08-01", 1.0, 1, 0.0)])
+
+
+@pytest.mark.parametrize("suffix", [".db", ".ledger"])
+def test_second_statement_closes_lot_from_first(tmp_path, suffix):
+    opening = ("20230801,21:05:00,cu2309,买,开仓,68000,2,10\n"
+               "20230802,09:30:00,rb2310,卖,开仓,3700,1,1\n")
+    closing = ("20230803,10:00:00,cu2309,卖,平昨,68300,1,5\n"
+               "20230803,10:05:00,rb2310,买,平仓,3690,1,1\n")
+    store_path = str(tmp_path / f"account{suffix}")
+    import_statement_into_store(write(tmp_path, HEADER + opening, "day1.csv"), store_path)
+    result = import_statement_into_store(write(tmp_path, HEADER + closing, "day2.csv"), store_path)
+    assert result.unmatched == [] and result.duplicates == 0
+    assert [(trade['name'], trade['profit']) for trade in result.trades] == [
+        ("cu2309", pytest.approx(300.0 * 5 - 5.0 - 5.0)), ("rb2310", pytest.approx(10.0 * 10 - 2.0))]
+    assert result.open_lots == [("cu2309", 1, "2023-08-02", 68000.0, 1, 5.0)]
+
+    # 累计的明细再导入一次，已有体现的成交全部跳过
+    result = import_statement_into_store(write(tmp_path, HEADER + opening + closing, "all.csv"), store_path)
+    assert result.trades == [] and result.duplicates == 4 and result.unmatched == []
+    capital_manager, trade_recorder = load_account(store_path)
+    assert len(trade_recorder.trades) == 2
+    assert capital_manager.open_lots == [("cu2309", 1, "2023-08-02", 68000.0, 1, 5.0)]
+
+
+def test_unapplied_fills():
+    fills = {
+        'date': ["2023-08-02"] * 4,
+        'instrument': ["cu2309"] * 4,
+        'direction': [1, -1, 1, -1],
+        'offset': ["open", "close", "open", "close"],
+        'price': [68000.0, 68200.0, 68100.0, 68300.0],
+        'lots': [1, 1, 2, 2],
+        'fee': [3.0, 3.0, 6.0, 6.0],
+    }
+    trade_recorder = TradeRecorder()
+    # 第一组开平已记录；同日平掉的另一笔 68100 的开仓不是本明细的平仓，不能抵扣本明细的开仓
+    trade_recorder.add_trades([
+        {'date': "2023-08-02", 'name': "cu2309", 'open_price': 68000.0, 'close_price': 68200.0,
+         'profit_per_point': 5.0, 'open_fee': 3.0, 'close_fee': 3.0, 'profit': 994.0},
+        {'date': "2023-08-02", 'name': "cu2309", 'open_price': 68100.0, 'close_price': 68150.0,
+         'profit_per_point': 5.0, 'open_fee': 3.0, 'close_fee': 3.0, 'profit': 244.0},
+    ])
+    remaining = unapplied_fills(fills, trade_recorder, [("cu2309", 1, "2023-08-02", 68100.0, 1, 3.0)])
+    # 第二组开仓 2 手中 1 手已在持仓中，平仓 2 手都未记录
+    assert remaining['lots'] == [1, 2] and remaining['fee'] == [3.0, 6.0]
+    assert remaining['offset'] == ["open", "close"]
+    assert unapplied_fills({field: [] for field in fills}, trade_recorder)['date'] == []
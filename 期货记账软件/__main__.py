@@ -0,0 +1,6 @@
+import sys
+
+from 期货记账软件.gui import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,19 @@
 # build.spec
+# 默认打成单个 exe，每次启动都要把全部依赖解压到临时目录；
+# 设置环境变量 FUTURES_ONEDIR=1 时打成目录（dist/期货记账软件/），启动时直接加载，冷启动快得多：
+#     FUTURES_ONEDIR=1 pyinstaller build.spec
+# 打包后可用 benchmarks/startup_budget.py --exe 检查冷启动是否在预算内。
+import os
+
+ONEDIR = os.environ.get("FUTURES_ONEDIR") == "1"
+
 block_cipher = None
 
 a = Analysis(
-    ['期货记账软件.py'],
-    pathex=[],
+    ['__main__.py'],
+    pathex=['..'],  # 包所在目录，使 __main__.py 能以绝对路径导入本包
     binaries=[],
-    datas=[],
+    datas=[('core/contracts.csv', '期货记账软件/core')],  # 内置合约规格表
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -18,25 +26,55 @@ a = Analysis(
 )
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name='期货记账软件',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,  # 设置为True会显示控制台窗口
-    icon='app_icon.ico',  # 可选：添加图标文件
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
\ No newline at end of file
+if ONEDIR:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='期货记账软件',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,  # upx 压缩的库每次启动都要先解压，目录模式下不压缩
+        console=False,
+        icon='app_icon.ico',
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='期货记账软件',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        name='期货记账软件',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,  # 设置为True会显示控制台窗口
+        icon='app_icon.ico',  # 可选：添加图标文件
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
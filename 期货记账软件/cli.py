@@ -0,0 +1,198 @@
+"""命令行入口，不依赖 PyQt6
+
+用法:
+    python -m 期货记账软件.cli summary 账户文件 [--at 时点]
+    python -m 期货记账软件.cli daily 账户文件 [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+    python -m 期货记账软件.cli export 源文件 目标文件
+    python -m 期货记账软件.cli import 源文件 账户文件(.db/.ledger)
+    python -m 期货记账软件.cli statement 成交明细 账户文件(.db/.ledger) [--multiplier 品种=乘数 ...]
+    python -m 期货记账软件.cli recompute 账户文件 [--product 品种] [--start ...] [--end ...]
+                                     [--multiplier 原乘数 新乘数] [--fees-from-spec]
+    python -m 期货记账软件.cli batch 目录 [--workers N] [--report summary|daily|instruments|capital]
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from .core import (
+    aggregate_directory, default_registry, import_into_store, import_statement_into_store, is_store_path,
+    load_account, recompute_account, save_account
+)
+
+def _parse_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").toordinal()
+
+def cmd_summary(args):
+    if args.at:
+        _parse_date(args.at[:10])
+    capital_manager, trade_recorder = load_account(args.file)
+    trades = trade_recorder.trades
+    daily_stats = trade_recorder.daily_stats.values()
+    print(f"交易笔数: {len(trades)}")
+    print(f"交易天数: {len(trade_recorder.daily_stats)}")
+    print(f"总盈亏: {sum(stats.profit for stats in daily_stats):.2f} 元")
+    print(f"总手续费: {sum(stats.fees for stats in daily_stats):.2f} 元")
+    print(f"总资金: {capital_manager.balance:.2f} 元")
+    print(f"  入金净额: {capital_manager.cash:.2f} 元")
+    print(f"  已实现盈亏: {capital_manager.realized_profit():.2f} 元")
+    print(f"保证金占用: {capital_manager.margin:.2f} 元")
+    print(f"可用资金: {capital_manager.available_balance():.2f} 元")
+    if args.at:
+        cash, profit, fees, margin = capital_manager.state_at(args.at)
+        print(f"{args.at} 时: 总资金 {cash + profit:.2f} 元（入金净额 {cash:.2f}，已实现盈亏 {profit:.2f}，"
+              f"手续费 {fees:.2f}），保证金占用 {margin:.2f} 元")
+    return 0
+
+def cmd_daily(args):
+    _, trade_recorder = load_account(args.file)
+    start = _parse_date(args.start) if args.start else None
+    end = _parse_date(args.end) if args.end else None
+    print("日期,笔数,盈利笔数,亏损笔数,手续费,盈亏")
+    for ordinal in sorted(trade_recorder.daily_stats):
+        if (start is not None and ordinal < start) or (end is not None and ordinal > end):
+            continue
+        stats = trade_recorder.daily_stats[ordinal]
+        print(f"{trade_recorder.trades.date_string(ordinal)},{stats.count},{stats.wins},"
+              f"{stats.losses},{stats.fees:.2f},{stats.profit:.2f}")
+    return 0
+
+def cmd_export(args):
+    capital_manager, trade_recorder = load_account(args.source)
+    save_account(args.target, capital_manager, trade_recorder)
+    print(f"已导出 {len(trade_recorder.trades)} 条交易记录到 {args.target}")
+    return 0
+
+def cmd_import(args):
+    if not is_store_path(args.account):
+        print("导入目标必须是 .db 或 .ledger 账户", file=sys.stderr)
+        return 2
+    capital_count, trade_count, skipped = import_into_store(args.source, args.account)
+    print(f"已导入 {capital_count} 条资金记录、{trade_count} 条交易记录到 {args.account}，"
+          f"跳过重复记录 {skipped} 条")
+    return 0
+
+def _parse_multipliers(items):
+    multipliers = {}
+    for item in items or ():
+        name, _, value = item.partition("=")
+        if not name or not value:
+            raise ValueError(f"合约乘数格式应为 品种=乘数: {item}")
+        multipliers[name.strip()] = float(value)
+    return multipliers
+
+def cmd_statement(args):
+    if not is_store_path(args.account):
+        print("导入目标必须是 .db 或 .ledger 账户", file=sys.stderr)
+        return 2
+    result = import_statement_into_store(args.source, args.account, _parse_multipliers(args.multiplier))
+    print(f"读取 {result.fill_count} 笔成交，跳过账户中已有的 {result.duplicates} 笔，"
+          f"新增 {len(result.trades)} 条交易记录到 {args.account}")
+    for date_str, name, lots in result.unmatched:
+        print(f"未找到开仓: {date_str} {name} {lots} 手", file=sys.stderr)
+    if result.open_lots:
+        print(f"账户持仓共 {sum(lot[4] for lot in result.open_lots)} 手")
+    return 0
+
+def cmd_recompute(args):
+    for text in (args.start, args.end):
+        if text:
+            _parse_date(text)
+    scale = 1.0
+    if args.multiplier:
+        old, new = args.multiplier
+        if old <= 0 or new <= 0:
+            raise ValueError("合约乘数必须大于 0")
+        scale = new / old
+    changed = recompute_account(args.file, args.product, args.start, args.end, scale,
+                                default_registry() if args.fees_from_spec else None)
+    print(f"已重算 {args.file}，{changed} 条交易记录有变化")
+    return 0
+
+def cmd_batch(args):
+    report = aggregate_directory(args.directory, args.workers)
+    for error in report.errors:
+        print(f"加载失败: {error}", file=sys.stderr)
+
+    if args.report == "daily":
+        print("日期,笔数,盈利笔数,亏损笔数,手续费,盈亏")
+        for date_str in sorted(report.daily):
+            profit, count, wins, losses, fees = report.daily[date_str]
+            print(f"{date_str},{count},{wins},{losses},{fees:.2f},{profit:.2f}")
+    elif args.report == "instruments":
+        print("名称,笔数,手续费,盈亏")
+        for name, (profit, count, fees) in sorted(report.instruments.items(), key=lambda item: -item[1][0]):
+            print(f"{name},{count},{fees:.2f},{profit:.2f}")
+    elif args.report == "capital":
+        print("账户,总资金,保证金占用,可用资金")
+        for summary in report.accounts:
+            balance, margin, available = summary['capital']
+            print(f"{summary['path']},{balance:.2f},{margin:.2f},{available:.2f}")
+    else:
+        print(f"账户数: {len(report.accounts)}")
+        print(f"交易笔数: {report.trade_count}")
+        print(f"总盈亏: {report.total_profit:.2f} 元")
+        print(f"总资金: {report.total_balance:.2f} 元")
+        print(f"保证金占用: {report.total_margin:.2f} 元")
+    return 1 if report.errors else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="期货记账软件", description="期货交易记账命令行工具")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary = commands.add_parser("summary", help="显示账户汇总")
+    summary.add_argument("file", help="账户文件 (.csv/.snap/.db/.ledger)")
+    summary.add_argument("--at", help="同时显示该时点的资金状态，YYYY-MM-DD（当日结束）或 \"YYYY-MM-DD HH:MM\"")
+    summary.set_defaults(func=cmd_summary)
+
+    daily = commands.add_parser("daily", help="按日输出盈亏 (CSV)")
+    daily.add_argument("file", help="账户文件 (.csv/.snap/.db/.ledger)")
+    daily.add_argument("--start", help="起始日期 YYYY-MM-DD（含）")
+    daily.add_argument("--end", help="结束日期 YYYY-MM-DD（含）")
+    daily.set_defaults(func=cmd_daily)
+
+    export = commands.add_parser("export", help="转换为另一种格式，按目标扩展名决定")
+    export.add_argument("source", help="源文件")
+    export.add_argument("target", help="目标文件 (.csv/.snap/.db/.ledger)")
+    export.set_defaults(func=cmd_export)
+
+    import_ = commands.add_parser("import", help="把文件中的记录追加到已有账户")
+    import_.add_argument("source", help="源文件")
+    import_.add_argument("account", help="目标账户 (.db/.ledger)")
+    import_.set_defaults(func=cmd_import)
+
+    statement = commands.add_parser("statement", help="导入期货公司成交明细（CSV 或文本结算单）")
+    statement.add_argument("source", help="成交明细文件")
+    statement.add_argument("account", help="目标账户 (.db/.ledger)")
+    statement.add_argument("--multiplier", action="append", metavar="品种=乘数",
+                           help="补充或覆盖合约乘数，可重复，例如 --multiplier cu=5")
+    statement.set_defaults(func=cmd_statement)
+
+    recompute = commands.add_parser("recompute", help="按所选范围批量重算交易盈亏")
+    recompute.add_argument("file", help="账户文件 (.csv/.snap/.db/.ledger)")
+    recompute.add_argument("--product", help="只重算该品种，例如 沪铜 或 cu")
+    recompute.add_argument("--start", help="起始日期 YYYY-MM-DD（含）")
+    recompute.add_argument("--end", help="结束日期 YYYY-MM-DD（含）")
+    recompute.add_argument("--multiplier", nargs=2, type=float, metavar=("原乘数", "新乘数"),
+                           help="修正录错的合约乘数，每点盈利按 新乘数/原乘数 换算")
+    recompute.add_argument("--fees-from-spec", action="store_true",
+                           help="按合约规格表重算开平仓手续费")
+    recompute.set_defaults(func=cmd_recompute)
+
+    batch = commands.add_parser("batch", help="并行汇总目录下的所有账户文件")
+    batch.add_argument("directory", help="账户文件所在目录")
+    batch.add_argument("--workers", type=int, help="进程数，默认为 CPU 核数")
+    batch.add_argument("--report", choices=("summary", "daily", "instruments", "capital"),
+                       default="summary", help="输出内容")
+    batch.set_defaults(func=cmd_batch)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
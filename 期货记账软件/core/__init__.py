@@ -0,0 +1,26 @@
+"""不依赖 PyQt6 的账务核心，可在脚本、批处理和无显示环境的服务器上使用"""
+from .accounts import (
+    JOURNAL_SUFFIX, SQLITE_SUFFIX, import_into_store, import_statement_into_store, is_store_path,
+    load_account, open_store, recompute_account, save_account
+)
+from .batch import BatchReport, aggregate_accounts, aggregate_directory, summarize_account
+from .csv_format import (
+    format_capital_payload, format_position_payload, format_trade_payload, parse_capital_payload,
+    parse_data_rows, parse_position_payload, parse_trade_payload, read_csv, write_csv
+)
+from .dedup import ContentIndex, capital_digest, trade_digest
+from .instruments import (
+    ContractRegistry, ContractSpec, contract_multiplier, contract_spec, default_registry,
+    missing_multipliers, product_group, product_root
+)
+from .journal import JournalStore
+from .ledger import DEPOSIT, MARGIN, WITHDRAW, CapitalManager, GroupStats, TradeRecorder, TradeRow, TradeStore
+from .performance import PerformanceStats, downsample_minmax
+from .positions import PositionBook, unseen_lots
+from .profiling import Profiler, profiler, timed
+from .query import TradeQuery
+from .risk import WARNING_RATIO, ReplayFeed, RiskMonitor, SimulatedFeed
+from .rollups import DateRangeIndex, period_ranges
+from .snapshot import SNAPSHOT_SUFFIX, read_snapshot, write_snapshot
+from .sqlite_store import SqliteStore
+from .statements import StatementImport, import_statement, pair_fills, parse_statement, unapplied_fills
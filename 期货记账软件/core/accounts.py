@@ -0,0 +1,156 @@
+import os
+
+from .csv_format import read_csv, write_csv
+from .journal import JournalStore
+from .ledger import CapitalManager, TradeRecorder
+from .positions import unseen_lots
+from .snapshot import SNAPSHOT_SUFFIX, read_snapshot, write_snapshot
+from .sqlite_store import SqliteStore
+from .statements import pair_fills, parse_statement, unapplied_fills
+
+SQLITE_SUFFIX = ".db"
+JOURNAL_SUFFIX = ".ledger"
+
+def is_store_path(path):
+    return path.lower().endswith((SQLITE_SUFFIX, JOURNAL_SUFFIX))
+
+def open_store(path, read_only=False):
+    """按扩展名打开账户存储：.ledger 为日志账户，其余为 SQLite 账户
+
+    read_only 时日志账户只读取、不修改文件（SQLite 的 WAL 模式本身允许与写入者并发读取）。
+    """
+    if path.lower().endswith(JOURNAL_SUFFIX):
+        return JournalStore(path, read_only)
+    return SqliteStore(path)
+
+def load_account(path):
+    """读取任意格式（CSV、快照、SQLite、日志）的账户文件，返回 (CapitalManager, TradeRecorder)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"文件不存在: {path}")
+    if path.lower().endswith(SNAPSHOT_SUFFIX):
+        return read_snapshot(path)
+    
+    trade_recorder = TradeRecorder()
+    capital_manager = CapitalManager(trade_recorder)
+    if is_store_path(path):
+        store = open_store(path, read_only=True)
+        try:
+            store.load_into(capital_manager, trade_recorder)
+        finally:
+            store.close()
+    else:
+        capital_rows, trades, capital_manager.open_lots = read_csv(path)
+        capital_manager.restore_transactions(capital_rows)
+        for trade in trades:
+            trade_recorder.add_trade(trade)
+    return capital_manager, trade_recorder
+
+def save_account(path, capital_manager, trade_recorder):
+    """按扩展名把账户写成 CSV、快照或新的 SQLite / 日志账户"""
+    if path.lower().endswith(SNAPSHOT_SUFFIX):
+        write_snapshot(path, capital_manager, trade_recorder)
+    elif is_store_path(path):
+        store = open_store(path)
+        try:
+            if not store.is_empty():
+                raise ValueError(f"目标账户已有数据: {path}")
+            store.save_from(capital_manager, trade_recorder)
+        finally:
+            store.close()
+    else:
+        write_csv(path, capital_manager, trade_recorder)
+
+def _append_to_store(store_path, transactions, trades, open_lots=()):
+    """只追加目标账户中还没有的记录，open_lots 中账户持仓里还没有的开仓并入持仓；
+    返回实际追加的 (资金记录, 交易, 开仓)"""
+    # 日志账户压缩时从内存状态写快照，所以目标账户的内存状态也要同步更新
+    target_capital = CapitalManager()
+    target_trades = TradeRecorder()
+    store = open_store(store_path)
+    try:
+        if store.is_empty():
+            store.save_from(target_capital, target_trades)
+        else:
+            store.load_into(target_capital, target_trades)
+        transactions = target_capital.unseen(transactions)
+        trades = target_trades.unseen(trades)
+        for trans_type, amount, time in transactions:
+            target_capital.restore_transaction(trans_type, amount, time)
+        store.add_capital(transactions)
+        target_trades.add_trades(trades)
+        store.add_trades(trades)
+        open_lots = unseen_lots(target_capital.open_lots, open_lots)
+        if open_lots:
+            target_capital.open_lots = target_capital.open_lots + open_lots
+            store.set_positions(target_capital.open_lots)
+    finally:
+        store.close()
+    return transactions, trades, open_lots
+
+def recompute_account(path, product=None, start_date=None, end_date=None,
+                      multiplier_scale=1.0, registry=None):
+    """批量重算账户中所选交易的盈亏（参数含义见 TradeRecorder.recompute_profits）并写回，
+    SQLite / 日志账户只更新变化的行；返回变化的交易数"""
+    def recompute(trade_recorder):
+        trades = trade_recorder.trades
+        rows = trade_recorder.select_rows(
+            product,
+            trades.date_ordinal(start_date) if start_date else None,
+            trades.date_ordinal(end_date) if end_date else None,
+        )
+        return trade_recorder.recompute_profits(rows, multiplier_scale, registry)
+    
+    if not is_store_path(path):
+        capital_manager, trade_recorder = load_account(path)
+        changed = recompute(trade_recorder)
+        if changed:
+            save_account(path, capital_manager, trade_recorder)
+        return len(changed)
+    
+    # 日志账户压缩时从内存状态写快照，所以在存储加载的同一份内存状态上重算
+    trade_recorder = TradeRecorder()
+    store = open_store(path)
+    try:
+        store.load_into(CapitalManager(), trade_recorder)
+        changed = recompute(trade_recorder)
+        store.update_trades(changed, [trade_recorder.trades[row] for row in changed])
+    finally:
+        store.close()
+    return len(changed)
+
+def import_into_store(source_path, store_path):
+    """把任意格式文件中的资金和交易记录追加到已有的 SQLite / 日志账户，已有的记录跳过，持仓并入账户持仓；
+    返回 (追加的资金记录数, 追加的交易数, 跳过的重复记录数)"""
+    capital_manager, trade_recorder = load_account(source_path)
+    transactions, trades, _ = _append_to_store(
+        store_path, capital_manager.transactions, trade_recorder.trades, capital_manager.open_lots
+    )
+    skipped = len(capital_manager.transactions) + len(trade_recorder.trades) - len(transactions) - len(trades)
+    return len(transactions), len(trades), skipped
+
+def import_statement_into_store(statement_path, store_path, multipliers=None):
+    """把期货公司成交明细追加到 SQLite / 日志账户：账户中已有体现的成交跳过，其余成交与账户已有的持仓
+    一起先进先出配对，交易一次性追加，账户持仓整体替换为配对后的持仓；
+    返回 StatementImport，其中 trades 为追加的交易，open_lots 为导入后账户的全部持仓"""
+    fills = parse_statement(statement_path)
+    # 日志账户压缩时从内存状态写快照，所以目标账户的内存状态也要同步更新
+    capital_manager = CapitalManager()
+    trade_recorder = TradeRecorder()
+    store = open_store(store_path)
+    try:
+        if store.is_empty():
+            store.save_from(capital_manager, trade_recorder)
+        else:
+            store.load_into(capital_manager, trade_recorder)
+        remaining = unapplied_fills(fills, trade_recorder, capital_manager.open_lots, multipliers)
+        result = pair_fills(remaining, multipliers, capital_manager.open_lots)
+        result.fill_count = len(fills['date'])
+        result.duplicates = result.fill_count - len(remaining['date'])
+        trade_recorder.add_trades(result.trades)
+        store.add_trades(result.trades)
+        if result.open_lots != capital_manager.open_lots:
+            capital_manager.open_lots = result.open_lots
+            store.set_positions(result.open_lots)
+    finally:
+        store.close()
+    return result
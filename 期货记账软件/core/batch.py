@@ -0,0 +1,104 @@
+import os
+
+from .accounts import JOURNAL_SUFFIX, SQLITE_SUFFIX, load_account
+from .snapshot import SNAPSHOT_SUFFIX
+
+ACCOUNT_SUFFIXES = (".csv", SNAPSHOT_SUFFIX, SQLITE_SUFFIX, JOURNAL_SUFFIX)
+
+def find_account_files(directory):
+    paths = []
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        if file_name.lower().endswith(ACCOUNT_SUFFIXES) and os.path.isfile(path):
+            paths.append(path)
+    return paths
+
+def summarize_account(path):
+    """在子进程中加载单个账户并汇总，只返回可快速序列化的简单结构"""
+    capital_manager, trade_recorder = load_account(path)
+    trades = trade_recorder.trades
+
+    daily = {
+        trades.date_string(ordinal): (stats.profit, stats.count, stats.wins, stats.losses, stats.fees)
+        for ordinal, stats in trade_recorder.daily_stats.items()
+    }
+
+    instruments = {
+        name: (stats.profit, stats.count, stats.fees)
+        for name, stats in trade_recorder.instrument_stats.items()
+    }
+
+    capital = (capital_manager.balance, capital_manager.margin, capital_manager.available_balance())
+    return {'path': path, 'trade_count': len(trades), 'daily': daily,
+            'instruments': instruments, 'capital': capital}
+
+def _summarize_safely(path):
+    try:
+        return summarize_account(path), None
+    except Exception as e:
+        return None, f"{path}: {e}"
+
+class BatchReport:
+    """多账户合并结果：每日盈亏、按合约汇总、各账户资金"""
+
+    def __init__(self):
+        self.accounts = []
+        self.errors = []
+        # 日期 -> [盈亏, 笔数, 盈利笔数, 亏损笔数, 手续费]
+        self.daily = {}
+        # 合约名称 -> [盈亏, 笔数, 手续费]
+        self.instruments = {}
+
+    def merge(self, summary):
+        self.accounts.append(summary)
+        for date_str, values in summary['daily'].items():
+            merged = self.daily.get(date_str)
+            if merged is None:
+                self.daily[date_str] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    merged[index] += value
+        for name, values in summary['instruments'].items():
+            merged = self.instruments.get(name)
+            if merged is None:
+                self.instruments[name] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    merged[index] += value
+
+    @property
+    def trade_count(self):
+        return sum(summary['trade_count'] for summary in self.accounts)
+
+    @property
+    def total_profit(self):
+        return sum(values[0] for values in self.daily.values())
+
+    @property
+    def total_balance(self):
+        return sum(summary['capital'][0] for summary in self.accounts)
+
+    @property
+    def total_margin(self):
+        return sum(summary['capital'][1] for summary in self.accounts)
+
+def aggregate_accounts(paths, max_workers=None):
+    """在进程池中并行加载并汇总多个账户文件"""
+    report = BatchReport()
+    if not paths:
+        return report
+    # 进程池相关模块较大，只在批量汇总时才导入，不拖慢界面启动
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk_size = max(1, len(paths) // (workers * 4))
+        for summary, error in executor.map(_summarize_safely, paths, chunksize=chunk_size):
+            if error is not None:
+                report.errors.append(error)
+            else:
+                report.merge(summary)
+    return report
+
+def aggregate_directory(directory, max_workers=None):
+    return aggregate_accounts(find_account_files(directory), max_workers)
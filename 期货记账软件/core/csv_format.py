@@ -0,0 +1,76 @@
+import csv
+
+def format_capital_payload(trans):
+    return f"{trans[0]},{trans[1]},{trans[2]}"
+
+def format_trade_payload(trade):
+    return (
+        f"{trade['date']},{trade['name']},{trade['open_price']},"
+        f"{trade['close_price']},{trade['profit_per_point']},"
+        f"{trade['open_fee']},{trade['close_fee']},{trade['profit']}"
+    )
+
+def format_position_payload(lot):
+    name, side, date_str, open_price, lots, fee = lot
+    return f"{name},{side},{date_str},{open_price},{lots},{fee}"
+
+def parse_capital_payload(payload):
+    trans_type, amount, time = payload.split(',', 2)
+    return trans_type, float(amount), time
+
+def parse_trade_payload(payload):
+    trade_data = payload.split(',')
+    return {
+        'date': trade_data[0],
+        'name': trade_data[1],
+        'open_price': float(trade_data[2]),
+        'close_price': float(trade_data[3]),
+        'profit_per_point': float(trade_data[4]),
+        'open_fee': float(trade_data[5]),
+        'close_fee': float(trade_data[6]),
+        'profit': float(trade_data[7])
+    }
+
+def parse_position_payload(payload):
+    name, side, date_str, open_price, lots, fee = payload.split(',')
+    return name, int(side), date_str, float(open_price), int(lots), float(fee)
+
+def parse_data_rows(rows):
+    """解析数据文件中的行，返回 (资金记录列表, 交易记录列表, 未平仓的开仓列表)"""
+    capital_rows = []
+    trades = []
+    positions = []
+    for row in rows:
+        if not row:
+            continue
+        if row[0] == "capital":
+            capital_rows.append(parse_capital_payload(row[1]))
+        elif row[0] == "trade":
+            trades.append(parse_trade_payload(row[1]))
+        elif row[0] == "position":
+            positions.append(parse_position_payload(row[1]))
+    return capital_rows, trades, positions
+
+def read_csv(path):
+    """读取 CSV 数据文件，返回 (资金记录列表, 交易记录列表, 未平仓的开仓列表)"""
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # 跳过标题行
+        return parse_data_rows(reader)
+
+def write_csv(path, capital_manager, trade_recorder):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(["type", "data"])
+        
+        # 保存资金记录
+        for trans in capital_manager.transactions:
+            writer.writerow(["capital", format_capital_payload(trans)])
+        
+        # 保存交易记录
+        for trade in trade_recorder.trades:
+            writer.writerow(["trade", format_trade_payload(trade)])
+        
+        # 保存持仓
+        for lot in capital_manager.open_lots:
+            writer.writerow(["position", format_position_payload(lot)])
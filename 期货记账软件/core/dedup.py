@@ -0,0 +1,40 @@
+import struct
+from hashlib import blake2b
+
+_TRADE_NUMBERS = struct.Struct('<i6d')
+_CAPITAL_AMOUNT = struct.Struct('<d')
+
+def _digest(data):
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little')
+
+def trade_digest(ordinal, name, open_price, close_price, profit_per_point, open_fee, close_fee, profit):
+    """交易内容的稳定哈希（64 位），数值按 double 原样参与，5 与 5.0 视为相同"""
+    return _digest(_TRADE_NUMBERS.pack(ordinal, open_price, close_price, profit_per_point,
+                                       open_fee, close_fee, profit) + name.encode('utf-8'))
+
+def capital_digest(trans_type, amount, time):
+    return _digest(f"{trans_type}\x1f{time}".encode('utf-8') + _CAPITAL_AMOUNT.pack(amount))
+
+class ContentIndex:
+    """内容哈希 -> 账户中已有的条数
+
+    按多重集合去重：同一笔内容在导入文件中第 k 次出现、而账户中已有的不足 k 条时才算新记录，
+    这样同一天两笔完全相同的交易不会被误删，重复导入累计文件也不会多出记录。
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, digest):
+        self.counts[digest] = self.counts.get(digest, 0) + 1
+
+    def select_new(self, digests, seen):
+        """返回新记录在 digests 中的位置；seen 为本次导入内各哈希已出现的次数，跨批次共用"""
+        counts = self.counts
+        positions = []
+        for position, digest in enumerate(digests):
+            occurrence = seen.get(digest, 0) + 1
+            seen[digest] = occurrence
+            if occurrence > counts.get(digest, 0):
+                positions.append(position)
+        return positions
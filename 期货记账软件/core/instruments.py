@@ -0,0 +1,141 @@
+import csv
+import os
+import re
+from functools import lru_cache
+
+# 合约名称末尾的 3~4 位数字为交割月份，例如 沪铜2308、cu2308、SR309
+_CONTRACT_PATTERN = re.compile(r"^(.*?)\s*(\d{3,4})$")
+
+# 内置的合约规格表；环境变量 FUTURES_CONTRACTS 指向的文件按品种覆盖或补充其中的条目
+DEFAULT_CONTRACTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contracts.csv")
+CONTRACTS_ENV = "FUTURES_CONTRACTS"
+
+@lru_cache(maxsize=None)
+def product_root(name):
+    """从合约名称中取出品种，例如 沪铜2308 -> 沪铜；无法识别时返回原名称"""
+    name = name.strip()
+    match = _CONTRACT_PATTERN.match(name)
+    if match and match.group(1):
+        return match.group(1)
+    return name
+
+class ContractSpec:
+    """品种规格：合约乘数、最小变动价位、手续费（每手固定或按成交额比例，开仓/平仓/平今分列）、保证金率"""
+    __slots__ = ('product', 'names', 'multiplier', 'tick_size', 'fee_mode',
+                 'open_fee', 'close_fee', 'close_today_fee', 'margin_rate')
+    FEE_MODES = ("fixed", "rate")
+
+    def __init__(self, product, multiplier, tick_size=0.0, fee_mode="fixed", open_fee=0.0,
+                 close_fee=0.0, close_today_fee=0.0, margin_rate=0.0, names=()):
+        if fee_mode not in self.FEE_MODES:
+            raise ValueError(f"未知的手续费方式: {fee_mode}")
+        self.product = product
+        self.names = tuple(names)
+        self.multiplier = multiplier
+        self.tick_size = tick_size
+        self.fee_mode = fee_mode
+        self.open_fee = open_fee
+        self.close_fee = close_fee
+        self.close_today_fee = close_today_fee
+        self.margin_rate = margin_rate
+
+    def fee(self, price, lots=1, offset="open"):
+        """一笔成交的手续费；offset 为 open、close 或 close_today"""
+        if offset == "open":
+            value = self.open_fee
+        elif offset == "close_today":
+            value = self.close_today_fee
+        else:
+            value = self.close_fee
+        if self.fee_mode == "rate":
+            return price * self.multiplier * lots * value
+        return value * lots
+
+    def margin(self, price, lots=1):
+        return price * self.multiplier * lots * self.margin_rate
+
+class ContractRegistry:
+    """按品种索引的合约规格；品种代码不区分大小写，中文简称也可查。
+
+    合约名称到规格的解析结果按名称缓存，批量路径每个不同名称只解析一次。
+    """
+
+    def __init__(self, specs=()):
+        self.specs = {}
+        self._keys = {}
+        self._resolved = {}
+        for spec in specs:
+            self.add(spec)
+
+    def add(self, spec):
+        self.specs[spec.product] = spec
+        for key in (spec.product, *spec.names):
+            self._keys[key] = spec
+            self._keys[key.lower()] = spec
+        self._resolved.clear()
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs.values())
+
+    def get(self, name):
+        """按合约名称（如 cu2309、沪铜2308）或品种查规格，未知时返回 None"""
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        root = product_root(name)
+        keys = self._keys
+        spec = keys.get(name) or keys.get(root) or keys.get(root.lower())
+        self._resolved[name] = spec
+        return spec
+
+    def load(self, path):
+        """从 CSV 文件读入规格，同一品种以后读入的为准"""
+        with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+            for row in csv.DictReader(file):
+                self.add(ContractSpec(
+                    row['product'].strip(),
+                    float(row['multiplier']),
+                    float(row.get('tick_size') or 0),
+                    (row.get('fee_mode') or "fixed").strip(),
+                    float(row.get('open_fee') or 0),
+                    float(row.get('close_fee') or 0),
+                    float(row.get('close_today_fee') or 0),
+                    float(row.get('margin_rate') or 0),
+                    [name.strip() for name in (row.get('names') or "").split('|') if name.strip()],
+                ))
+        return self
+
+@lru_cache(maxsize=1)
+def default_registry():
+    """内置规格表加上 FUTURES_CONTRACTS 指定的本地文件，进程内只读取一次"""
+    registry = ContractRegistry().load(DEFAULT_CONTRACTS_PATH)
+    user_path = os.environ.get(CONTRACTS_ENV)
+    if user_path and os.path.exists(user_path):
+        registry.load(user_path)
+    return registry
+
+def contract_spec(name):
+    return default_registry().get(name)
+
+def contract_multiplier(name, overrides=None):
+    """合约乘数：先查 overrides（按合约名称或品种），再查规格表，未知时返回 None"""
+    if overrides:
+        root = product_root(name)
+        for key in (name, root, root.lower()):
+            if key in overrides:
+                return overrides[key]
+    spec = contract_spec(name)
+    return spec.multiplier if spec is not None else None
+
+def product_group(name, registry=None):
+    """合约所属品种的分组键：规格表中有的取规格的品种代码（沪铜2308 与 cu2309 同为 cu），没有的取 product_root"""
+    spec = (registry if registry is not None else default_registry()).get(name)
+    return spec.product if spec is not None else product_root(name)
+
+def missing_multipliers(names, overrides=None):
+    """返回缺少合约乘数的品种（去重并排序）"""
+    return sorted({product_root(name) for name in set(names) if contract_multiplier(name, overrides) is None})
@@ -0,0 +1,263 @@
+import csv
+import os
+import threading
+
+from .csv_format import (
+    format_capital_payload, format_position_payload, format_trade_payload, parse_capital_payload,
+    parse_position_payload, parse_trade_payload
+)
+
+class JournalStore:
+    """追加式日志账户：每次变动追加一条记录并定时 fsync，后台定期压缩为快照
+
+    快照与 save_data 导出的 CSV 格式相同，额外带有 seq 和 margin 行；
+    日志每行为 (序号, 类型, 数据)，打开时加载快照并只重放序号更大的日志记录；
+    update 记录按行号覆盖已有交易，重放完后统一重建一次聚合；
+    positions 记录在一行中给出全部持仓（以 ; 分隔）并整体替换，写了一半时不会只恢复部分持仓。
+    使用前必须先调用 load_into 或 save_from。read_only 为真时只读取：不修复日志末尾、不打开日志追加，
+    可用于读取另一个进程正在写入的账户。
+    """
+    FLUSH_INTERVAL = 1.0  # 秒
+    COMPACT_THRESHOLD = 10000  # 日志积累到这么多条记录后压缩
+    
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.journal_path = path + ".journal"
+        self.seq = 0
+        self.snapshot_seq = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+        self._dirty = False
+        self._closed = threading.Event()
+        self._flusher = None
+        self._compactor = None
+        self._capital_manager = None
+        self._trade_recorder = None
+        self._updated = False
+    
+    def _segment_paths(self):
+        # 压缩时轮换出来的旧日志，文件名后缀为其中最后一条记录的序号
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(self.journal_path) + "."
+        segments = []
+        for file_name in os.listdir(directory):
+            suffix = file_name[len(prefix):]
+            if file_name.startswith(prefix) and suffix.isdigit():
+                segments.append((int(suffix), os.path.join(directory, file_name)))
+        segments.sort()
+        return segments
+    
+    def is_empty(self):
+        if os.path.exists(self.path) or self._segment_paths():
+            return False
+        return not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0
+    
+    def _apply(self, record_type, payload):
+        if record_type == "capital":
+            self._capital_manager.restore_transaction(*parse_capital_payload(payload))
+        elif record_type == "trade":
+            self._trade_recorder.add_trade(parse_trade_payload(payload))
+        elif record_type == "margin":
+            self._capital_manager.margin = float(payload)
+        elif record_type == "position":
+            # 快照中每笔持仓一行
+            self._capital_manager.open_lots.append(parse_position_payload(payload))
+        elif record_type == "positions":
+            self._capital_manager.open_lots = [
+                parse_position_payload(item) for item in payload.split(';') if item
+            ]
+        elif record_type == "update":
+            row, payload = payload.split(',', 1)
+            trade = parse_trade_payload(payload)
+            store = self._trade_recorder.trades
+            for field in store.FLOAT_FIELDS:
+                store.set_values(field, (int(row),), (trade[field],))
+            self._updated = True
+    
+    def _replay(self, path):
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                try:
+                    seq = int(row[0])
+                    if seq > self.snapshot_seq:
+                        self._apply(row[1], row[2])
+                        self.seq = seq
+                except (ValueError, IndexError):
+                    # 崩溃时写了一半的最后一行
+                    break
+    
+    def _repair_journal_tail(self):
+        # 截掉末尾不完整的行，避免之后追加的记录与其拼在一起
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb+') as file:
+            data = file.read()
+            if data and not data.endswith(b"\n"):
+                file.truncate(data.rfind(b"\n") + 1)
+    
+    def load_into(self, capital_manager, trade_recorder):
+        self._capital_manager = capital_manager
+        self._trade_recorder = trade_recorder
+        if os.path.exists(self.path):
+            with open(self.path, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.reader(file)
+                next(reader, None)  # 跳过标题行
+                for row in reader:
+                    if row and row[0] == "seq":
+                        self.snapshot_seq = int(row[1])
+                    elif row:
+                        self._apply(row[0], row[1])
+        self.seq = self.snapshot_seq
+        if not self.read_only:
+            self._repair_journal_tail()
+        for _, segment_path in self._segment_paths():
+            self._replay(segment_path)
+        if os.path.exists(self.journal_path):
+            self._replay(self.journal_path)
+        if self._updated:
+            trade_recorder.rebuild_indexes()
+            self._updated = False
+        # 资金记录是逐条重放的，载入后一次建立按时间的快照
+        capital_manager.index_history()
+        if not self.read_only:
+            self._open_journal()
+    
+    def save_from(self, capital_manager, trade_recorder):
+        if self.read_only:
+            raise ValueError(f"日志账户以只读方式打开: {self.path}")
+        self._capital_manager = capital_manager
+        self._trade_recorder = trade_recorder
+        self._open_journal()
+        self._write_snapshot(self.seq, len(capital_manager.transactions),
+                             len(trade_recorder.trades), capital_manager.margin, capital_manager.open_lots)
+    
+    def _open_journal(self):
+        self._file = open(self.journal_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+    
+    def _append(self, record_type, payload):
+        if self._writer is None:
+            raise ValueError(f"日志账户未打开写入: {self.path}")
+        with self._lock:
+            self.seq += 1
+            self._writer.writerow([self.seq, record_type, payload])
+            self._dirty = True
+    
+    def _maybe_compact(self):
+        # 整批追加完成后才检查，保证压缩时内存状态与日志序号一致
+        if self.seq - self.snapshot_seq >= self.COMPACT_THRESHOLD:
+            self.compact()
+    
+    def add_trades(self, trades):
+        for trade in trades:
+            self._append("trade", format_trade_payload(trade))
+        self._maybe_compact()
+    
+    def update_trades(self, rows, trades):
+        for row, trade in zip(rows, trades):
+            self._append("update", f"{row},{format_trade_payload(trade)}")
+        self._maybe_compact()
+    
+    def add_capital(self, transactions):
+        for trans in transactions:
+            self._append("capital", format_capital_payload(trans))
+        self._maybe_compact()
+    
+    def set_margin(self, amount):
+        self._append("margin", amount)
+        self._maybe_compact()
+    
+    def set_positions(self, lots):
+        self._append("positions", ";".join(map(format_position_payload, lots)))
+        self._maybe_compact()
+    
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._file.flush()
+            self._dirty = False
+            fd = os.dup(self._file.fileno())
+        try:
+            # 在锁外 fsync，不阻塞界面线程的追加
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _flush_loop(self):
+        while not self._closed.wait(self.FLUSH_INTERVAL):
+            self.flush()
+    
+    def compact(self):
+        """把当前日志轮换出去，并在后台线程把轮换出的日志落盘、把内存中的状态写成新快照
+
+        调用线程只在锁内做 flush、改名和重新打开，不等待 fsync。
+        """
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if self.seq == self.snapshot_seq:
+            return
+        with self._lock:
+            self._file.flush()
+            self._file.close()
+            seq = self.seq
+            segment_path = f"{self.journal_path}.{seq}"
+            os.replace(self.journal_path, segment_path)
+            self._file = open(self.journal_path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._dirty = False
+            # 数据只会追加，记下当前长度即可在后台安全读取
+            capital_count = len(self._capital_manager.transactions)
+            trade_count = len(self._trade_recorder.trades)
+            margin = self._capital_manager.margin
+            # 持仓列表整体替换、不原地修改，保留当前的引用即可
+            open_lots = self._capital_manager.open_lots
+        self._compactor = threading.Thread(
+            target=self._compact_segment,
+            args=(segment_path, seq, capital_count, trade_count, margin, open_lots), daemon=True
+        )
+        self._compactor.start()
+    
+    def _compact_segment(self, segment_path, seq, capital_count, trade_count, margin, open_lots):
+        # 快照写成之前轮换出的日志必须先落盘
+        with open(segment_path, 'rb') as file:
+            os.fsync(file.fileno())
+        self._write_snapshot(seq, capital_count, trade_count, margin, open_lots)
+    
+    def _write_snapshot(self, seq, capital_count, trade_count, margin, open_lots):
+        transactions = self._capital_manager.transactions
+        trades = self._trade_recorder.trades
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["type", "data"])
+            writer.writerow(["seq", seq])
+            writer.writerow(["margin", margin])
+            for index in range(capital_count):
+                writer.writerow(["capital", format_capital_payload(transactions[index])])
+            for index in range(trade_count):
+                writer.writerow(["trade", format_trade_payload(trades[index])])
+            for lot in open_lots:
+                writer.writerow(["position", format_position_payload(lot)])
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self.snapshot_seq = seq
+        for segment_seq, segment_path in self._segment_paths():
+            if segment_seq <= seq:
+                os.remove(segment_path)
+    
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
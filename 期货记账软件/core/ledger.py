@@ -0,0 +1,600 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import datetime, date, timedelta
+from itertools import accumulate, compress, islice, repeat
+from operator import itemgetter, le, mul, ne, not_, sub
+
+from .dedup import ContentIndex, capital_digest, trade_digest
+from .instruments import product_group
+from .performance import PerformanceStats
+from .profiling import timed
+from .rollups import DateRangeIndex, period_ranges
+
+# 资金记录的类型：入金、出金改变入金净额，保证金记录保证金占用的变化（金额为变化后的占用）
+DEPOSIT, WITHDRAW, MARGIN = "入金", "出金", "保证金"
+_CASH_TYPES = (DEPOSIT, WITHDRAW)
+
+class CapitalManager:
+    """资金账户：资金记录（入金、出金、保证金变化）按发生顺序追加，是唯一的数据来源
+
+    总资金 = 入金净额 + 关联的 TradeRecorder 中已实现的盈亏（已扣手续费）。
+    按时间排序的资金记录每 SNAPSHOT_INTERVAL 条存一个 (入金净额, 保证金) 快照，
+    任意时点的状态为一次二分查找加至多 SNAPSHOT_INTERVAL - 1 条记录的重放。快照在整块载入时
+    （restore_transactions、日志账户载入后）按列一次建立，逐条追加的记录在下次查询历史时补齐；补录了更早的记录时整体重建。
+    """
+    SNAPSHOT_INTERVAL = 256
+    
+    def __init__(self, trade_recorder=None):
+        self.cash = 0.0
+        self.margin = 0.0
+        self.trade_recorder = trade_recorder
+        # 未平仓的开仓（格式同 PositionBook.open_lots），随账户保存；整体替换，不原地修改
+        self.open_lots = []
+        self.transactions = []
+        # 资金记录的内容哈希索引，首次去重时建立，之后只补新增的记录
+        self._content_index = ContentIndex()
+        self._indexed = 0
+        # 按时间排序的记录位置、对应时间及快照，见 index_history
+        self._history_order = []
+        self._history_times = []
+        self._snapshot_cash = array('d')
+        self._snapshot_margin = array('d')
+        self._history_indexed = 0
+    
+    @property
+    def balance(self):
+        return self.cash + self.realized_profit()
+    
+    def realized_profit(self):
+        if self.trade_recorder is None:
+            return 0.0
+        return self.trade_recorder.performance.total_profit
+    
+    def deposit(self, amount):
+        if amount > 0:
+            self.cash += amount
+            self.transactions.append((DEPOSIT, amount, datetime.now().strftime("%Y-%m-%d %H:%M")))
+            return True
+        return False
+    
+    def withdraw(self, amount):
+        if 0 < amount <= self.balance:
+            self.cash -= amount
+            self.transactions.append((WITHDRAW, -amount, datetime.now().strftime("%Y-%m-%d %H:%M")))
+            return True
+        return False
+    
+    def set_margin(self, amount):
+        balance = self.balance
+        if amount <= balance:
+            self.margin = amount
+            self.transactions.append((MARGIN, amount, datetime.now().strftime("%Y-%m-%d %H:%M")))
+            # 计算保证金占用比例
+            ratio = (self.margin / balance) * 100 if balance > 0 else 0
+            # 检查风险
+            if balance > 0 and ratio >= 80:
+                return True, f"请注意风险：保证金占用{ratio:.1f}%！"
+            return True, ""
+        return False, "保证金金额不能超过总资金"
+    
+    def restore_transaction(self, trans_type, amount, time):
+        # 从文件恢复的记录，金额已带符号（出金为负数）
+        self.transactions.append((trans_type, amount, time))
+        if trans_type in _CASH_TYPES:
+            self.cash += amount
+        elif trans_type == MARGIN:
+            self.margin = amount
+    
+    def restore_transactions(self, transactions):
+        """整块恢复资金记录，金额在 C 层一次求和，不逐条重放；同时建立按时间的快照，载入后首次查询历史不再扫描全部记录"""
+        start = len(self.transactions)
+        self.transactions.extend(transactions)
+        added = self.transactions[start:]
+        self.cash += math.fsum(amount for trans_type, amount, _ in added if trans_type in _CASH_TYPES)
+        for trans_type, amount, _ in reversed(added):
+            if trans_type == MARGIN:
+                self.margin = amount
+                break
+        self.index_history()
+    
+    def unseen(self, transactions, seen=None):
+        """返回账户中尚未有的资金记录（按内容哈希的多重集合比较）；seen 在同一次导入的各批之间共用"""
+        for trans_type, amount, time in self.transactions[self._indexed:]:
+            self._content_index.add(capital_digest(trans_type, float(amount), time))
+        self._indexed = len(self.transactions)
+        transactions = list(transactions)
+        digests = [capital_digest(trans_type, float(amount), time)
+                   for trans_type, amount, time in transactions]
+        positions = self._content_index.select_new(digests, {} if seen is None else seen)
+        return [transactions[position] for position in positions]
+    
+    def available_balance(self):
+        return self.balance - self.margin
+    
+    def margin_ratio(self):
+        balance = self.balance
+        if balance <= 0:
+            return 0
+        return (self.margin / balance) * 100
+    
+    def index_history(self):
+        """建立或补齐按时间的快照；逐条恢复大量记录后调用，首次查询历史时不必扫描全部记录"""
+        transactions = self.transactions
+        count = len(transactions)
+        start = self._history_indexed
+        if start >= count:
+            return
+        times = self._history_times
+        new_times = list(map(itemgetter(2), transactions[start:]))
+        if start and min(new_times) < times[-1]:
+            # 补录了更早的记录，整体重排并重建快照
+            all_times = list(map(itemgetter(2), transactions))
+            order = sorted(range(count), key=all_times.__getitem__)
+            self._history_order = order
+            self._history_times = list(map(all_times.__getitem__, order))
+            self._snapshot_cash = array('d')
+            self._snapshot_margin = array('d')
+        elif all(map(le, new_times, islice(new_times, 1, None))):
+            # 通常按时间追加，不必排序
+            self._history_order.extend(range(start, count))
+            times.extend(new_times)
+        else:
+            order = sorted(range(len(new_times)), key=new_times.__getitem__)
+            self._history_order.extend(map(start.__add__, order))
+            times.extend(map(new_times.__getitem__, order))
+        
+        # 从最后一个快照按列累计到末尾：第 k 个快照为按时间排序的前 k * SNAPSHOT_INTERVAL 条记录之后的状态
+        interval = self.SNAPSHOT_INTERVAL
+        snapshots = len(self._snapshot_cash)
+        if snapshots:
+            cash, margin = self._snapshot_cash[-1], self._snapshot_margin[-1]
+            position = (snapshots - 1) * interval
+        else:
+            cash, margin, position = 0.0, 0.0, 0
+        records = list(map(transactions.__getitem__, self._history_order[position:count]))
+        types = list(map(itemgetter(0), records))
+        rows = range(len(records))
+        margin_rows = list(compress(rows, map(MARGIN.__eq__, types)))
+        # 只有入金出金计入入金净额的累计和，保证金记录的金额是变化后的占用
+        amounts = list(map(itemgetter(1), records))
+        for row in compress(rows, map(not_, map(_CASH_TYPES.__contains__, types))):
+            amounts[row] = 0.0
+        cash_totals = list(accumulate(amounts, initial=cash))
+        for offset in range(len(self._snapshot_cash) * interval - position, count - position, interval):
+            self._snapshot_cash.append(cash_totals[offset])
+            # 快照点之前最后一条保证金记录
+            found = bisect_left(margin_rows, offset)
+            self._snapshot_margin.append(records[margin_rows[found - 1]][1] if found else margin)
+        self._history_indexed = count
+    
+    def state_at(self, moment):
+        """moment（YYYY-MM-DD 表示当日结束，或 YYYY-MM-DD HH:MM）时的 (入金净额, 已实现盈亏, 手续费, 保证金)
+
+        已实现盈亏和手续费按交易日期计，包含 moment 当日的交易；格式不对时抛出 ValueError。
+        """
+        moment = moment.strip()
+        self.index_history()
+        if len(moment) == 10:
+            day = datetime.strptime(moment, "%Y-%m-%d").date()
+            # 当日结束：时间早于次日零点（"YYYY-MM-DD" 排在同一天所有 "YYYY-MM-DD HH:MM" 之前）
+            end = bisect_left(self._history_times, (day + timedelta(days=1)).isoformat())
+        else:
+            parsed = datetime.strptime(moment, "%Y-%m-%d %H:%M")
+            day = parsed.date()
+            end = bisect_right(self._history_times, parsed.strftime("%Y-%m-%d %H:%M"))
+        cash = margin = 0.0
+        if end:
+            # 最近的快照之后最多重放 SNAPSHOT_INTERVAL - 1 条
+            snapshot = min((end - 1) // self.SNAPSHOT_INTERVAL, len(self._snapshot_cash) - 1)
+            cash, margin = self._snapshot_cash[snapshot], self._snapshot_margin[snapshot]
+            transactions = self.transactions
+            for index in self._history_order[snapshot * self.SNAPSHOT_INTERVAL:end]:
+                trans_type, amount, _ = transactions[index]
+                if trans_type in _CASH_TYPES:
+                    cash += amount
+                elif trans_type == MARGIN:
+                    margin = amount
+        profit = fees = 0.0
+        if self.trade_recorder is not None and self.trade_recorder.range_index.size:
+            ordinal = day.toordinal()
+            summary = self.trade_recorder.range_summary(self.trade_recorder.range_index.base, ordinal)
+            profit, fees = summary['profit'], summary['fees']
+        return cash, profit, fees, margin
+    
+    def balance_at(self, moment):
+        cash, profit, _, _ = self.state_at(moment)
+        return cash + profit
+
+class TradeRow(Mapping):
+    """列式存储中单条交易的只读行视图，用法与原来的交易字典一致"""
+    __slots__ = ('_store', '_index')
+    
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+    
+    def __getitem__(self, key):
+        return self._store.get_value(self._index, key)
+    
+    def __iter__(self):
+        return iter(TradeStore.FIELDS)
+    
+    def __len__(self):
+        return len(TradeStore.FIELDS)
+
+def _copy_to_array(typecode, values):
+    result = array(typecode)
+    result.frombytes(memoryview(values).cast('B'))
+    return result
+
+class TradeStore:
+    """列式交易存储：数值列用 array，日期存为整数序数，名称做字典编码"""
+    FIELDS = ('date', 'name', 'open_price', 'close_price', 'profit_per_point',
+              'open_fee', 'close_fee', 'profit')
+    FLOAT_FIELDS = FIELDS[2:]
+    
+    def __init__(self):
+        self.dates = array('i')
+        self.name_ids = array('i')
+        self.columns = {field: array('d') for field in self.FLOAT_FIELDS}
+        # 名称字典及日期换算缓存
+        self.names = []
+        self._name_ids = {}
+        self._date_ordinals = {}
+        self._date_strings = {}
+        # 从快照映射加载时各列是只读的 memoryview，首次追加前才复制成 array
+        self.mapped_path = None
+    
+    @classmethod
+    def from_columns(cls, dates, name_ids, columns, names, mapped_path=None):
+        store = cls()
+        store.dates = dates
+        store.name_ids = name_ids
+        store.columns = columns
+        store.names = list(names)
+        store._name_ids = {name: index for index, name in enumerate(store.names)}
+        store.mapped_path = mapped_path
+        return store
+    
+    def materialize(self):
+        if self.mapped_path is None:
+            return
+        self.dates = _copy_to_array('i', self.dates)
+        self.name_ids = _copy_to_array('i', self.name_ids)
+        self.columns = {field: _copy_to_array('d', column) for field, column in self.columns.items()}
+        self.mapped_path = None
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def __iter__(self):
+        for index in range(len(self.dates)):
+            yield TradeRow(self, index)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TradeRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("交易索引超出范围")
+        return TradeRow(self, index)
+    
+    def intern_name(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+        return name_id
+    
+    def date_ordinal(self, date_str):
+        ordinal = self._date_ordinals.get(date_str)
+        if ordinal is None:
+            ordinal = datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+            self._date_ordinals[date_str] = ordinal
+        return ordinal
+    
+    def date_string(self, ordinal):
+        date_str = self._date_strings.get(ordinal)
+        if date_str is None:
+            date_str = date.fromordinal(ordinal).strftime("%Y-%m-%d")
+            self._date_strings[ordinal] = date_str
+        return date_str
+    
+    def append(self, trade):
+        self.materialize()
+        # array 的 append 是摊还 O(1) 的，不会每次复制整列
+        self.dates.append(self.date_ordinal(trade['date']))
+        self.name_ids.append(self.intern_name(trade['name']))
+        for field, column in self.columns.items():
+            column.append(float(trade[field]))
+    
+    def extend_rows(self, rows):
+        """整块追加按 FIELDS 顺序排列的行（元组），各列一次扩展；调用方随后重建聚合"""
+        if not rows:
+            return
+        self.materialize()
+        dates, names, *values = zip(*rows)
+        self.dates.extend(map(self.date_ordinal, dates))
+        self.name_ids.extend(map(self.intern_name, names))
+        for field, column in zip(self.FLOAT_FIELDS, values):
+            self.columns[field].extend(map(float, column))
+    
+    def set_values(self, field, rows, values):
+        """把 values 依次写入 field 列的 rows 行"""
+        self.materialize()
+        column = self.columns[field]
+        if isinstance(rows, range) and rows.step == 1:
+            column[rows.start:rows.stop] = array('d', values)
+            return
+        for row, value in zip(rows, values):
+            column[row] = value
+    
+    def get_value(self, index, field):
+        if field == 'date':
+            return self.date_string(self.dates[index])
+        if field == 'name':
+            return self.names[self.name_ids[index]]
+        return self.columns[field][index]
+
+class GroupStats:
+    """盈亏聚合：盈亏合计、笔数、盈利笔数、亏损笔数、手续费；按日、按合约、按品种共用"""
+    __slots__ = ('profit', 'count', 'wins', 'losses', 'fees')
+    
+    def __init__(self):
+        self.profit = 0.0
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.fees = 0.0
+    
+    def add(self, profit, fees):
+        self.profit += profit
+        self.count += 1
+        if profit > 0:
+            self.wins += 1
+        elif profit < 0:
+            self.losses += 1
+        self.fees += fees
+    
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0.0
+
+class TradeRecorder:
+    def __init__(self, registry=None):
+        """registry: 合约规格表，用于把合约归入品种（默认内置规格表）"""
+        self.registry = registry
+        self.trades = TradeStore()
+        # 日期序数 -> GroupStats，每次添加交易时 O(1) 更新
+        self.daily_stats = {}
+        # (年, 月) -> 当月有交易的日期序数，供日历只渲染显示的月份
+        self.month_days = {}
+        # 按日期的累计和，任意区间汇总 O(log n)
+        self.range_index = DateRangeIndex()
+        # 按合约、按品种（见 product_group）的汇总，以及每个品种的交易行号
+        self.instrument_stats = {}
+        self.product_stats = {}
+        self.product_rows = {}
+        self._name_products = []
+        # 权益曲线与绩效统计
+        self.performance = PerformanceStats()
+        # 交易内容哈希索引，首次去重时建立，之后只补新增的行
+        self._content_index = ContentIndex()
+        self._indexed = 0
+    
+    def _product_of(self, name_id):
+        # 名称已字典编码，每个名称只解析一次品种
+        names = self.trades.names
+        while len(self._name_products) < len(names):
+            self._name_products.append(product_group(names[len(self._name_products)], self.registry))
+        return self._name_products[name_id]
+    
+    def _add_to_groups(self, row, name_id, profit, fees):
+        name = self.trades.names[name_id]
+        stats = self.instrument_stats.get(name)
+        if stats is None:
+            stats = self.instrument_stats[name] = GroupStats()
+        stats.add(profit, fees)
+        product = self._product_of(name_id)
+        stats = self.product_stats.get(product)
+        if stats is None:
+            stats = self.product_stats[product] = GroupStats()
+            self.product_rows[product] = array('i')
+        stats.add(profit, fees)
+        self.product_rows[product].append(row)
+    
+    def _new_day(self, ordinal):
+        stats = self.daily_stats[ordinal] = GroupStats()
+        day = date.fromordinal(ordinal)
+        self.month_days.setdefault((day.year, day.month), []).append(ordinal)
+        return stats
+    
+    @timed("TradeRecorder.add_trade")
+    def add_trade(self, trade_data):
+        self.trades.append(trade_data)
+        ordinal = self.trades.dates[-1]
+        stats = self.daily_stats.get(ordinal)
+        new_day = stats is None
+        if new_day:
+            stats = self._new_day(ordinal)
+        columns = self.trades.columns
+        profit = columns['profit'][-1]
+        fees = columns['open_fee'][-1] + columns['close_fee'][-1]
+        self.performance.add(profit, ordinal, stats.profit, new_day)
+        stats.add(profit, fees)
+        self.range_index.add(ordinal, profit, fees, 1, 1 if profit > 0 else 0)
+        self._add_to_groups(len(self.trades) - 1, self.trades.name_ids[-1], profit, fees)
+    
+    def add_trades(self, trades):
+        """批量加入交易（如导入成交明细），各聚合仍逐笔 O(1) 更新"""
+        for trade in trades:
+            self.add_trade(trade)
+    
+    def unseen(self, trades, seen=None):
+        """返回尚未记录的交易（按内容哈希的多重集合比较），每行 O(1)；seen 在同一次导入的各批之间共用"""
+        store = self.trades
+        columns = store.columns
+        start = self._indexed
+        for row in range(start, len(store)):
+            self._content_index.add(trade_digest(
+                store.dates[row], store.names[store.name_ids[row]],
+                *(columns[field][row] for field in TradeStore.FLOAT_FIELDS)
+            ))
+        self._indexed = len(store)
+        trades = list(trades)
+        digests = [
+            trade_digest(store.date_ordinal(trade['date']), trade['name'],
+                         *(float(trade[field]) for field in TradeStore.FLOAT_FIELDS))
+            for trade in trades
+        ]
+        positions = self._content_index.select_new(digests, {} if seen is None else seen)
+        return [trades[position] for position in positions]
+    
+    def rebuild_indexes(self):
+        """由交易列重建所有聚合索引，用于整块载入（如快照）之后"""
+        self._content_index = ContentIndex()
+        self._indexed = 0
+        self.daily_stats = {}
+        self.month_days = {}
+        self.instrument_stats = {}
+        self.product_stats = {}
+        self.product_rows = {}
+        columns = self.trades.columns
+        for row, (ordinal, name_id, profit, open_fee, close_fee) in enumerate(zip(
+                self.trades.dates, self.trades.name_ids, columns['profit'],
+                columns['open_fee'], columns['close_fee'])):
+            fees = open_fee + close_fee
+            stats = self.daily_stats.get(ordinal)
+            if stats is None:
+                stats = self._new_day(ordinal)
+            stats.add(profit, fees)
+            self._add_to_groups(row, name_id, profit, fees)
+        self.range_index = DateRangeIndex()
+        for ordinal, stats in self.daily_stats.items():
+            self.range_index.add(ordinal, stats.profit, stats.fees, stats.count, stats.wins)
+        self.performance = PerformanceStats.from_columns(
+            columns['profit'], self.trades.dates, [stats.profit for stats in self.daily_stats.values()]
+        )
+    
+    def get_daily_stats(self, date_str):
+        try:
+            ordinal = self.trades.date_ordinal(date_str)
+        except ValueError:
+            return None
+        return self.daily_stats.get(ordinal)
+    
+    def calculate_daily_profit(self, date_str=None):
+        if date_str is None:
+            date_str = datetime.now().strftime("%Y-%m-%d")
+        stats = self.get_daily_stats(date_str)
+        return stats.profit if stats is not None else 0.0
+    
+    def date_bounds(self):
+        """返回 (最早, 最晚) 交易日期序数，没有交易时返回 None"""
+        if not self.daily_stats:
+            return None
+        return min(self.daily_stats), max(self.daily_stats)
+    
+    def range_summary(self, start_ordinal, end_ordinal):
+        return self.range_index.query(start_ordinal, end_ordinal)
+    
+    def rollup(self, period, start_ordinal=None, end_ordinal=None):
+        """按周/月/年/自定义区间汇总，返回 [(名称, {profit, fees, count, wins})]"""
+        bounds = self.date_bounds()
+        if bounds is None:
+            return []
+        start_ordinal = bounds[0] if start_ordinal is None else start_ordinal
+        end_ordinal = bounds[1] if end_ordinal is None else end_ordinal
+        return [(label, self.range_index.query(start, end))
+                for label, start, end in period_ranges(period, start_ordinal, end_ordinal)]
+    
+    def select_rows(self, product=None, start_ordinal=None, end_ordinal=None):
+        """按品种和日期区间（含两端）选出行号；条件都为空时为全部行"""
+        if product is not None:
+            # 品种可用代码或简称（cu、CU、沪铜），代码不区分大小写
+            key = product_group(product.strip(), self.registry).lower()
+            groups = [rows for root, rows in self.product_rows.items() if root.lower() == key]
+            rows = groups[0] if len(groups) == 1 else array('i', sorted(
+                row for group in groups for row in group))
+        else:
+            rows = range(len(self.trades))
+        if start_ordinal is None and end_ordinal is None:
+            return rows
+        low = start_ordinal if start_ordinal is not None else -(1 << 31)
+        high = end_ordinal if end_ordinal is not None else (1 << 31) - 1
+        dates = self.trades.dates
+        return array('i', compress(rows, [low <= dates[row] <= high for row in rows]))
+    
+    @timed("TradeRecorder.recompute_profits")
+    def recompute_profits(self, rows, multiplier_scale=1.0, registry=None):
+        """由价格、每点盈利和手续费重新计算所选行的盈亏，各列整体计算一次，最后统一重建聚合
+
+        multiplier_scale: 每点盈利乘以该系数，用于修正录错的合约乘数（新乘数 / 原乘数）
+        registry: 合约规格表，给出时按规格重算开平仓手续费（手数 = 每点盈利 / 合约乘数，平仓按普通平仓费率）
+        返回有变化的行号
+        """
+        store = self.trades
+        columns = store.columns
+        def gather(field):
+            return list(map(columns[field].__getitem__, rows))
+        
+        open_prices = gather('open_price')
+        close_prices = gather('close_price')
+        per_points = gather('profit_per_point')
+        if multiplier_scale != 1.0:
+            per_points = list(map(mul, per_points, repeat(multiplier_scale)))
+        if registry is not None:
+            # 每个名称只查一次规格
+            specs = [registry.get(name) for name in store.names]
+            row_specs = list(map(specs.__getitem__, map(store.name_ids.__getitem__, rows)))
+            open_fees, close_fees = [], []
+            for spec, open_price, close_price, per_point, old_open, old_close in zip(
+                    row_specs, open_prices, close_prices, per_points,
+                    gather('open_fee'), gather('close_fee')):
+                if spec is None or not spec.multiplier:
+                    open_fees.append(old_open)
+                    close_fees.append(old_close)
+                    continue
+                lots = abs(per_point) / spec.multiplier
+                open_fees.append(round(spec.fee(open_price, lots, "open"), 2))
+                close_fees.append(round(spec.fee(close_price, lots, "close"), 2))
+        else:
+            open_fees = gather('open_fee')
+            close_fees = gather('close_fee')
+        
+        profits = list(map(sub, map(sub, map(mul, map(sub, close_prices, open_prices), per_points),
+                                        open_fees), close_fees))
+        old = zip(gather('profit'), gather('open_fee'), gather('close_fee'), gather('profit_per_point'))
+        new = zip(profits, open_fees, close_fees, per_points)
+        changed = array('i', compress(rows, map(ne, old, new)))
+        if not changed:
+            return changed
+        
+        store.set_values('profit_per_point', rows, per_points)
+        store.set_values('open_fee', rows, open_fees)
+        store.set_values('close_fee', rows, close_fees)
+        store.set_values('profit', rows, profits)
+        self.rebuild_indexes()
+        return changed
+    
+    def product_trades(self, product):
+        """返回某个品种（例如 沪铜 或 cu）的全部交易行"""
+        return [self.trades[row] for row in self.select_rows(product)]
+    
+    def leaderboard(self, by_product=True):
+        """按盈亏从高到低排列的 [(品种或合约, GroupStats)]"""
+        groups = self.product_stats if by_product else self.instrument_stats
+        return sorted(groups.items(), key=lambda item: item[1].profit, reverse=True)
+    
+    def get_month_profits(self, year, month):
+        """返回指定月份每个交易日的 (日期序数, 盈亏)"""
+        return [(ordinal, self.daily_stats[ordinal].profit)
+                for ordinal in self.month_days.get((year, month), ())]
+    
+    def get_daily_profits(self):
+        date_string = self.trades.date_string
+        return {date_string(ordinal): stats.profit for ordinal, stats in self.daily_stats.items()}
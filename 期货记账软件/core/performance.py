@@ -0,0 +1,194 @@
+import math
+from array import array
+from itertools import accumulate, chain, repeat
+from operator import mul, sub
+
+class PerformanceStats:
+    """已实现盈亏的权益曲线（累计盈亏）、最大回撤和绩效指标
+
+    曲线按交易日期排列，同一天内按录入顺序。曲线只含已实现盈亏、不含入金出金：出入金不是交易表现，
+    计入后出金会表现为回撤（任意时点的总资金见 CapitalManager.balance_at）。
+    交易按日期顺序到达时每笔 O(1) 追加并更新回撤；补录更早日期的交易只把曲线标记为过期，
+    下次读取曲线或回撤时按日期整体重排一次。单笔盈亏的均值和方差在线用 Welford 算法更新，
+    整块载入时 from_columns 先求均值再求离差平方和，两条路径数值一致。
+    """
+    TRADING_DAYS = 252
+
+    def __init__(self):
+        # 按录入顺序的日期序数和盈亏，曲线过期时据此按日期重排
+        self._ordinals = array('i')
+        self._profits = array('d')
+        self._equity = array('d')
+        # 已加入的最晚日期，早于它的交易到达时曲线过期
+        self._max_ordinal = None
+        self._peak = 0.0
+        self._max_drawdown = 0.0
+        self._stale = False
+        self.total_profit = 0.0
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        # 每日盈亏的个数，以及减去首日盈亏后的和与平方和（移位后相消误差小），用于计算夏普比率
+        self.day_count = 0
+        self._day_shift = 0.0
+        self._day_sum = 0.0
+        self._day_sumsq = 0.0
+
+    def add(self, profit, ordinal, day_before=0.0, new_day=False):
+        """加入一笔交易；ordinal 为交易日期序数，day_before 为该交易日此前的盈亏合计"""
+        in_order = self._max_ordinal is None or ordinal >= self._max_ordinal
+        if in_order:
+            self._max_ordinal = ordinal
+        self._ordinals.append(ordinal)
+        self._profits.append(profit)
+        self.total_profit += profit
+        self.count += 1
+        delta = profit - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (profit - self.mean)
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        elif profit < 0:
+            self.losses += 1
+            self.gross_loss -= profit
+
+        if not in_order:
+            self._stale = True
+        elif not self._stale:
+            total = (self._equity[-1] if self._equity else 0.0) + profit
+            self._equity.append(total)
+            if total > self._peak:
+                self._peak = total
+            elif self._peak - total > self._max_drawdown:
+                self._max_drawdown = self._peak - total
+
+        if new_day:
+            self.day_count += 1
+            if self.day_count == 1:
+                self._day_shift = profit
+        day_before -= self._day_shift
+        day_after = day_before + profit
+        if new_day:
+            self._day_sum += day_after
+            self._day_sumsq += day_after * day_after
+        else:
+            self._day_sum += profit
+            self._day_sumsq += day_after * day_after - day_before * day_before
+
+    def _rebuild_curve(self):
+        # 稳定排序：同一天的交易保持录入顺序
+        order = sorted(range(len(self._ordinals)), key=self._ordinals.__getitem__)
+        self._equity = array('d', accumulate(map(self._profits.__getitem__, order)))
+        curve = list(chain((0.0,), self._equity))
+        self._peak = max(curve)
+        self._max_drawdown = max(map(sub, accumulate(curve, max), curve))
+        self._stale = False
+
+    @classmethod
+    def from_columns(cls, profits, ordinals, daily_profits):
+        """由整列盈亏、对应的日期序数和每日盈亏一次性计算（循环都在 C 层完成）"""
+        stats = cls()
+        count = len(profits)
+        if not count:
+            return stats
+        stats._profits = profits = array('d', profits)
+        stats._ordinals = array('i', ordinals)
+        stats._max_ordinal = max(stats._ordinals)
+        stats.count = count
+        stats.wins = sum(map((0.0).__lt__, profits))
+        stats.losses = sum(map((0.0).__gt__, profits))
+        stats.gross_profit = math.fsum(filter((0.0).__lt__, profits))
+        stats.gross_loss = -math.fsum(filter((0.0).__gt__, profits))
+        stats.total_profit = math.fsum(profits)
+        stats.mean = stats.total_profit / count
+        # 两遍法：先求均值再求离差平方和，避免平方和减去和的平方时的相消误差
+        deviations = list(map(sub, profits, repeat(stats.mean, count)))
+        stats._m2 = math.fsum(map(mul, deviations, deviations))
+        stats._rebuild_curve()
+
+        daily_profits = list(daily_profits)
+        stats.day_count = len(daily_profits)
+        if daily_profits:
+            stats._day_shift = daily_profits[0]
+            shifted = list(map(sub, daily_profits, repeat(stats._day_shift, len(daily_profits))))
+            stats._day_sum = math.fsum(shifted)
+            stats._day_sumsq = math.fsum(map(mul, shifted, shifted))
+        return stats
+
+    @property
+    def equity(self):
+        """按日期排列的累计盈亏"""
+        if self._stale:
+            self._rebuild_curve()
+        return self._equity
+
+    @property
+    def peak(self):
+        if self._stale:
+            self._rebuild_curve()
+        return self._peak
+
+    @property
+    def max_drawdown(self):
+        if self._stale:
+            self._rebuild_curve()
+        return self._max_drawdown
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0.0
+
+    @property
+    def profit_factor(self):
+        if self.gross_loss == 0:
+            return math.inf if self.gross_profit > 0 else 0.0
+        return self.gross_profit / self.gross_loss
+
+    @property
+    def average_win(self):
+        return self.gross_profit / self.wins if self.wins else 0.0
+
+    @property
+    def average_loss(self):
+        return -self.gross_loss / self.losses if self.losses else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def current_drawdown(self):
+        equity = self.equity
+        return self.peak - (equity[-1] if equity else 0.0)
+
+    @property
+    def sharpe(self):
+        """按每日盈亏计算并年化的类夏普比率（不扣无风险收益）"""
+        if self.day_count < 2:
+            return 0.0
+        shifted_mean = self._day_sum / self.day_count
+        variance = self._day_sumsq / self.day_count - shifted_mean * shifted_mean
+        if variance <= 0:
+            return 0.0
+        return (shifted_mean + self._day_shift) / math.sqrt(variance) * math.sqrt(self.TRADING_DAYS)
+
+def downsample_minmax(values, buckets):
+    """把序列压缩到约 2*buckets 个点，每段保留最小值和最大值，返回 [(下标, 值)]"""
+    count = len(values)
+    if count <= buckets * 2:
+        return list(enumerate(values))
+    view = memoryview(values) if isinstance(values, array) else values
+    points = []
+    for bucket in range(buckets):
+        start = bucket * count // buckets
+        end = (bucket + 1) * count // buckets
+        chunk = view[start:end]
+        low, high = min(chunk), max(chunk)
+        points.append((start, low))
+        points.append((end - 1, high))
+    return points
@@ -0,0 +1,174 @@
+import math
+from array import array
+from operator import mul, sub
+
+from .instruments import contract_multiplier
+
+OPEN, CLOSE, CLOSE_TODAY, CLOSE_YESTERDAY = "open", "close", "close_today", "close_yesterday"
+
+class PositionBook:
+    """持仓簿：按 (合约, 方向) 记录未平仓的开仓，平仓时先进先出配对
+
+    平今只配当日开仓、平昨只配此前开仓，其余平仓按开仓先后；每一段配对生成一条交易记录，
+    给出 trade_recorder 时立即记入。开仓按列存放（合约编号、方向、开仓日期、开仓价、剩余手数、
+    每手开仓费、每点盈利），盯市时在整列上一次算出所有开仓的浮动盈亏。
+    """
+    # 已平完的开仓超过这么多且多于未平的时压缩各列
+    COMPACT_THRESHOLD = 256
+
+    def __init__(self, trade_recorder=None, multipliers=None):
+        self.trade_recorder = trade_recorder
+        self.multipliers = multipliers
+        self.names = []
+        self._name_ids = {}
+        self._factors = []
+        # 各合约最近的盯市价，未盯市时为首笔开仓价
+        self.last_prices = array('d')
+        self.name_ids = array('i')
+        self.sides = array('i')
+        self.dates = []
+        self.open_prices = array('d')
+        self.lots = array('i')
+        self.fees_per_lot = array('d')
+        # 方向 × 合约乘数 × 剩余手数，平仓时随剩余手数更新
+        self.sizes = array('d')
+        # (合约编号, 方向) -> 按开仓先后排列的行号
+        self._queues = {}
+        self._closed = 0
+
+    def _name_id(self, name, price):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            factor = contract_multiplier(name, self.multipliers)
+            if factor is None:
+                raise ValueError(f"缺少合约乘数: {name}")
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+            self._factors.append(factor)
+            self.last_prices.append(price)
+        return name_id
+
+    def __len__(self):
+        return len(self.name_ids) - self._closed
+
+    def open(self, date_str, name, side, price, lots, fee=0.0):
+        """开仓：side 为持仓方向，1 多 -1 空"""
+        if lots <= 0:
+            raise ValueError("手数必须大于 0")
+        name_id = self._name_id(name, price)
+        row = len(self.name_ids)
+        self.name_ids.append(name_id)
+        self.sides.append(side)
+        self.dates.append(date_str)
+        self.open_prices.append(price)
+        self.lots.append(lots)
+        self.fees_per_lot.append(fee / lots)
+        self.sizes.append(side * self._factors[name_id] * lots)
+        self._queues.setdefault((name_id, side), []).append(row)
+
+    def close(self, date_str, name, side, price, lots, fee=0.0, offset=CLOSE):
+        """平掉 side 方向的持仓，返回 (生成的交易记录, 找不到开仓的手数)"""
+        if lots <= 0:
+            raise ValueError("手数必须大于 0")
+        name_id = self._name_ids.get(name)
+        queue = self._queues.get((name_id, side), []) if name_id is not None else []
+        factor = self._factors[name_id] if name_id is not None else 0.0
+        trades = []
+        remaining = lots
+        for row in queue:
+            if remaining == 0:
+                break
+            left = self.lots[row]
+            if left == 0:
+                continue
+            if offset == CLOSE_TODAY and self.dates[row] != date_str:
+                continue
+            if offset == CLOSE_YESTERDAY and self.dates[row] >= date_str:
+                continue
+            taken = min(left, remaining)
+            remaining -= taken
+            left -= taken
+            self.lots[row] = left
+            self.sizes[row] = side * factor * left
+            if left == 0:
+                self._closed += 1
+            open_price = self.open_prices[row]
+            per_point = side * factor * taken
+            open_fee = self.fees_per_lot[row] * taken
+            close_fee = fee * taken / lots
+            trades.append({
+                'date': date_str, 'name': name, 'open_price': open_price, 'close_price': price,
+                'profit_per_point': per_point, 'open_fee': open_fee, 'close_fee': close_fee,
+                'profit': (price - open_price) * per_point - open_fee - close_fee,
+            })
+        if queue:
+            self._queues[(name_id, side)] = [row for row in queue if self.lots[row] > 0]
+        if self.trade_recorder is not None and trades:
+            self.trade_recorder.add_trades(trades)
+        if self._closed > self.COMPACT_THRESHOLD and self._closed * 2 > len(self.name_ids):
+            self._compact()
+        return trades, remaining
+
+    def _compact(self):
+        keep = [row for row, left in enumerate(self.lots) if left > 0]
+        new_rows = {row: index for index, row in enumerate(keep)}
+        for column in ('name_ids', 'sides', 'open_prices', 'lots', 'fees_per_lot', 'sizes'):
+            values = getattr(self, column)
+            setattr(self, column, array(values.typecode, map(values.__getitem__, keep)))
+        self.dates = list(map(self.dates.__getitem__, keep))
+        self._queues = {key: [new_rows[row] for row in rows] for key, rows in self._queues.items() if rows}
+        self._closed = 0
+
+    def open_lots(self):
+        """未平仓的开仓，格式与 StatementImport.open_lots 相同：(合约, 方向, 开仓日期, 开仓价, 手数, 剩余开仓费)"""
+        names = self.names
+        return [(names[name_id], side, date_str, open_price, left, fee_per_lot * left)
+                for name_id, side, date_str, open_price, left, fee_per_lot
+                in zip(self.name_ids, self.sides, self.dates, self.open_prices, self.lots, self.fees_per_lot)
+                if left > 0]
+
+    def restore_lots(self, lots):
+        """按先后顺序重新开出 open_lots 格式的开仓（从账户文件恢复持仓时使用）"""
+        for name, side, date_str, open_price, left, fee in lots:
+            self.open(date_str, name, side, open_price, left, fee)
+
+    def mark(self, prices):
+        """用结算价或最新价 {合约: 价格} 盯市，返回每笔开仓的浮动盈亏（与各列对齐，已平完的为 0）
+
+        没有给出价格的合约沿用上一次的盯市价。
+        """
+        name_ids = self._name_ids
+        last_prices = self.last_prices
+        for name, price in prices.items():
+            name_id = name_ids.get(name)
+            if name_id is not None:
+                last_prices[name_id] = price
+        row_prices = map(last_prices.__getitem__, self.name_ids)
+        return array('d', map(mul, map(sub, row_prices, self.open_prices), self.sizes))
+
+    def unrealized(self, prices=None):
+        """整个持仓簿的浮动盈亏合计"""
+        return math.fsum(self.mark(prices or {}))
+
+    def unrealized_by_instrument(self, prices=None):
+        profits = self.mark(prices or {})
+        totals = {}
+        for name_id, profit, left in zip(self.name_ids, profits, self.lots):
+            if left > 0:
+                name = self.names[name_id]
+                totals[name] = totals.get(name, 0.0) + profit
+        return totals
+
+def unseen_lots(existing, lots):
+    """返回 lots 中不在 existing 里的开仓（按合约、方向、日期、开仓价和手数的多重集合比较），
+    重复导入同一份成交明细时不会把未平仓的部分记两次"""
+    counts = {}
+    for lot in existing:
+        counts[lot[:5]] = counts.get(lot[:5], 0) + 1
+    added = []
+    for lot in lots:
+        if counts.get(lot[:5], 0):
+            counts[lot[:5]] -= 1
+        else:
+            added.append(tuple(lot))
+    return added
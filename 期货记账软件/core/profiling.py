@@ -0,0 +1,114 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Profiler:
+    """热点路径计时与计数；关闭时被装饰的函数只多一次属性判断"""
+
+    def __init__(self, window=1024, trace_capacity=100000):
+        self.enabled = os.environ.get("FUTURES_PROFILE") == "1"
+        self.window = window
+        # 名称 -> 最近若干次耗时（秒）
+        self.durations = {}
+        self.calls = {}
+        self.counters = {}
+        # (名称, 开始时间, 耗时, 线程) 供导出 Chrome trace
+        self.events = deque(maxlen=trace_capacity)
+        self._origin = time.perf_counter()
+
+    def record(self, name, start, duration):
+        samples = self.durations.get(name)
+        if samples is None:
+            samples = self.durations.setdefault(name, deque(maxlen=self.window))
+        samples.append(duration)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.events.append((name, start, duration, threading.get_ident()))
+
+    def span(self, name):
+        """用于 with 语句的计时区段，关闭时返回共享的空对象"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        self.durations.clear()
+        self.calls.clear()
+        self.counters.clear()
+        self.events.clear()
+
+    def summary(self):
+        """返回 {名称: (调用次数, 最近一次耗时, p95 耗时)}，耗时单位为秒"""
+        result = {}
+        for name, samples in list(self.durations.items()):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            result[name] = (self.calls.get(name, 0), samples[-1], p95)
+        return result
+
+    def export_chrome_trace(self, path):
+        """导出 Chrome trace JSON，可在 chrome://tracing 或 Perfetto 中打开"""
+        pid = os.getpid()
+        trace_events = [
+            {'name': name, 'ph': "X", 'ts': (start - self._origin) * 1e6, 'dur': duration * 1e6,
+             'pid': pid, 'tid': thread_id}
+            for name, start, duration, thread_id in list(self.events)
+        ]
+        trace_events.extend(
+            {'name': name, 'ph': "C", 'ts': (time.perf_counter() - self._origin) * 1e6,
+             'pid': pid, 'args': {'value': value}}
+            for name, value in self.counters.items()
+        )
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': trace_events}, file, ensure_ascii=False)
+
+profiler = Profiler()
+
+def timed(name):
+    """给函数或方法加上计时，名称用于面板和 trace"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
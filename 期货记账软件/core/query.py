@@ -0,0 +1,126 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from operator import and_, le
+
+class TradeQuery:
+    """交易表的筛选与排序，返回行号数组
+
+    需要的键在首次查询时建立，之后只为新追加的行补齐：名称的小写键及每个名称的行号、
+    盈利/亏损标记、日期是否有序。日期有序时日期区间直接在日期列上二分查找，无序时在按日期
+    排好的行号上二分查找；名称筛选只访问匹配名称的行，其余条件在 C 层用 compress 过滤。
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._indexed = 0
+        self.name_keys = []
+        self.name_rows = []
+        self._win_mask = bytearray()
+        self._loss_mask = bytearray()
+        self._dates_sorted = True
+        # 日期无序时按 (日期, 行号) 排好的行号及对应日期，过期时重建
+        self._date_order = None
+        self._ordered_dates = None
+        self._name_ranks = None
+
+    def _refresh(self):
+        store = self.store
+        count = len(store)
+        names = store.names
+        if len(self.name_keys) < len(names):
+            self.name_keys.extend(name.lower() for name in names[len(self.name_keys):])
+            self.name_rows.extend(array('i') for _ in range(len(names) - len(self.name_rows)))
+            self._name_ranks = None
+        start = self._indexed
+        if start >= count:
+            return
+        name_rows = self.name_rows
+        for row, name_id in enumerate(store.name_ids[start:count], start):
+            name_rows[name_id].append(row)
+        profits = store.columns['profit'][start:count]
+        self._win_mask.extend(map((0.0).__lt__, profits))
+        self._loss_mask.extend(map((0.0).__gt__, profits))
+        if self._dates_sorted:
+            dates = store.dates
+            self._dates_sorted = all(map(le, dates[max(start - 1, 0):count - 1], dates[max(start, 1):count]))
+        self._date_order = None
+        self._indexed = count
+    
+    def _ensure_date_order(self):
+        if self._date_order is None:
+            dates = self.store.dates
+            self._date_order = array('i', sorted(range(len(dates)), key=dates.__getitem__))
+            self._ordered_dates = array('i', map(dates.__getitem__, self._date_order))
+
+    def match_names(self, text):
+        """名称包含 text（不区分大小写）的名称编号"""
+        self._refresh()
+        text = text.lower()
+        return [name_id for name_id, key in enumerate(self.name_keys) if text in key]
+
+    def select(self, text="", start=None, end=None, sign=0, first=0):
+        """按名称子串、日期序数区间（含两端）和盈亏方向（1 盈利，-1 亏损）筛选 first 之后的行"""
+        self._refresh()
+        dates = self.store.dates
+        low, high = first, len(self.store)
+        date_filtered = start is not None or end is not None
+        if date_filtered and self._dates_sorted:
+            if start is not None:
+                low = max(low, bisect_left(dates, start))
+            if end is not None:
+                high = min(high, bisect_right(dates, end))
+            date_filtered = False
+        if low >= high:
+            return array('i')
+
+        if date_filtered and not text:
+            self._ensure_date_order()
+            ordered = self._ordered_dates
+            begin = bisect_left(ordered, start) if start is not None else 0
+            stop = bisect_right(ordered, end) if end is not None else len(ordered)
+            rows = sorted(self._date_order[begin:stop])
+            rows = array('i', rows[bisect_left(rows, low):])
+            date_filtered = False
+        elif text:
+            rows = array('i')
+            for name_id in self.match_names(text):
+                name_rows = self.name_rows[name_id]
+                rows.extend(name_rows[bisect_left(name_rows, low):bisect_left(name_rows, high)])
+            rows = array('i', sorted(rows))
+        else:
+            rows = range(low, high)
+
+        if date_filtered:
+            # 日期无序且已按名称缩小范围时逐行比较
+            low_bound = start if start is not None else -(1 << 31)
+            high_bound = end if end is not None else (1 << 31) - 1
+            row_dates = array('i', map(dates.__getitem__, rows))
+            rows = array('i', compress(rows, map(and_, map(low_bound.__le__, row_dates),
+                                                 map(high_bound.__ge__, row_dates))))
+        if sign:
+            mask = self._win_mask if sign > 0 else self._loss_mask
+            if isinstance(rows, range):
+                rows = compress(rows, memoryview(mask)[rows.start:rows.stop])
+            else:
+                rows = compress(rows, map(mask.__getitem__, rows))
+        return rows if isinstance(rows, array) else array('i', rows)
+
+    def sort(self, rows, field, descending=False):
+        """按字段的原始类型排序（日期按序数、名称按小写键、数值按浮点），排序是稳定的"""
+        store = self.store
+        if field == 'date':
+            key = store.dates.__getitem__
+        elif field == 'name':
+            self._refresh()
+            if self._name_ranks is None:
+                order = sorted(range(len(self.name_keys)), key=self.name_keys.__getitem__)
+                ranks = [0] * len(order)
+                for rank, name_id in enumerate(order):
+                    ranks[name_id] = rank
+                self._name_ranks = ranks
+            ranks = array('i', map(self._name_ranks.__getitem__, store.name_ids))
+            key = ranks.__getitem__
+        else:
+            key = store.columns[field].__getitem__
+        return array('i', sorted(rows, key=key, reverse=descending))
@@ -0,0 +1,226 @@
+import csv
+import math
+import random
+import threading
+from array import array
+from datetime import datetime
+
+from .instruments import contract_multiplier, default_registry
+
+WARNING_RATIO = 80.0
+
+class ReplayFeed:
+    """从 CSV 文件回放行情，每行为 时间,合约,价格（标题行和无法解析的行跳过）
+
+    speed 为 0 时尽快回放；大于 0 时按行情时间间隔除以 speed 等待，时间格式为 YYYY-MM-DD HH:MM:SS[.f]。
+    max_gap 为单次等待的上限秒数（None 为不限），跨夜、跨周末的间隔不必真的等完；
+    stop() 可在其他线程中调用，正在进行的等待立即结束，之后不再产生行情。
+    """
+
+    def __init__(self, path, speed=0.0, max_gap=None):
+        self.path = path
+        self.speed = speed
+        self.max_gap = max_gap
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def __iter__(self):
+        previous = None
+        with open(self.path, 'r', newline='', encoding='utf-8-sig') as file:
+            for row in csv.reader(file):
+                if self._stopped.is_set():
+                    return
+                try:
+                    moment, instrument, price = row[0].strip(), row[1].strip(), float(row[2])
+                except (ValueError, IndexError):
+                    continue
+                if self.speed > 0:
+                    try:
+                        current = datetime.fromisoformat(moment).timestamp()
+                    except ValueError:
+                        current = None
+                    if previous is not None and current is not None and current > previous:
+                        delay = (current - previous) / self.speed
+                        if self.max_gap is not None:
+                            delay = min(delay, self.max_gap)
+                        if self._stopped.wait(delay):
+                            return
+                    previous = current if current is not None else previous
+                yield moment, instrument, price
+
+class SimulatedFeed:
+    """随机游走的模拟行情：各合约从起始价出发，每跳变动 ±max_steps 个最小变动价位
+
+    prices: {合约: 起始价}；count 为总跳数（None 为不限），interval 为每跳间隔秒数。
+    stop() 可在其他线程中调用，正在进行的等待立即结束，之后不再产生行情。
+    """
+
+    def __init__(self, prices, count=None, interval=0.0, seed=None, max_steps=3, registry=None):
+        self.prices = dict(prices)
+        self.count = count
+        self.interval = interval
+        self.seed = seed
+        self.max_steps = max_steps
+        self.registry = registry if registry is not None else default_registry()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        names = list(self.prices)
+        if not names:
+            return
+        prices = [self.prices[name] for name in names]
+        ticks = []
+        for name, price in zip(names, prices):
+            spec = self.registry.get(name)
+            # 规格表中没有的合约按价格的万分之一跳动
+            ticks.append(spec.tick_size if spec is not None and spec.tick_size > 0 else max(price * 1e-4, 0.01))
+        emitted = 0
+        while (self.count is None or emitted < self.count) and not self._stopped.is_set():
+            index = rng.randrange(len(names))
+            step = rng.randint(-self.max_steps, self.max_steps) * ticks[index]
+            prices[index] = max(prices[index] + step, ticks[index])
+            yield datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), names[index], prices[index]
+            emitted += 1
+            if self.interval > 0 and self._stopped.wait(self.interval):
+                return
+
+class RiskMonitor:
+    """按行情逐跳重算持仓的保证金占用、浮动盈亏和可用资金
+
+    持仓按合约合并成三个系数：保证金系数 Σ乘数×手数×保证金率、盈亏系数 Σ方向×乘数×手数、
+    开仓成本 Σ方向×乘数×手数×开仓价。一跳只改变一个合约的价格，总保证金和浮动盈亏按
+    (新价 - 旧价) × 系数 增量更新，与持仓笔数无关。
+
+    每跳结束时把 (时间, 保证金, 浮动盈亏, 权益, 可用资金, 保证金比例) 作为一个元组整体发布到
+    snapshot，界面线程按固定帧率读取即可得到一致的状态；保证金比例从下方越过 warning_ratio
+    的那一跳即调用 on_warning(比例, 时间)，回落到阈值以下后重新生效。
+
+    权益 = balance（总资金的快照）+ 浮动盈亏。行情线程中不读取 CapitalManager，
+    总资金变化时由界面线程调用 set_balance，从下一跳起生效；持仓变化时调用 reset(positions)
+    整体替换持仓并立即发布，与行情线程的 on_tick 由锁互斥。
+    """
+    # 增量累加若干跳后用各合约的值重新求和，避免浮点误差积累
+    RESUM_INTERVAL = 4096
+
+    def __init__(self, balance, positions=(), registry=None, multipliers=None,
+                 warning_ratio=WARNING_RATIO, on_warning=None):
+        """positions 与 StatementImport.open_lots 相同：(合约, 方向 1 多 -1 空, 开仓日期, 开仓价, 手数, ...)"""
+        self.balance = float(balance)
+        self.registry = registry if registry is not None else default_registry()
+        self.multipliers = multipliers
+        self.warning_ratio = warning_ratio
+        self.on_warning = on_warning
+        self.instruments = {}
+        self.last_prices = array('d')
+        self.margin_coefficients = array('d')
+        self.profit_coefficients = array('d')
+        self.open_costs = array('d')
+        self.tick_count = 0
+        self.in_warning = False
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self.reset(positions)
+
+    def add_position(self, name, side, open_price, lots):
+        multiplier = contract_multiplier(name, self.multipliers)
+        if multiplier is None:
+            raise ValueError(f"缺少合约乘数: {name}")
+        spec = self.registry.get(name)
+        index = self.instruments.get(name)
+        if index is None:
+            index = self.instruments[name] = len(self.last_prices)
+            self.last_prices.append(open_price)
+            for column in (self.margin_coefficients, self.profit_coefficients, self.open_costs):
+                column.append(0.0)
+        size = multiplier * lots
+        self.margin_coefficients[index] += size * (spec.margin_rate if spec is not None else 0.0)
+        self.profit_coefficients[index] += side * size
+        self.open_costs[index] += side * size * open_price
+
+    def set_balance(self, balance):
+        """更新总资金快照（浮点数赋值是原子的，可在行情线程运行时调用）"""
+        self.balance = float(balance)
+
+    def _resum(self):
+        self.margin = math.fsum(map(float.__mul__, self.last_prices, self.margin_coefficients))
+        self.floating_profit = (math.fsum(map(float.__mul__, self.last_prices, self.profit_coefficients))
+                                - math.fsum(self.open_costs))
+
+    def reset(self, positions=None):
+        """按各合约的最新价重新求和，并发布一次状态；给出 positions 时先整体替换持仓
+
+        仍有持仓的合约保留最新价，新出现的合约从开仓价起算。可在行情线程运行时调用。
+        """
+        with self._lock:
+            if positions is not None:
+                self._replace_positions(positions)
+            self._resum()
+            self._publish("")
+
+    def _replace_positions(self, positions):
+        positions = list(positions)
+        # 先检查乘数，缺少时保持原有持仓不变
+        for name, *_ in positions:
+            if contract_multiplier(name, self.multipliers) is None:
+                raise ValueError(f"缺少合约乘数: {name}")
+        last_prices = dict(zip(self.instruments, self.last_prices))
+        self.instruments = {}
+        self.last_prices = array('d')
+        self.margin_coefficients = array('d')
+        self.profit_coefficients = array('d')
+        self.open_costs = array('d')
+        for name, side, _, open_price, lots, *_ in positions:
+            self.add_position(name, side, open_price, lots)
+        for name, index in self.instruments.items():
+            if name in last_prices:
+                self.last_prices[index] = last_prices[name]
+
+    def _publish(self, moment):
+        equity = self.balance + self.floating_profit
+        margin = self.margin
+        if equity > 0:
+            ratio = margin / equity * 100
+        else:
+            ratio = math.inf if margin > 0 else 0.0
+        self.snapshot = (moment, margin, self.floating_profit, equity, equity - margin, ratio)
+        if ratio >= self.warning_ratio:
+            if not self.in_warning:
+                self.in_warning = True
+                if self.on_warning is not None:
+                    self.on_warning(ratio, moment)
+                return True
+        else:
+            self.in_warning = False
+        return False
+
+    def on_tick(self, moment, instrument, price):
+        """处理一跳行情，本跳越过预警线时返回 True；没有持仓的合约直接忽略"""
+        with self._lock:
+            index = self.instruments.get(instrument)
+            if index is None:
+                return False
+            change = price - self.last_prices[index]
+            self.last_prices[index] = price
+            self.margin += change * self.margin_coefficients[index]
+            self.floating_profit += change * self.profit_coefficients[index]
+            self.tick_count += 1
+            if self.tick_count % self.RESUM_INTERVAL == 0:
+                self._resum()
+            return self._publish(moment)
+
+    def run(self, feed, should_stop=None):
+        """消费行情源直到结束或 should_stop() 为真，返回处理的跳数"""
+        count = 0
+        on_tick = self.on_tick
+        for moment, instrument, price in feed:
+            if should_stop is not None and should_stop():
+                break
+            on_tick(moment, instrument, price)
+            count += 1
+        return count
@@ -0,0 +1,116 @@
+from array import array
+from datetime import date, timedelta
+
+class DateRangeIndex:
+    """按日期序数组织的树状数组（Fenwick），任意日期区间的盈亏、手续费、笔数查询为 O(log n)
+
+    交易可以乱序加入：每次加入只更新 O(log n) 个前缀和节点；日期超出当前覆盖范围时
+    按倍数扩容并线性重建，扩容的代价是摊还的。
+    """
+    SERIES = ('profit', 'fees', 'count', 'wins')
+
+    def __init__(self):
+        self.base = 0
+        self.size = 0
+        # 每天的原始值，用于扩容时重建；以及对应的树状数组
+        self.values = {name: array('d') for name in self.SERIES}
+        self.trees = {name: array('d') for name in self.SERIES}
+
+    def _grow(self, ordinal):
+        if self.size == 0:
+            new_base, new_size = ordinal - 31, 366
+        else:
+            low = min(self.base, ordinal)
+            high = max(self.base + self.size - 1, ordinal)
+            new_size = max(self.size * 2, high - low + 1)
+            # 向新日期一侧扩展
+            new_base = low if ordinal >= self.base else high - new_size + 1
+        shift = self.base - new_base
+        for name in self.SERIES:
+            old = self.values[name]
+            values = array('d', bytes(8 * new_size))
+            for offset, value in enumerate(old):
+                if value:
+                    values[offset + shift] = value
+            self.values[name] = values
+            self.trees[name] = self._build(values)
+        self.base, self.size = new_base, new_size
+
+    @staticmethod
+    def _build(values):
+        # 线性时间构建树状数组（下标从 1 开始）
+        size = len(values)
+        tree = array('d', bytes(8 * (size + 1)))
+        for index in range(1, size + 1):
+            tree[index] += values[index - 1]
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        return tree
+
+    def add(self, ordinal, profit, fees, count=1, wins=0):
+        if not self.base <= ordinal < self.base + self.size:
+            self._grow(ordinal)
+        offset = ordinal - self.base
+        for name, value in (('profit', profit), ('fees', fees), ('count', count), ('wins', wins)):
+            if not value:
+                continue
+            self.values[name][offset] += value
+            tree = self.trees[name]
+            index = offset + 1
+            while index <= self.size:
+                tree[index] += value
+                index += index & -index
+
+    def _prefix(self, tree, offset):
+        # offset 之前（含）的累计值
+        total = 0.0
+        index = min(offset, self.size - 1) + 1
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def query(self, start_ordinal, end_ordinal):
+        """返回 [start, end]（含两端）内的 {profit, fees, count, wins}"""
+        result = dict.fromkeys(self.SERIES, 0.0)
+        if self.size == 0 or end_ordinal < start_ordinal:
+            return result
+        start = max(start_ordinal - self.base, 0)
+        end = end_ordinal - self.base
+        if end < 0 or start >= self.size:
+            return result
+        for name in self.SERIES:
+            tree = self.trees[name]
+            result[name] = self._prefix(tree, end) - (self._prefix(tree, start - 1) if start else 0.0)
+        return result
+
+def period_ranges(period, start_ordinal, end_ordinal):
+    """把日期区间切分为周（周一至周日）、月或年，返回 [(名称, 起始序数, 结束序数)]"""
+    ranges = []
+    if period == "custom":
+        label = f"{date.fromordinal(start_ordinal)} ~ {date.fromordinal(end_ordinal)}"
+        return [(label, start_ordinal, end_ordinal)]
+    current = date.fromordinal(start_ordinal)
+    if period == "week":
+        current -= timedelta(days=current.weekday())
+    elif period == "month":
+        current = current.replace(day=1)
+    elif period == "year":
+        current = current.replace(month=1, day=1)
+    else:
+        raise ValueError(f"未知的汇总周期: {period}")
+    while current.toordinal() <= end_ordinal:
+        if period == "week":
+            following = current + timedelta(days=7)
+            iso_year, iso_week, _ = current.isocalendar()
+            label = f"{iso_year}年第{iso_week}周"
+        elif period == "month":
+            following = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+            label = f"{current.year}-{current.month:02d}"
+        else:
+            following = date(current.year + 1, 1, 1)
+            label = f"{current.year}年"
+        ranges.append((label, current.toordinal(), following.toordinal() - 1))
+        current = following
+    return ranges
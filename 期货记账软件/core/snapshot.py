@@ -0,0 +1,154 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .ledger import CapitalManager, TradeRecorder, TradeStore, _copy_to_array
+
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_MAGIC = b"FUTLEDGR"
+SNAPSHOT_VERSION = 2
+# 魔数, 版本, 交易数, 资金记录数, 名称数, 字符串数, 字符串字节数, 保证金
+_SNAPSHOT_HEADER = struct.Struct("<8sIIIIIId")
+# 版本 2 起紧随文件头：持仓笔数（补齐到 8 字节）
+_POSITION_HEADER = struct.Struct("<I4x")
+
+def _padding(size):
+    return -size % 8
+
+def write_snapshot(path, capital_manager, trade_recorder):
+    """写入二进制快照：文件头、字符串表，然后每列一段定长数据（8 字节对齐，小端）；持仓列在最后"""
+    trades = trade_recorder.trades
+    # 覆盖正在映射的文件前先复制到内存
+    if trades.mapped_path is not None and os.path.abspath(trades.mapped_path) == os.path.abspath(path):
+        trades.materialize()
+    
+    strings = list(trades.names)
+    string_ids = {}
+    
+    def intern(value, ids):
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        ids.append(string_id)
+    
+    type_ids = array('i')
+    time_ids = array('i')
+    amounts = array('d')
+    for trans_type, amount, time in capital_manager.transactions:
+        intern(trans_type, type_ids)
+        intern(time, time_ids)
+        amounts.append(amount)
+    
+    lot_name_ids = array('i')
+    lot_date_ids = array('i')
+    lot_sides = array('i')
+    lot_prices = array('d')
+    lot_counts = array('i')
+    lot_fees = array('d')
+    for name, side, date_str, open_price, lots, fee in capital_manager.open_lots:
+        intern(name, lot_name_ids)
+        intern(date_str, lot_date_ids)
+        lot_sides.append(side)
+        lot_prices.append(open_price)
+        lot_counts.append(lots)
+        lot_fees.append(fee)
+    
+    offsets = array('I', [0])
+    encoded = []
+    for string in strings:
+        data = string.encode('utf-8')
+        encoded.append(data)
+        offsets.append(offsets[-1] + len(data))
+    string_data = b"".join(encoded)
+    
+    sections = [offsets, string_data, trades.dates, trades.name_ids]
+    sections.extend(trades.columns[field] for field in TradeStore.FLOAT_FIELDS)
+    sections.extend([type_ids, time_ids, amounts])
+    sections.extend([lot_name_ids, lot_date_ids, lot_sides, lot_prices, lot_counts, lot_fees])
+    
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(_SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(trades), len(amounts),
+            len(trades.names), len(strings), len(string_data), capital_manager.margin
+        ))
+        file.write(_POSITION_HEADER.pack(len(lot_counts)))
+        for section in sections:
+            data = memoryview(section).cast('B')
+            if sys.byteorder != 'little' and isinstance(section, array):
+                swapped = array(section.typecode, section)
+                swapped.byteswap()
+                data = memoryview(swapped).cast('B')
+            file.write(data)
+            file.write(b"\0" * _padding(len(data)))
+    os.replace(temp_path, path)
+
+def read_snapshot(path):
+    """用 mmap 打开二进制快照，数值列直接包装为 memoryview，不逐行解析"""
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    (magic, version, trade_count, capital_count, name_count,
+     string_count, string_bytes, margin) = _SNAPSHOT_HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("不是有效的快照文件")
+    if version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"不支持的快照版本: {version}")
+    
+    position = _SNAPSHOT_HEADER.size
+    # 版本 1 的快照没有持仓
+    lot_count = 0
+    if version >= 2:
+        (lot_count,) = _POSITION_HEADER.unpack_from(view, position)
+        position += _POSITION_HEADER.size
+    
+    def take(typecode, count):
+        nonlocal position
+        size = count * array(typecode).itemsize
+        section = view[position:position + size]
+        position += size + _padding(size)
+        if typecode == 'B':
+            return section
+        if sys.byteorder != 'little':
+            values = _copy_to_array(typecode, section)
+            values.byteswap()
+            return values
+        return section.cast(typecode)
+    
+    offsets = take('I', string_count + 1)
+    string_data = take('B', string_bytes)
+    strings = [bytes(string_data[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in range(string_count)]
+    
+    dates = take('i', trade_count)
+    name_ids = take('i', trade_count)
+    columns = {field: take('d', trade_count) for field in TradeStore.FLOAT_FIELDS}
+    type_ids = take('i', capital_count)
+    time_ids = take('i', capital_count)
+    amounts = take('d', capital_count)
+    lot_name_ids = take('i', lot_count)
+    lot_date_ids = take('i', lot_count)
+    lot_sides = take('i', lot_count)
+    lot_prices = take('d', lot_count)
+    lot_counts = take('i', lot_count)
+    lot_fees = take('d', lot_count)
+    
+    trade_recorder = TradeRecorder()
+    trade_recorder.trades = TradeStore.from_columns(
+        dates, name_ids, columns, strings[:name_count], mapped_path=path
+    )
+    trade_recorder.rebuild_indexes()
+    
+    capital_manager = CapitalManager(trade_recorder)
+    capital_manager.restore_transactions(
+        (strings[type_id], amount, strings[time_id]) for type_id, time_id, amount in zip(type_ids, time_ids, amounts)
+    )
+    capital_manager.margin = margin
+    capital_manager.open_lots = [
+        (strings[name_id], side, strings[date_id], open_price, lots, fee)
+        for name_id, date_id, side, open_price, lots, fee
+        in zip(lot_name_ids, lot_date_ids, lot_sides, lot_prices, lot_counts, lot_fees)
+    ]
+    return capital_manager, trade_recorder
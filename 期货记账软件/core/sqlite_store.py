@@ -0,0 +1,141 @@
+import sqlite3
+
+from .ledger import TradeStore
+
+class SqliteStore:
+    """SQLite 账户存储：trades / capital 两张表，WAL 模式，按日期和名称建索引
+
+    持仓是整体状态而不是追加的记录，positions 表在每次变化时整表替换。
+    """
+    TRADE_COLUMNS = TradeStore.FIELDS
+    FETCH_SIZE = 10000
+    
+    def __init__(self, path):
+        self.path = path
+        # 界面启动时在后台线程中打开并读入，之后由界面线程写入；同一时刻只有一个线程使用连接
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    open_price REAL NOT NULL,
+                    close_price REAL NOT NULL,
+                    profit_per_point REAL NOT NULL,
+                    open_fee REAL NOT NULL,
+                    close_fee REAL NOT NULL,
+                    profit REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_trades_date ON trades(date);
+                CREATE INDEX IF NOT EXISTS idx_trades_name ON trades(name);
+                CREATE TABLE IF NOT EXISTS capital (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    time TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS account (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS positions (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    side INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    open_price REAL NOT NULL,
+                    lots INTEGER NOT NULL,
+                    fee REAL NOT NULL
+                );
+            """)
+    
+    def close(self):
+        self.conn.close()
+    
+    def is_empty(self):
+        for table in ("trades", "capital", "positions"):
+            if self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+    
+    def add_trades(self, trades):
+        # 批量写入，一个事务内完成
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO trades (date, name, open_price, close_price, profit_per_point,"
+                " open_fee, close_fee, profit) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ([trade[column] for column in self.TRADE_COLUMNS] for trade in trades)
+            )
+    
+    def update_trades(self, rows, trades):
+        """按行号（插入顺序，从 0 开始）覆盖已有交易的数值列，一个事务内完成"""
+        ids = [trade_id for (trade_id,) in self.conn.execute("SELECT id FROM trades ORDER BY id")]
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE trades SET open_price = ?, close_price = ?, profit_per_point = ?,"
+                " open_fee = ?, close_fee = ?, profit = ? WHERE id = ?",
+                ([trade[column] for column in TradeStore.FLOAT_FIELDS] + [ids[row]]
+                 for row, trade in zip(rows, trades))
+            )
+    
+    def add_capital(self, transactions):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO capital (type, amount, time) VALUES (?, ?, ?)", transactions
+            )
+    
+    def set_margin(self, amount):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO account (key, value) VALUES ('margin', ?)", (amount,)
+            )
+    
+    def get_margin(self):
+        row = self.conn.execute("SELECT value FROM account WHERE key = 'margin'").fetchone()
+        return row[0] if row else 0.0
+    
+    def set_positions(self, lots):
+        """用未平仓的开仓（PositionBook.open_lots 格式）替换整张持仓表，一个事务内完成"""
+        with self.conn:
+            self.conn.execute("DELETE FROM positions")
+            self.conn.executemany(
+                "INSERT INTO positions (name, side, date, open_price, lots, fee) VALUES (?, ?, ?, ?, ?, ?)", lots
+            )
+    
+    def get_positions(self):
+        return self.conn.execute(
+            "SELECT name, side, date, open_price, lots, fee FROM positions ORDER BY id"
+        ).fetchall()
+    
+    def trade_batches(self):
+        """按插入顺序分批读取交易，每批为 FIELDS 顺序的元组列表"""
+        cursor = self.conn.execute(
+            "SELECT date, name, open_price, close_price, profit_per_point, open_fee, close_fee, profit"
+            " FROM trades ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            yield rows
+    
+    def iter_capital(self):
+        return self.conn.execute("SELECT type, amount, time FROM capital ORDER BY id")
+    
+    def load_into(self, capital_manager, trade_recorder):
+        capital_manager.restore_transactions(self.iter_capital())
+        capital_manager.margin = self.get_margin()
+        capital_manager.open_lots = self.get_positions()
+        # 各列整块追加，最后统一重建一次聚合，不逐笔更新
+        for rows in self.trade_batches():
+            trade_recorder.trades.extend_rows(rows)
+        trade_recorder.rebuild_indexes()
+    
+    def save_from(self, capital_manager, trade_recorder):
+        self.add_capital(capital_manager.transactions)
+        self.set_margin(capital_manager.margin)
+        self.set_positions(capital_manager.open_lots)
+        self.add_trades(trade_recorder.trades)
@@ -0,0 +1,303 @@
+import csv
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+
+from .instruments import contract_multiplier, missing_multipliers
+from .positions import CLOSE, CLOSE_TODAY, CLOSE_YESTERDAY, OPEN, PositionBook
+from .profiling import profiler
+
+# 标准字段 -> 各家导出文件中可能出现的列名
+_COLUMN_ALIASES = {
+    'date': ('成交日期', '日期', 'Date'),
+    'trading_day': ('交易日', '交易日期', 'Trading Day'),
+    'time': ('成交时间', '时间', 'Time'),
+    'instrument': ('合约', '合约代码', 'Instrument'),
+    'direction': ('买/卖', '买卖', '买卖方向', '方向', 'B/S'),
+    'offset': ('开平', '开/平', '开平标志', 'O/C'),
+    'price': ('成交价', '成交价格', '价格', 'Price'),
+    'lots': ('手数', '成交手数', '成交量', '数量', 'Lots'),
+    'fee': ('手续费', 'Fee'),
+    'trade_id': ('成交序号', '成交编号', 'Trans.No.'),
+}
+_REQUIRED = ('instrument', 'direction', 'offset', 'price', 'lots')
+# 夜盘从 21:00 开始，最晚到次日 02:30；这两个时刻之间的成交属于夜盘
+NIGHT_START = 18 * 3600
+NIGHT_END = 6 * 3600
+
+class StatementImport:
+    """成交明细的导入结果：配对后的交易记录、未平仓的开仓和找不到开仓的平仓"""
+
+    def __init__(self):
+        self.fill_count = 0
+        self.trades = []
+        # 账户中已有体现、导入时跳过的成交笔数
+        self.duplicates = 0
+        # 配对后未平的开仓（含配对前已有持仓中未平的部分）：
+        # (合约, 方向 1 多 -1 空, 开仓日期, 开仓价, 手数, 剩余开仓手续费)
+        self.open_lots = []
+        # (日期, 合约, 手数)
+        self.unmatched = []
+
+def _read_lines(path):
+    # 期货公司的结算单多为 GBK 编码
+    for encoding in ('utf-8-sig', 'gbk'):
+        try:
+            with open(path, 'r', encoding=encoding, newline='') as file:
+                return file.read().splitlines()
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"无法识别文件编码: {path}")
+
+def _split_tables(lines):
+    """文本结算单按 | 分隔的连续行切成多张表；CSV 文件整体作为一张表"""
+    if any(line.lstrip().startswith('|') for line in lines):
+        tables, current = [], []
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('|'):
+                current.append([cell.strip() for cell in stripped.strip('|').split('|')])
+            elif stripped.startswith('-') and current:
+                continue
+            elif current:
+                tables.append(current)
+                current = []
+        if current:
+            tables.append(current)
+        return tables
+    sample = next((line for line in lines if line.strip()), "")
+    delimiter = '\t' if sample.count('\t') > sample.count(',') else ','
+    return [[[cell.strip() for cell in row] for row in csv.reader(lines, delimiter=delimiter)]]
+
+def _locate_columns(row):
+    columns = {}
+    for field, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in row:
+                columns[field] = row.index(alias)
+                break
+    # 没有日期和交易日列、只有成交时间一列时日期从中取出
+    if 'date' not in columns and 'trading_day' not in columns:
+        if 'time' not in columns:
+            return None
+        columns['date'] = columns['time']
+    return columns if all(field in columns for field in _REQUIRED) else None
+
+@lru_cache(maxsize=4096)
+def _normalize_date(text):
+    digits = text.replace('-', '').replace('/', '')[:8]
+    try:
+        return datetime.strptime(digits, "%Y%m%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def _clock_seconds(text):
+    """成交时间（可带日期）中的时刻换算为当日秒数，无法识别时为 None"""
+    parts = text.strip().split()[-1:] or ['']
+    try:
+        fields = list(map(int, parts[0].split(':')))
+    except ValueError:
+        return None
+    if not 2 <= len(fields) <= 3:
+        return None
+    hours, minutes, seconds = (fields + [0])[:3]
+    return hours * 3600 + minutes * 60 + seconds
+
+@lru_cache(maxsize=4096)
+def _trading_day(date_str, seconds):
+    """由成交的自然日和时刻推出交易日：夜盘归下一个工作日（周五夜盘归下周一），不考虑节假日"""
+    if seconds is None or NIGHT_END <= seconds < NIGHT_START:
+        return date_str
+    day = date.fromisoformat(date_str)
+    if seconds >= NIGHT_START:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day.isoformat()
+
+def _session_order(seconds):
+    """同一交易日内的先后：夜盘在日盘之前，过了午夜的夜盘排在当晚之后"""
+    if seconds is None:
+        return (1, 0)
+    if seconds >= NIGHT_START:
+        return (0, seconds)
+    if seconds < NIGHT_END:
+        return (0, seconds + 86400)
+    return (1, seconds)
+
+@lru_cache(maxsize=64)
+def _direction(text):
+    text = text.strip().upper()
+    if text.startswith(('买', 'B')):
+        return 1
+    if text.startswith(('卖', 'S')):
+        return -1
+    raise ValueError(f"无法识别的买卖方向: {text}")
+
+@lru_cache(maxsize=64)
+def _offset(text):
+    text = text.strip().replace(' ', '').lower()
+    if text.startswith(('开', 'open')):
+        return OPEN
+    if '平今' in text or text == 'closetoday':
+        return CLOSE_TODAY
+    if '平昨' in text or text == 'closeyesterday':
+        return CLOSE_YESTERDAY
+    if '平' in text or text.startswith('close'):
+        return CLOSE
+    raise ValueError(f"无法识别的开平标志: {text}")
+
+def parse_statement(path):
+    """读取 CTP 风格的成交明细（CSV 导出或文本结算单），按列返回 {字段: 列表}，已按成交先后排序
+
+    date 为交易日：文件有交易日列时直接取用，只有自然日和成交时间时夜盘成交归入下一个交易日。
+    排序和平今、平昨的判断都按交易日，同一交易日内夜盘在日盘之前。
+    """
+    lines = _read_lines(path)
+    with profiler.span("statement.parse"):
+        # 取含成交明细表头的那一张表
+        for table in _split_tables(lines):
+            for position, row in enumerate(table):
+                columns = _locate_columns(row)
+                if columns is not None:
+                    break
+            else:
+                continue
+            break
+        else:
+            raise ValueError(f"未找到成交明细表头: {path}")
+
+        width = max(columns.values()) + 1
+        data = [row for row in table[position + 1:] if len(row) >= width]
+        # 跳过英文表头、合计行等日期列不是日期的行
+        day_column = columns['trading_day'] if 'trading_day' in columns else columns['date']
+        dates = list(map(_normalize_date, (row[day_column] for row in data)))
+        data = [row for row, date_str in zip(data, dates) if date_str is not None]
+        dates = [date_str for date_str in dates if date_str is not None]
+
+        fills = {}
+        for field, index in columns.items():
+            if field not in ('date', 'trading_day'):
+                fills[field] = [row[index] for row in data]
+        times = fills.get('time')
+        seconds = list(map(_clock_seconds, times)) if times else [None] * len(dates)
+        if 'trading_day' not in columns:
+            # 日期列是自然日，夜盘成交归入下一个交易日
+            dates = list(map(_trading_day, dates, seconds))
+        fills['date'] = dates
+        fills['direction'] = list(map(_direction, fills['direction']))
+        fills['offset'] = list(map(_offset, fills['offset']))
+        fills['price'] = list(map(float, fills['price']))
+        fills['lots'] = list(map(int, map(float, fills['lots'])))
+        fills['fee'] = list(map(float, fills['fee'])) if 'fee' in fills else [0.0] * len(dates)
+
+        # 同一文件内按交易日、夜盘/日盘和时间稳定排序，保证先开后平
+        sessions = list(map(_session_order, seconds))
+        order = sorted(range(len(dates)), key=lambda row: (dates[row], sessions[row]))
+        if order != list(range(len(dates))):
+            fills = {field: [values[row] for row in order] for field, values in fills.items()}
+    return fills
+
+def _consume(counts, key, wanted):
+    taken = min(counts.get(key, 0), wanted)
+    if taken:
+        counts[key] -= taken
+    return taken
+
+def unapplied_fills(fills, trade_recorder, open_lots=(), multipliers=None):
+    """去掉账户中已有体现的成交（按手数的多重集合比较），返回余下的成交，格式同 parse_statement
+
+    平仓由同一交易日、合约、持仓方向和成交价的已记录交易抵扣。开仓先由同一合约、方向、日期和开仓价的
+    持仓抵扣，再由平掉它的已记录交易抵扣：即上面抵扣了本明细平仓的交易，或明细末日之后平仓的交易，
+    且合约、方向和开仓价相同。累计的成交明细重复导入、或部分成交已在持仓页录入时，这些成交不会再配对一次。
+    """
+    dates = fills['date']
+    if not dates:
+        return fills
+    last_day = max(dates)
+    held = {}
+    for name, side, date_str, open_price, lots, _ in open_lots:
+        key = (name, side, date_str, open_price)
+        held[key] = held.get(key, 0) + lots
+    # (交易日, 合约, 方向, 平仓价) -> [[(合约, 方向, 开仓价), 手数], ...]；(合约, 方向, 开仓价) -> 手数
+    closed, opened = {}, {}
+    store = trade_recorder.trades
+    columns = store.columns
+    factors = {}
+    for row in trade_recorder.select_rows(start_ordinal=store.date_ordinal(min(dates))):
+        name = store.names[store.name_ids[row]]
+        if name not in factors:
+            factors[name] = contract_multiplier(name, multipliers)
+        per_point = columns['profit_per_point'][row]
+        if not factors[name] or not per_point:
+            continue
+        lots = round(abs(per_point) / factors[name])
+        side = 1 if per_point > 0 else -1
+        date_str = store.date_string(store.dates[row])
+        open_key = (name, side, columns['open_price'][row])
+        if date_str > last_day:
+            opened[open_key] = opened.get(open_key, 0) + lots
+        else:
+            closed.setdefault((date_str, name, side, columns['close_price'][row]), []).append([open_key, lots])
+
+    left = list(fills['lots'])
+    rows = list(zip(dates, fills['instrument'], fills['direction'], fills['offset'], fills['price']))
+    for row, (date_str, name, direction, offset, price) in enumerate(rows):
+        if offset == OPEN:
+            continue
+        for entry in closed.get((date_str, name, -direction, price), ()):
+            taken = min(entry[1], left[row])
+            if taken:
+                entry[1] -= taken
+                left[row] -= taken
+                opened[entry[0]] = opened.get(entry[0], 0) + taken
+    for row, (date_str, name, direction, offset, price) in enumerate(rows):
+        if offset == OPEN:
+            left[row] -= _consume(held, (name, direction, date_str, price), left[row])
+            left[row] -= _consume(opened, (name, direction, price), left[row])
+
+    keep = [row for row, lots in enumerate(left) if lots > 0]
+    remaining = {field: [values[row] for row in keep] for field, values in fills.items()}
+    lots, fees = fills['lots'], fills['fee']
+    remaining['lots'] = [left[row] for row in keep]
+    remaining['fee'] = [fees[row] if left[row] == lots[row] else fees[row] * left[row] / lots[row]
+                        for row in keep]
+    return remaining
+
+def pair_fills(fills, multipliers=None, open_lots=()):
+    """按合约和持仓方向先进先出配对开平仓（规则见 PositionBook），每一段配对生成一条交易记录
+
+    open_lots 为账户已有的持仓（格式同 PositionBook.open_lots），先于文件中的开仓参与配对，
+    平掉之前导入或手工录入的开仓时不会报找不到开仓。
+    """
+    result = StatementImport()
+    result.fill_count = len(fills['date'])
+
+    unknown = missing_multipliers(chain(fills['instrument'], (lot[0] for lot in open_lots)), multipliers)
+    if unknown:
+        raise ValueError(f"以下品种缺少合约乘数，请补充: {', '.join(unknown)}")
+
+    book = PositionBook(multipliers=multipliers)
+    book.restore_lots(open_lots)
+    for date_str, name, direction, offset, price, lots, fee in zip(
+            fills['date'], fills['instrument'], fills['direction'], fills['offset'],
+            fills['price'], fills['lots'], fills['fee']):
+        if lots <= 0:
+            continue
+        if offset == OPEN:
+            book.open(date_str, name, direction, price, lots, fee)
+            continue
+        # 平仓方向与持仓方向相反
+        trades, remaining = book.close(date_str, name, -direction, price, lots, fee, offset)
+        result.trades.extend(trades)
+        if remaining:
+            result.unmatched.append((date_str, name, remaining))
+    result.open_lots = book.open_lots()
+    return result
+
+def import_statement(path, multipliers=None):
+    """解析成交明细并配对成交易记录，返回 StatementImport"""
+    fills = parse_statement(path)
+    with profiler.span("statement.pair"):
+        return pair_fills(fills, multipliers)
@@ -0,0 +1,2171 @@
+import time
+# 启动计时从导入本模块（含 PyQt6 和账务核心）开始
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+import csv
+from datetime import datetime, date
+from functools import partial
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QLabel, QLineEdit, QPushButton, QComboBox, QTableWidget,
+    QTableWidgetItem, QTableView, QTabWidget, QMessageBox, QFileDialog, QHeaderView,
+    QCalendarWidget, QGroupBox, QGridLayout, QProgressDialog, QCheckBox, QInputDialog
+)
+from PyQt6.QtCore import (
+    Qt, QDate, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QObject, QPointF, QSettings, QThread, QTimer,
+    pyqtSignal, pyqtSlot
+)
+from PyQt6.QtGui import (
+    QColor, QFont, QBrush, QKeySequence, QShortcut, QTextCharFormat, QPainter, QPen, QPolygonF
+)
+
+from .core import (
+    MARGIN, SNAPSHOT_SUFFIX, WARNING_RATIO, CapitalManager, PositionBook, ReplayFeed, RiskMonitor, SimulatedFeed, TradeQuery, TradeRecorder, TradeStore, is_store_path, load_account,
+    open_store, parse_data_rows, default_registry, downsample_minmax, missing_multipliers, pair_fills, parse_statement, read_snapshot, write_csv,
+    write_snapshot, profiler, timed, contract_multiplier, unapplied_fills, unseen_lots
+)
+
+class CsvLoadWorker(QThread):
+    """在后台线程中分块解析 CSV 数据文件，逐批发送给界面线程；持仓行在 open_lots 中，读完后整体使用"""
+    batch_ready = pyqtSignal(list, list)
+    progress = pyqtSignal(int)
+    CHUNK_SIZE = 1 << 20  # 每批约读取 1MB
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.open_lots = []
+        self.error = None
+    
+    def run(self):
+        try:
+            total_size = os.path.getsize(self.file_path) or 1
+            with open(self.file_path, 'rb') as file:
+                file.readline()  # 跳过标题行
+                while not self.isInterruptionRequested():
+                    lines = file.readlines(self.CHUNK_SIZE)
+                    if not lines:
+                        break
+                    with profiler.span("load_data.parse"):
+                        text = b''.join(lines).decode('utf-8')
+                        capital_rows, trades, open_lots = parse_data_rows(csv.reader(text.splitlines()))
+                    self.open_lots.extend(open_lots)
+                    self.batch_ready.emit(capital_rows, trades)
+                    self.progress.emit(file.tell() * 100 // total_size)
+        except Exception as e:
+            self.error = str(e)
+
+class AccountOpenWorker(QThread):
+    """在后台线程中读入整个账户文件；SQLite / 日志账户保持打开，交给界面线程继续写入"""
+    
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.store = None
+        self.capital_manager = None
+        self.trade_recorder = None
+        self.error = None
+    
+    def run(self):
+        try:
+            with profiler.span("startup.restore"):
+                if is_store_path(self.file_path):
+                    self.store = open_store(self.file_path)
+                    self.trade_recorder = TradeRecorder()
+                    self.capital_manager = CapitalManager(self.trade_recorder)
+                    self.store.load_into(self.capital_manager, self.trade_recorder)
+                else:
+                    self.capital_manager, self.trade_recorder = load_account(self.file_path)
+        except Exception as e:
+            self.error = str(e)
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+
+class RefreshScheduler(QObject):
+    """界面刷新调度：操作只标记哪些视图过期，本轮事件循环处理完后按注册顺序统一重绘一次
+
+    同一轮中多次标记同一视图只重绘一次；重绘函数自行只处理变化的行。
+    注册时给出 ready 的视图在 ready() 为假时跳过（例如所在标签页还没有构建，构建时会重新标记）。
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._views = {}
+        self._ready = {}
+        self._dirty = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+    
+    def register(self, name, callback, ready=None):
+        self._views[name] = callback
+        if ready is not None:
+            self._ready[name] = ready
+    
+    def views(self):
+        """已注册的 (视图名, 重绘函数)，按注册顺序"""
+        return list(self._views.items())
+    
+    def mark(self, *names):
+        self._dirty.update(names)
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    @timed("RefreshScheduler.flush")
+    def flush(self):
+        """立即重绘所有过期的视图（也可在需要同步显示时直接调用）"""
+        self._timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        for name, callback in self._views.items():
+            if name not in dirty:
+                continue
+            ready = self._ready.get(name)
+            if ready is not None and not ready():
+                continue
+            try:
+                callback()
+            except Exception as e:
+                # 一个视图出错不影响其余视图的刷新
+                QMessageBox.critical(self.parent(), "刷新失败", f"刷新界面时出错: {str(e)}")
+
+class TickFeedWorker(QThread):
+    """在后台线程中消费行情源并逐跳更新 RiskMonitor；越过预警线的那一跳立即发出信号"""
+    warning_crossed = pyqtSignal(float, str)
+    
+    def __init__(self, monitor, feed, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.feed = feed
+        self.error = None
+        monitor.on_warning = self.warning_crossed.emit
+    
+    def stop(self):
+        """请求停止并打断行情源正在进行的等待，调用后 wait() 很快返回"""
+        self.requestInterruption()
+        self.feed.stop()
+    
+    def run(self):
+        try:
+            self.monitor.run(self.feed, self.isInterruptionRequested)
+        except Exception as e:
+            self.error = str(e)
+
+class TradeTableModel(QAbstractTableModel):
+    """交易记录表格模型，交易页和历史页共用，单元格在 data() 中按需格式化"""
+    HEADERS = ["日期", "名称", "开仓价", "平仓价", "每点盈利", "开仓费", "平仓费", "盈亏"]
+    PROFIT_COLUMN = 7
+    
+    def __init__(self, trades, parent=None):
+        super().__init__(parent)
+        self._trades = trades
+        self._row_count = len(trades)
+        self._profit_color = QColor(Qt.GlobalColor.darkGreen)
+        self._loss_color = QColor(Qt.GlobalColor.red)
+    
+    @property
+    def trades(self):
+        return self._trades
+    
+    def set_trades(self, trades):
+        if trades is self._trades:
+            self.append_rows()
+            return
+        self.beginResetModel()
+        self._trades = trades
+        self._row_count = len(trades)
+        self.endResetModel()
+    
+    def reset_rows(self):
+        # 已有行的数值被原地改写（如批量重算）时整体刷新
+        self.beginResetModel()
+        self._row_count = len(self._trades)
+        self.endResetModel()
+    
+    def append_rows(self):
+        # 只通知新增的行，视图无需重建
+        count = len(self._trades)
+        if count > self._row_count:
+            self.beginInsertRows(QModelIndex(), self._row_count, count - 1)
+            self._row_count = count
+            self.endInsertRows()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self._trades.get_value(row, TradeStore.FIELDS[column])
+            return value if column < 2 else f"{value:.2f}"
+        if role == Qt.ItemDataRole.ForegroundRole and column == self.PROFIT_COLUMN:
+            if self._trades.columns['profit'][row] >= 0:
+                return self._profit_color
+            return self._loss_color
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+class TradeFilterProxyModel(QAbstractProxyModel):
+    """历史页的筛选/排序代理：行映射是 TradeQuery 给出的行号数组，未筛选未排序时直接透传"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = None
+        self.criteria = {}
+        # 排序字段及方向，None 表示按录入顺序
+        self.sort_field = None
+        self.sort_descending = False
+        self._rows = None
+        self._source_rows = None
+    
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self.on_source_reset)
+        model.rowsInserted.connect(self.on_rows_inserted)
+        self.refresh()
+    
+    def _is_identity(self):
+        return not self.criteria and self.sort_field is None
+    
+    def _compute_rows(self):
+        trades = self.sourceModel().trades
+        if self.query is None or self.query.store is not trades:
+            self.query = TradeQuery(trades)
+        if self._is_identity():
+            return None
+        rows = self.query.select(**self.criteria)
+        if self.sort_field is not None:
+            rows = self.query.sort(rows, self.sort_field, self.sort_descending)
+        return rows
+    
+    @timed("TradeFilterProxyModel.refresh")
+    def refresh(self):
+        self.beginResetModel()
+        self._rows = self._compute_rows()
+        self._source_rows = None
+        self.endResetModel()
+    
+    def on_source_reset(self):
+        # 数据被替换或原地改写，盈亏标记等索引都已过期
+        self.query = None
+        self.refresh()
+    
+    def set_filter(self, text="", start=None, end=None, sign=0):
+        criteria = {'text': text, 'start': start, 'end': end, 'sign': sign}
+        self.criteria = {key: value for key, value in criteria.items() if value}
+        self.refresh()
+    
+    def on_rows_inserted(self, parent, first, last):
+        if self._is_identity():
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.endInsertRows()
+            return
+        if self.sort_field is not None:
+            self.refresh()
+            return
+        # 未排序时只对新增行判断条件，追加到末尾
+        added = self.query.select(first=first, **self.criteria)
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(added) - 1)
+            self._rows.extend(added)
+            self._source_rows = None
+            self.endInsertRows()
+    
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_field = TradeStore.FIELDS[column] if column >= 0 else None
+        self.sort_descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TradeTableModel.HEADERS)
+    
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else self._rows[proxy_index.row()]
+        return self.sourceModel().index(row, proxy_index.column())
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._rows is None:
+            return self.index(source_index.row(), source_index.column())
+        if self._source_rows is None:
+            # 反向映射只在选择、滚动定位等少数情况下需要，按需建立
+            self._source_rows = {row: position for position, row in enumerate(self._rows)}
+        position = self._source_rows.get(source_index.row())
+        if position is None:
+            return QModelIndex()
+        return self.index(position, source_index.column())
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        return self.sourceModel().data(self.mapToSource(index), role)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return str(section + 1)
+
+class EquityCurveWidget(QWidget):
+    """权益曲线图：绘制前按控件像素宽度压缩数据点，每个像素列只画最小值和最大值"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = None
+        self.setMinimumHeight(160)
+        # (数据长度, 宽度) -> 压缩后的点，重绘时复用
+        self._cache_key = None
+        self._points = []
+    
+    def set_curve(self, values):
+        self.values = values
+        self._cache_key = None
+        self.update()
+    
+    def _downsampled(self, width):
+        key = (len(self.values), width)
+        if key != self._cache_key:
+            self._points = downsample_minmax(self.values, max(width, 1))
+            self._cache_key = key
+        return self._points
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#ffffff"))
+        if not self.values:
+            painter.setPen(QColor(Qt.GlobalColor.gray))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "暂无交易记录")
+            return
+        
+        margin = 8
+        width = self.width() - 2 * margin
+        height = self.height() - 2 * margin
+        points = self._downsampled(width)
+        low = min(0.0, min(value for _, value in points))
+        high = max(0.0, max(value for _, value in points))
+        span = (high - low) or 1.0
+        last_index = max(len(self.values) - 1, 1)
+        
+        def y_of(value):
+            return margin + (high - value) / span * height
+        
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor(Qt.GlobalColor.gray), 1, Qt.PenStyle.DashLine))
+        painter.drawLine(QPointF(margin, y_of(0.0)), QPointF(margin + width, y_of(0.0)))
+        
+        polygon = QPolygonF([
+            QPointF(margin + index / last_index * width, y_of(value)) for index, value in points
+        ])
+        painter.setPen(QPen(QColor("#3F51B5"), 1.5))
+        painter.drawPolyline(polygon)
+
+class PerformancePanel(QWidget):
+    """性能面板：各热点路径的调用次数、最近耗时和 p95 耗时，可导出 Chrome trace"""
+    HEADERS = ["名称", "次数", "最近 (ms)", "p95 (ms)"]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.WindowType.Tool)
+        self.setWindowTitle("性能面板 (F12)")
+        self.resize(560, 420)
+        layout = QVBoxLayout(self)
+        
+        self.enable_checkbox = QCheckBox("启用计时")
+        self.enable_checkbox.setChecked(profiler.enabled)
+        self.enable_checkbox.toggled.connect(self.set_enabled)
+        
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.counters_label = QLabel("")
+        
+        button_layout = QHBoxLayout()
+        reset_button = QPushButton("清空")
+        reset_button.clicked.connect(self.reset)
+        export_button = QPushButton("导出 Trace")
+        export_button.clicked.connect(self.export_trace)
+        button_layout.addWidget(reset_button)
+        button_layout.addWidget(export_button)
+        
+        layout.addWidget(self.enable_checkbox)
+        layout.addWidget(self.table, 1)
+        layout.addWidget(self.counters_label)
+        layout.addLayout(button_layout)
+    
+    def set_enabled(self, enabled):
+        profiler.enabled = enabled
+    
+    def reset(self):
+        profiler.reset()
+        self.refresh()
+    
+    def refresh(self):
+        summary = sorted(profiler.summary().items(), key=lambda item: -item[1][2])
+        self.table.setRowCount(len(summary))
+        for row, (name, (calls, last, p95)) in enumerate(summary):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(str(calls)))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{last * 1000:.2f}"))
+            self.table.setItem(row, 3, QTableWidgetItem(f"{p95 * 1000:.2f}"))
+        self.counters_label.setText(
+            "  ".join(f"{name}: {value}" for name, value in sorted(profiler.counters.items()))
+        )
+    
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出 Trace", "trace.json", "Chrome Trace (*.json);;All Files (*)"
+        )
+        if not file_path:
+            return
+        try:
+            profiler.export_chrome_trace(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "导出失败", f"导出 Trace 时出错: {str(e)}")
+
+class FuturesAccountingApp(QMainWindow):
+    SUMMARY_PERIODS = {"按周": "week", "按月": "month", "按年": "year", "自定义区间": "custom"}
+    # 风险监控的界面刷新间隔（毫秒），行情再快也只按这个帧率重绘
+    RISK_FRAME_INTERVAL = 50
+    POSITION_OFFSETS = {"开仓": "open", "平仓": "close", "平今": "close_today", "平昨": "close_yesterday"}
+    # 模拟行情每跳间隔（秒）
+    SIMULATED_TICK_INTERVAL = 0.001
+    # 回放行情时两跳之间最多等待的秒数（跨夜、跨周末的间隔不真的等完）
+    REPLAY_MAX_GAP = 5.0
+    # 标签页：(属性名, 标题, 构建方法, 页面上由 RefreshScheduler 重绘的视图)
+    TABS = (
+        ("trade_tab", "📝 交易记录", "create_trade_tab", ("daily_profit",)),
+        ("capital_tab", "💰 资金管理", "create_capital_tab", ("capital_labels", "capital_table", "calendar")),
+        ("position_tab", "📌 持仓", "create_position_tab", ("positions",)),
+        ("history_tab", "📊 历史记录", "create_history_tab", ()),
+        ("summary_tab", "📈 汇总报表", "create_summary_tab", ()),
+    )
+    # 上次打开的账户或数据文件，启动后自动在后台打开
+    LAST_ACCOUNT_KEY = "last_account"
+    STYLE_SHEET = """
+        QMainWindow {
+            background-color: #f5f5f5;
+        }
+        QLabel {
+            font-size: 12px;
+        }
+        QPushButton {
+            padding: 5px 10px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QTableView {
+            background-color: white;
+            gridline-color: #d0d0d0;
+        }
+        QHeaderView::section {
+            background-color: #e0e0e0;
+            padding: 4px;
+            border: 1px solid #d0d0d0;
+        }
+        QGroupBox {
+            border: 1px solid #cccccc;
+            border-radius: 5px;
+            margin-top: 10px;
+            font-weight: bold;
+            background-color: #ffffff;
+        }
+        QGroupBox::title {
+            subcontrol-origin: margin;
+            subcontrol-position: top center;
+            padding: 0 5px;
+        }
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.trade_recorder = TradeRecorder()
+        self.capital_manager = CapitalManager(self.trade_recorder)
+        # 合约规格表在启动时读取一次
+        self.contracts = default_registry()
+        self.trade_model = TradeTableModel(self.trade_recorder.trades)
+        self.history_model = TradeFilterProxyModel()
+        self.history_model.setSourceModel(self.trade_model)
+        self.load_worker = None
+        # 合并数据时的去重状态：各哈希已出现次数及新增/跳过计数，不在合并时为 None
+        self.load_merge = None
+        self.account_store = None
+        self.perf_panel = None
+        # 导入成交明细时手工补充的合约乘数，本次运行内沿用
+        self.statement_multipliers = {}
+        # 持仓簿：持仓页开平仓及导入成交明细后未平的部分，供盯市和风险监控使用
+        self.position_book = PositionBook(multipliers=self.statement_multipliers)
+        self.risk_worker = None
+        self.risk_monitor = None
+        self._risk_drawn = None
+        # 资金表格已绘制的记录列表及行数，追加记录时只补新行
+        self._capital_table_source = None
+        self._capital_rows_drawn = 0
+        # 启动后在后台打开上次账户的线程，及开始打开时的交易记录器（期间换过数据就不再覆盖）
+        self.restore_worker = None
+        self._restore_base = None
+        self.settings = QSettings("weike", "期货记账软件")
+        # 样式表在创建控件之前设置，控件显示时只应用一次，不必整体重新套用
+        self.setStyleSheet(self.STYLE_SHEET)
+        self.init_refresh()
+        with profiler.span("startup.init_ui"):
+            self.init_ui()
+        self.init_profiling()
+        self.setWindowTitle("期货交易记账软件")
+        self.resize(1400, 900)
+    
+    def init_ui(self):
+        main_widget = QWidget()
+        main_layout = QVBoxLayout()
+        main_layout.setContentsMargins(10, 10, 10, 10)
+        main_layout.setSpacing(10)
+        
+        # 创建标签页：先放空白页，第一次切换过去时才构建内容
+        self.tabs = QTabWidget()
+        self._pending_tabs = {}
+        for attr, title, builder, _ in self.TABS:
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            setattr(self, attr, page)
+            self._pending_tabs[attr] = builder
+            self.tabs.addTab(page, title)
+        self.ensure_tab(self.TABS[0][0])
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
+        main_layout.addWidget(self.tabs)
+        main_widget.setLayout(main_layout)
+        self.setCentralWidget(main_widget)
+        
+        # 状态栏
+        self.statusBar().showMessage("就绪")
+    
+    def ensure_tab(self, attr):
+        """构建尚未构建的标签页，并重绘页面上的视图；已构建时返回 False"""
+        builder = self._pending_tabs.pop(attr, None)
+        if builder is None:
+            return False
+        with profiler.span(f"build_tab.{attr}"):
+            getattr(self, attr).layout().addWidget(getattr(self, builder)())
+        views = next(views for name, _, _, views in self.TABS if name == attr)
+        if views:
+            self.refresh.mark(*views)
+        return True
+    
+    def is_tab_built(self, attr):
+        return attr not in self._pending_tabs
+    
+    def init_refresh(self):
+        # 按依赖顺序注册：先交易表，再各项汇总；页面上的视图在页面构建之后才重绘
+        self.refresh = RefreshScheduler(self)
+        view_tabs = {view: attr for attr, _, _, views in self.TABS for view in views}
+        for name, callback in (
+            ("trades", self.update_trade_table),
+            ("daily_profit", self.update_daily_profit),
+            ("capital_labels", self.update_capital_labels),
+            ("capital_table", self.update_capital_table),
+            ("calendar", self.update_calendar),
+            ("positions", self.update_position_table),
+            ("summary", self.update_summary_views),
+        ):
+            attr = view_tabs.get(name)
+            self.refresh.register(name, callback, partial(self.is_tab_built, attr) if attr else None)
+    
+    def mark_trades_changed(self):
+        self.refresh.mark("trades", "daily_profit", "capital_labels", "calendar", "summary")
+    
+    def mark_capital_changed(self):
+        self.refresh.mark("capital_labels", "capital_table")
+    
+    def init_profiling(self):
+        # F12 打开性能面板；计时开启时状态栏显示 p95 最慢的操作
+        self.perf_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.perf_label)
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(1000)
+        self.perf_timer.timeout.connect(self.refresh_profiling)
+        self.perf_timer.start()
+        QShortcut(QKeySequence("F12"), self, activated=self.toggle_perf_panel)
+    
+    def toggle_perf_panel(self):
+        if self.perf_panel is None:
+            self.perf_panel = PerformancePanel(self)
+        if self.perf_panel.isVisible():
+            self.perf_panel.hide()
+        else:
+            self.perf_panel.refresh()
+            self.perf_panel.show()
+    
+    def refresh_profiling(self):
+        if not profiler.enabled:
+            self.perf_label.setText("")
+            return
+        summary = profiler.summary()
+        if summary:
+            name, (calls, last, p95) = max(summary.items(), key=lambda item: item[1][2])
+            self.perf_label.setText(f"最慢: {name} 最近 {last * 1000:.1f}ms / p95 {p95 * 1000:.1f}ms")
+        if self.perf_panel is not None and self.perf_panel.isVisible():
+            self.perf_panel.refresh()
+    
+    def create_trade_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        
+        # 交易输入区域
+        input_group = QGroupBox("交易输入")
+        input_layout = QVBoxLayout(input_group)
+        
+        # 名称和价格
+        grid_layout = QHBoxLayout()
+        left_form = QVBoxLayout()
+        right_form = QVBoxLayout()
+        
+        # 左边表单
+        self.name_input = QLineEdit()
+        self.name_input.setPlaceholderText("例如: 沪铜2308")
+        self.open_price_input = QLineEdit()
+        self.open_price_input.setPlaceholderText("开仓价格")
+        self.close_price_input = QLineEdit()
+        self.close_price_input.setPlaceholderText("平仓价格")
+        self.spec_label = QLabel("")
+        self.name_input.textChanged.connect(self.update_spec_label)
+        
+        left_form.addWidget(QLabel("期货名称:"))
+        left_form.addWidget(self.name_input)
+        left_form.addWidget(self.spec_label)
+        left_form.addWidget(QLabel("开仓价格:"))
+        left_form.addWidget(self.open_price_input)
+        left_form.addWidget(QLabel("平仓价格:"))
+        left_form.addWidget(self.close_price_input)
+        
+        # 右边表单
+        # 合约乘数：默认按合约规格表，也可自定义
+        profit_layout = QHBoxLayout()
+        self.profit_combo = QComboBox()
+        self.profit_combo.addItems(["按合约规格", "自定义"])
+        self.custom_profit_input = QLineEdit()
+        self.custom_profit_input.setPlaceholderText("输入合约乘数 (元/点/手)")
+        self.custom_profit_input.setEnabled(False)
+        self.lots_input = QLineEdit("1")
+        self.lots_input.setPlaceholderText("手数")
+        
+        self.profit_combo.currentTextChanged.connect(lambda: self.custom_profit_input.setEnabled(
+            self.profit_combo.currentText() == "自定义"))
+        
+        profit_layout.addWidget(self.profit_combo)
+        profit_layout.addWidget(self.custom_profit_input)
+        profit_layout.addWidget(QLabel("手数:"))
+        profit_layout.addWidget(self.lots_input)
+        
+        # 手续费，留空时按合约规格计算
+        fee_layout = QHBoxLayout()
+        self.open_fee_input = QLineEdit()
+        self.open_fee_input.setPlaceholderText("开仓手续费 (元)，留空按规格")
+        self.close_fee_input = QLineEdit()
+        self.close_fee_input.setPlaceholderText("平仓手续费 (元)，留空按规格")
+        self.close_today_checkbox = QCheckBox("平今")
+        fee_layout.addWidget(self.open_fee_input)
+        fee_layout.addWidget(self.close_fee_input)
+        fee_layout.addWidget(self.close_today_checkbox)
+        
+        # 日期选择
+        self.trade_date_input = QLineEdit()
+        self.trade_date_input.setText(datetime.now().strftime("%Y-%m-%d"))
+        self.trade_date_input.setPlaceholderText("交易日期 (YYYY-MM-DD)")
+        
+        right_form.addWidget(QLabel("合约乘数:"))
+        right_form.addLayout(profit_layout)
+        right_form.addWidget(QLabel("手续费:"))
+        right_form.addLayout(fee_layout)
+        right_form.addWidget(QLabel("交易日期:"))
+        right_form.addWidget(self.trade_date_input)
+        
+        grid_layout.addLayout(left_form)
+        grid_layout.addLayout(right_form)
+        input_layout.addLayout(grid_layout)
+        
+        # 添加按钮
+        button_layout = QHBoxLayout()
+        add_button = QPushButton("➕ 添加交易")
+        add_button.setStyleSheet("background-color: #4CAF50; color: white; font-size: 14px;")
+        add_button.clicked.connect(self.add_trade)
+        button_layout.addWidget(add_button)
+        input_layout.addLayout(button_layout)
+        
+        # 当日盈亏显示
+        daily_profit_group = QGroupBox("当日盈亏")
+        daily_layout = QHBoxLayout(daily_profit_group)
+        self.daily_profit_label = QLabel("0.00 元")
+        self.daily_profit_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        daily_layout.addWidget(self.daily_profit_label)
+        
+        # 交易记录表格
+        table_group = QGroupBox("交易记录")
+        table_layout = QVBoxLayout(table_group)
+        self.trade_table = self.create_trade_view()
+        table_layout.addWidget(self.trade_table)
+        
+        layout.addWidget(input_group)
+        layout.addWidget(daily_profit_group)
+        layout.addWidget(table_group, 1)
+        tab.setLayout(layout)
+        return tab
+    
+    def create_trade_view(self):
+        view = QTableView()
+        view.setModel(self.trade_model)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # 固定行高，避免大数据量时逐行计算尺寸
+        view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        return view
+    
+    def create_capital_tab(self):
+        tab = QWidget()
+        layout = QGridLayout()
+        layout.setSpacing(15)
+        
+        # 资金信息显示
+        capital_info_group = QGroupBox("资金概览")
+        info_layout = QVBoxLayout(capital_info_group)
+        
+        self.balance_label = QLabel("总资金: 0.00 元")
+        self.balance_label.setFont(QFont("Arial", 12))
+        self.margin_label = QLabel("保证金占用: 0.00 元")
+        self.margin_label.setFont(QFont("Arial", 12))
+        self.ratio_label = QLabel("保证金比例: 0.0%")
+        self.ratio_label.setFont(QFont("Arial", 12))
+        self.available_label = QLabel("可用资金: 0.00 元")
+        self.available_label.setFont(QFont("Arial", 12))
+        self.risk_label = QLabel("")
+        self.risk_label.setStyleSheet("color: red; font-weight: bold; font-size: 14px;")
+        
+        info_layout.addWidget(self.balance_label)
+        info_layout.addWidget(self.margin_label)
+        info_layout.addWidget(self.ratio_label)
+        info_layout.addWidget(self.available_label)
+        info_layout.addWidget(self.risk_label)
+        
+        # 资金操作
+        capital_operation_group = QGroupBox("资金操作")
+        capital_layout = QVBoxLayout(capital_operation_group)
+        
+        # 入金出金
+        deposit_withdraw_group = QWidget()
+        dw_layout = QHBoxLayout(deposit_withdraw_group)
+        
+        self.capital_input = QLineEdit()
+        self.capital_input.setPlaceholderText("金额 (元)")
+        deposit_button = QPushButton("💵 入金")
+        deposit_button.setStyleSheet("background-color: #2196F3; color: white; font-size: 14px;")
+        deposit_button.clicked.connect(self.deposit)
+        withdraw_button = QPushButton("💸 出金")
+        withdraw_button.setStyleSheet("background-color: #FF9800; color: white; font-size: 14px;")
+        withdraw_button.clicked.connect(self.withdraw)
+        
+        dw_layout.addWidget(QLabel("金额:"))
+        dw_layout.addWidget(self.capital_input)
+        dw_layout.addWidget(deposit_button)
+        dw_layout.addWidget(withdraw_button)
+        
+        # 保证金设置
+        margin_group = QWidget()
+        margin_layout = QHBoxLayout(margin_group)
+        
+        self.margin_input = QLineEdit()
+        self.margin_input.setPlaceholderText("保证金金额 (元)")
+        set_margin_button = QPushButton("🛡️ 设置保证金")
+        set_margin_button.setStyleSheet("background-color: #9C27B0; color: white; font-size: 14px;")
+        set_margin_button.clicked.connect(self.set_margin)
+        
+        margin_layout.addWidget(QLabel("保证金:"))
+        margin_layout.addWidget(self.margin_input)
+        margin_layout.addWidget(set_margin_button)
+        
+        capital_layout.addWidget(QLabel("资金操作:"))
+        capital_layout.addWidget(deposit_withdraw_group)
+        capital_layout.addWidget(QLabel("保证金设置:"))
+        capital_layout.addWidget(margin_group)
+        
+        # 实时风险监控：行情在后台线程逐跳计算，界面按固定帧率刷新
+        risk_group = QWidget()
+        risk_layout = QHBoxLayout(risk_group)
+        self.risk_feed_combo = QComboBox()
+        self.risk_feed_combo.addItems(["模拟行情", "回放行情文件"])
+        self.risk_button = QPushButton("📡 开始监控")
+        self.risk_button.setStyleSheet("background-color: #3F51B5; color: white; font-size: 14px;")
+        self.risk_button.clicked.connect(self.toggle_risk_monitor)
+        self.risk_status_label = QLabel("")
+        risk_layout.addWidget(QLabel("行情源:"))
+        risk_layout.addWidget(self.risk_feed_combo)
+        risk_layout.addWidget(self.risk_button)
+        risk_layout.addWidget(self.risk_status_label, 1)
+        capital_layout.addWidget(QLabel("风险监控:"))
+        capital_layout.addWidget(risk_group)
+        
+        self.risk_frame_timer = QTimer(self)
+        self.risk_frame_timer.setInterval(self.RISK_FRAME_INTERVAL)
+        self.risk_frame_timer.timeout.connect(self.refresh_risk_view)
+        
+        # 资金变动表格
+        capital_table_group = QGroupBox("资金变动记录")
+        capital_table_layout = QVBoxLayout(capital_table_group)
+        self.capital_table = QTableWidget()
+        self.capital_table.setColumnCount(3)
+        self.capital_table.setHorizontalHeaderLabels(["类型", "金额", "时间"])
+        self.capital_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.capital_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        capital_table_layout.addWidget(self.capital_table)
+        
+        # 日历和每日盈利
+        calendar_group = QGroupBox("每日盈利日历")
+        calendar_layout = QVBoxLayout(calendar_group)
+        
+        # 创建日历控件
+        self.calendar = QCalendarWidget()
+        self.calendar.setGridVisible(True)
+        self.calendar.setStyleSheet("""
+            QCalendarWidget QAbstractItemView:enabled {
+                selection-background-color: #4CAF50;
+                selection-color: white;
+            }
+        """)
+        self.calendar.selectionChanged.connect(self.on_calendar_date_selected)
+        self.calendar.currentPageChanged.connect(self.update_calendar)
+        
+        # 日历底色格式只创建一次，所有日期共用
+        self.calendar_empty_format = QTextCharFormat()
+        self.calendar_profit_format = QTextCharFormat()
+        self.calendar_profit_format.setBackground(QBrush(QColor(200, 255, 200)))  # 浅绿色
+        self.calendar_profit_format.setForeground(QBrush(QColor(0, 100, 0)))       # 深绿色
+        self.calendar_loss_format = QTextCharFormat()
+        self.calendar_loss_format.setBackground(QBrush(QColor(255, 200, 200)))  # 浅红色
+        self.calendar_loss_format.setForeground(QBrush(QColor(139, 0, 0)))       # 深红色
+        
+        # 显示选中日期的盈利
+        self.calendar_profit_label = QLabel("请选择日期查看当日盈亏")
+        self.calendar_profit_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        self.calendar_profit_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.calendar_profit_label.setStyleSheet("background-color: #e0f7fa; padding: 10px; border-radius: 5px;")
+        
+        calendar_layout.addWidget(self.calendar)
+        calendar_layout.addWidget(self.calendar_profit_label)
+        
+        # 布局安排
+        layout.addWidget(capital_info_group, 0, 0)
+        layout.addWidget(capital_operation_group, 1, 0)
+        layout.addWidget(capital_table_group, 2, 0)
+        layout.addWidget(calendar_group, 0, 1, 3, 1)  # 跨3行
+        
+        # 设置列宽比例
+        layout.setColumnStretch(0, 2)
+        layout.setColumnStretch(1, 1)
+        
+        tab.setLayout(layout)
+        return tab
+    
+    def create_position_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        
+        # 开平仓输入：平仓按先进先出配对，平今/平昨只配当日/此前的开仓
+        order_group = QGroupBox("开平仓")
+        order_layout = QHBoxLayout(order_group)
+        self.position_name_input = QLineEdit()
+        self.position_name_input.setPlaceholderText("合约，例如 cu2309")
+        self.position_direction_combo = QComboBox()
+        self.position_direction_combo.addItems(["买", "卖"])
+        self.position_offset_combo = QComboBox()
+        self.position_offset_combo.addItems(list(self.POSITION_OFFSETS))
+        self.position_price_input = QLineEdit()
+        self.position_price_input.setPlaceholderText("成交价")
+        self.position_lots_input = QLineEdit("1")
+        self.position_lots_input.setPlaceholderText("手数")
+        self.position_fee_input = QLineEdit()
+        self.position_fee_input.setPlaceholderText("手续费（留空按规格）")
+        self.position_date_input = QLineEdit(datetime.now().strftime("%Y-%m-%d"))
+        submit_button = QPushButton("提交")
+        submit_button.setStyleSheet("background-color: #4CAF50; color: white; font-size: 14px;")
+        submit_button.clicked.connect(self.submit_order)
+        for widget in (self.position_name_input, self.position_direction_combo, self.position_offset_combo,
+                       self.position_price_input, self.position_lots_input, self.position_fee_input,
+                       self.position_date_input, submit_button):
+            order_layout.addWidget(widget)
+        
+        # 盯市：输入结算价或最新价
+        mark_group = QGroupBox("盯市")
+        mark_layout = QHBoxLayout(mark_group)
+        self.mark_prices_input = QLineEdit()
+        self.mark_prices_input.setPlaceholderText("合约=价格，多个用逗号分隔，例如 cu2309=69100, rb2310=3810")
+        mark_button = QPushButton("更新价格")
+        mark_button.clicked.connect(self.mark_positions)
+        self.unrealized_label = QLabel("浮动盈亏: 0.00 元")
+        self.unrealized_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        mark_layout.addWidget(self.mark_prices_input, 1)
+        mark_layout.addWidget(mark_button)
+        mark_layout.addWidget(self.unrealized_label)
+        
+        position_group = QGroupBox("当前持仓")
+        position_layout = QVBoxLayout(position_group)
+        self.position_table = QTableWidget()
+        self.position_table.setColumnCount(7)
+        self.position_table.setHorizontalHeaderLabels(["合约", "方向", "开仓日期", "开仓价", "手数", "盯市价", "浮动盈亏"])
+        self.position_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.position_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        position_layout.addWidget(self.position_table)
+        
+        layout.addWidget(order_group)
+        layout.addWidget(mark_group)
+        layout.addWidget(position_group, 1)
+        tab.setLayout(layout)
+        return tab
+    
+    def create_summary_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        
+        # 汇总条件
+        query_group = QGroupBox("汇总条件")
+        query_layout = QHBoxLayout(query_group)
+        self.summary_period_combo = QComboBox()
+        self.summary_period_combo.addItems(list(self.SUMMARY_PERIODS))
+        self.summary_period_combo.currentTextChanged.connect(self.update_summary_table)
+        self.summary_start_input = QLineEdit()
+        self.summary_start_input.setPlaceholderText("开始日期 (YYYY-MM-DD)，留空为最早")
+        self.summary_end_input = QLineEdit()
+        self.summary_end_input.setPlaceholderText("结束日期 (YYYY-MM-DD)，留空为最晚")
+        query_button = QPushButton("🔍 查询")
+        query_button.setStyleSheet("background-color: #3F51B5; color: white; font-size: 14px;")
+        query_button.clicked.connect(self.update_summary_table)
+        
+        query_layout.addWidget(QLabel("周期:"))
+        query_layout.addWidget(self.summary_period_combo)
+        query_layout.addWidget(QLabel("日期:"))
+        query_layout.addWidget(self.summary_start_input)
+        query_layout.addWidget(QLabel("至"))
+        query_layout.addWidget(self.summary_end_input)
+        query_layout.addWidget(query_button)
+        
+        self.summary_total_label = QLabel("")
+        self.summary_total_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        
+        # 汇总表格
+        summary_group = QGroupBox("区间汇总")
+        summary_layout = QVBoxLayout(summary_group)
+        self.summary_table = QTableWidget()
+        self.summary_table.setColumnCount(6)
+        self.summary_table.setHorizontalHeaderLabels(["区间", "笔数", "盈利笔数", "胜率", "手续费", "盈亏"])
+        self.summary_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.summary_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.summary_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        summary_layout.addWidget(self.summary_table)
+        
+        # 品种 / 合约排行
+        leaderboard_group = QGroupBox("盈亏排行")
+        leaderboard_layout = QVBoxLayout(leaderboard_group)
+        self.leaderboard_combo = QComboBox()
+        self.leaderboard_combo.addItems(["按品种", "按合约"])
+        self.leaderboard_combo.currentTextChanged.connect(self.update_leaderboard)
+        self.leaderboard_table = QTableWidget()
+        self.leaderboard_table.setColumnCount(6)
+        self.leaderboard_table.setHorizontalHeaderLabels(["名称", "笔数", "盈利笔数", "胜率", "手续费", "盈亏"])
+        self.leaderboard_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.leaderboard_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.leaderboard_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        leaderboard_layout.addWidget(self.leaderboard_combo)
+        leaderboard_layout.addWidget(self.leaderboard_table)
+        
+        tables_layout = QHBoxLayout()
+        tables_layout.addWidget(summary_group, 3)
+        tables_layout.addWidget(leaderboard_group, 2)
+        
+        # 权益曲线与绩效统计
+        performance_group = QGroupBox("权益曲线与绩效统计")
+        performance_layout = QHBoxLayout(performance_group)
+        self.equity_curve = EquityCurveWidget()
+        self.performance_label = QLabel("")
+        self.performance_label.setMinimumWidth(220)
+        performance_layout.addWidget(self.equity_curve, 1)
+        performance_layout.addWidget(self.performance_label)
+        
+        layout.addWidget(query_group)
+        layout.addWidget(self.summary_total_label)
+        layout.addLayout(tables_layout, 1)
+        layout.addWidget(performance_group, 1)
+        tab.setLayout(layout)
+        return tab
+    
+    def create_history_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setSpacing(10)
+        
+        # 操作按钮
+        button_group = QGroupBox("数据操作")
+        button_layout = QHBoxLayout(button_group)
+        
+        load_button = QPushButton("📂 加载数据")
+        load_button.setStyleSheet("background-color: #607D8B; color: white; font-size: 14px;")
+        load_button.clicked.connect(self.load_data)
+        save_button = QPushButton("💾 保存数据")
+        save_button.setStyleSheet("background-color: #009688; color: white; font-size: 14px;")
+        save_button.clicked.connect(self.save_data)
+        merge_button = QPushButton("🔀 合并数据")
+        merge_button.setStyleSheet("background-color: #8BC34A; color: white; font-size: 14px;")
+        merge_button.clicked.connect(self.merge_data)
+        
+        account_button = QPushButton("🗄️ 打开账户")
+        account_button.setStyleSheet("background-color: #795548; color: white; font-size: 14px;")
+        account_button.clicked.connect(self.open_account)
+        
+        statement_button = QPushButton("📥 导入成交明细")
+        statement_button.setStyleSheet("background-color: #FF9800; color: white; font-size: 14px;")
+        statement_button.clicked.connect(self.import_statement)
+        
+        button_layout.addWidget(load_button)
+        button_layout.addWidget(save_button)
+        button_layout.addWidget(merge_button)
+        button_layout.addWidget(account_button)
+        button_layout.addWidget(statement_button)
+        
+        # 筛选条件：输入停顿后才重新筛选
+        filter_group = QGroupBox("筛选")
+        filter_layout = QHBoxLayout(filter_group)
+        self.history_name_filter = QLineEdit()
+        self.history_name_filter.setPlaceholderText("合约名称包含...")
+        self.history_start_filter = QLineEdit()
+        self.history_start_filter.setPlaceholderText("开始日期 (YYYY-MM-DD)")
+        self.history_end_filter = QLineEdit()
+        self.history_end_filter.setPlaceholderText("结束日期 (YYYY-MM-DD)")
+        self.history_sign_filter = QComboBox()
+        self.history_sign_filter.addItems(["全部", "盈利", "亏损"])
+        self.history_filter_label = QLabel("")
+        
+        self.history_filter_timer = QTimer(self)
+        self.history_filter_timer.setSingleShot(True)
+        self.history_filter_timer.setInterval(250)
+        self.history_filter_timer.timeout.connect(self.apply_history_filter)
+        for line_edit in (self.history_name_filter, self.history_start_filter, self.history_end_filter):
+            line_edit.textChanged.connect(self.history_filter_timer.start)
+        self.history_sign_filter.currentIndexChanged.connect(self.apply_history_filter)
+        
+        filter_layout.addWidget(QLabel("名称:"))
+        filter_layout.addWidget(self.history_name_filter)
+        filter_layout.addWidget(QLabel("日期:"))
+        filter_layout.addWidget(self.history_start_filter)
+        filter_layout.addWidget(QLabel("至"))
+        filter_layout.addWidget(self.history_end_filter)
+        filter_layout.addWidget(QLabel("盈亏:"))
+        filter_layout.addWidget(self.history_sign_filter)
+        filter_layout.addWidget(self.history_filter_label)
+        
+        # 批量重算：按品种和日期区间选出交易，整体重算后只刷新一次
+        recompute_group = QGroupBox("批量重算盈亏")
+        recompute_layout = QHBoxLayout(recompute_group)
+        self.recompute_product_input = QLineEdit()
+        self.recompute_product_input.setPlaceholderText("品种，空为全部")
+        self.recompute_start_input = QLineEdit()
+        self.recompute_start_input.setPlaceholderText("开始日期")
+        self.recompute_end_input = QLineEdit()
+        self.recompute_end_input.setPlaceholderText("结束日期")
+        self.recompute_old_multiplier = QLineEdit()
+        self.recompute_old_multiplier.setPlaceholderText("原乘数")
+        self.recompute_new_multiplier = QLineEdit()
+        self.recompute_new_multiplier.setPlaceholderText("新乘数")
+        self.recompute_fees_checkbox = QCheckBox("按规格重算手续费")
+        recompute_button = QPushButton("重算")
+        recompute_button.clicked.connect(self.recompute_profits)
+        
+        recompute_layout.addWidget(self.recompute_product_input)
+        recompute_layout.addWidget(self.recompute_start_input)
+        recompute_layout.addWidget(QLabel("至"))
+        recompute_layout.addWidget(self.recompute_end_input)
+        recompute_layout.addWidget(QLabel("乘数:"))
+        recompute_layout.addWidget(self.recompute_old_multiplier)
+        recompute_layout.addWidget(QLabel("→"))
+        recompute_layout.addWidget(self.recompute_new_multiplier)
+        recompute_layout.addWidget(self.recompute_fees_checkbox)
+        recompute_layout.addWidget(recompute_button)
+        
+        # 历史记录表格，点击表头按该列的原始数值排序
+        history_group = QGroupBox("历史交易记录")
+        history_layout = QVBoxLayout(history_group)
+        self.history_table = self.create_trade_view()
+        self.history_table.setModel(self.history_model)
+        self.history_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.history_table.setSortingEnabled(True)
+        history_layout.addWidget(self.history_table)
+        
+        layout.addWidget(button_group)
+        layout.addWidget(filter_group)
+        layout.addWidget(recompute_group)
+        layout.addWidget(history_group, 1)
+        tab.setLayout(layout)
+        return tab
+    
+    def deposit(self):
+        amount_text = self.capital_input.text()
+        if not amount_text:
+            QMessageBox.warning(self, "输入错误", "请输入入金金额")
+            return
+        
+        try:
+            amount = float(amount_text)
+            if self.capital_manager.deposit(amount):
+                if self.account_store is not None:
+                    self.account_store.add_capital(self.capital_manager.transactions[-1:])
+                self.mark_capital_changed()
+                self.capital_input.clear()
+                self.statusBar().showMessage(f"成功入金 {amount:.2f} 元", 5000)
+            else:
+                QMessageBox.warning(self, "操作失败", "入金金额必须大于0")
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的数字")
+    
+    def withdraw(self):
+        amount_text = self.capital_input.text()
+        if not amount_text:
+            QMessageBox.warning(self, "输入错误", "请输入出金金额")
+            return
+        
+        try:
+            amount = float(amount_text)
+            if self.capital_manager.withdraw(amount):
+                if self.account_store is not None:
+                    self.account_store.add_capital(self.capital_manager.transactions[-1:])
+                self.mark_capital_changed()
+                self.capital_input.clear()
+                self.statusBar().showMessage(f"成功出金 {amount:.2f} 元", 5000)
+            else:
+                QMessageBox.warning(self, "操作失败", "出金金额不能大于可用资金")
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的数字")
+    
+    @pyqtSlot()
+    @timed("add_trade")
+    def add_trade(self):
+        # 获取输入值
+        name = self.name_input.text().strip()
+        open_price = self.open_price_input.text().strip()
+        close_price = self.close_price_input.text().strip()
+        open_fee = self.open_fee_input.text().strip()
+        close_fee = self.close_fee_input.text().strip()
+        lots = self.lots_input.text().strip() or "1"
+        trade_date = self.trade_date_input.text().strip()
+        
+        # 验证输入
+        if not all([name, open_price, close_price]):
+            QMessageBox.warning(self, "输入错误", "请填写期货名称和价格")
+            return
+        
+        try:
+            open_price = float(open_price)
+            close_price = float(close_price)
+            # 与持仓页一致，手数只接受整数
+            lots = int(lots)
+            open_fee = float(open_fee) if open_fee else None
+            close_fee = float(close_fee) if close_fee else None
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的价格、整数手数和手续费")
+            return
+        if lots <= 0:
+            QMessageBox.warning(self, "输入错误", "手数必须大于 0")
+            return
+        
+        # 验证日期格式
+        if trade_date:
+            try:
+                datetime.strptime(trade_date, "%Y-%m-%d")
+            except ValueError:
+                QMessageBox.warning(self, "日期格式错误", "请使用 YYYY-MM-DD 格式")
+                return
+        else:
+            trade_date = datetime.now().strftime("%Y-%m-%d")
+        
+        # 每点盈利 = 合约乘数 × 手数
+        spec = self.contracts.get(name)
+        if self.profit_combo.currentText() == "自定义":
+            try:
+                multiplier = float(self.custom_profit_input.text().strip())
+            except ValueError:
+                QMessageBox.warning(self, "输入错误", "请输入有效的合约乘数")
+                return
+        elif spec is not None:
+            multiplier = spec.multiplier
+        else:
+            QMessageBox.warning(self, "输入错误", f"规格表中没有 {name} 的品种，请选择“自定义”并输入合约乘数")
+            return
+        profit_per_point = multiplier * lots
+        
+        # 手续费留空时按规格计算，没有规格则为 0
+        if open_fee is None:
+            open_fee = round(spec.fee(open_price, lots, "open"), 2) if spec is not None else 0.0
+        if close_fee is None:
+            offset = "close_today" if self.close_today_checkbox.isChecked() else "close"
+            close_fee = round(spec.fee(close_price, lots, offset), 2) if spec is not None else 0.0
+        
+        # 计算盈亏
+        price_diff = close_price - open_price
+        profit = price_diff * profit_per_point - open_fee - close_fee
+        
+        # 创建交易记录
+        trade = {
+            'date': trade_date,
+            'name': name,
+            'open_price': open_price,
+            'close_price': close_price,
+            'profit_per_point': profit_per_point,
+            'open_fee': open_fee,
+            'close_fee': close_fee,
+            'profit': profit
+        }
+        
+        self.trade_recorder.add_trade(trade)
+        if self.account_store is not None:
+            self.account_store.add_trades([trade])
+        self.mark_trades_changed()
+        
+        # 清空输入字段
+        self.name_input.clear()
+        self.open_price_input.clear()
+        self.close_price_input.clear()
+        self.open_fee_input.clear()
+        self.close_fee_input.clear()
+        self.custom_profit_input.clear()
+        self.lots_input.setText("1")
+        self.trade_date_input.setText(datetime.now().strftime("%Y-%m-%d"))
+        
+        self.statusBar().showMessage(f"成功添加交易: {name}, 盈亏: {profit:.2f} 元", 5000)
+    
+    def submit_order(self):
+        name = self.position_name_input.text().strip()
+        date_text = self.position_date_input.text().strip() or datetime.now().strftime("%Y-%m-%d")
+        fee_text = self.position_fee_input.text().strip()
+        try:
+            price = float(self.position_price_input.text().strip())
+            lots = int(self.position_lots_input.text().strip() or "1")
+            fee = float(fee_text) if fee_text else None
+            datetime.strptime(date_text, "%Y-%m-%d")
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的价格、整数手数、手续费和 YYYY-MM-DD 日期")
+            return
+        if not name or lots <= 0:
+            QMessageBox.warning(self, "输入错误", "请填写合约，手数必须大于 0")
+            return
+        
+        offset = self.POSITION_OFFSETS[self.position_offset_combo.currentText()]
+        direction = 1 if self.position_direction_combo.currentText() == "买" else -1
+        if fee is None:
+            spec = self.contracts.get(name)
+            # 平昨按普通平仓费率
+            fee_offset = offset if offset in ("open", "close_today") else "close"
+            fee = round(spec.fee(price, lots, fee_offset), 2) if spec is not None else 0.0
+        
+        book = self.position_book
+        try:
+            if offset == "open":
+                book.open(date_text, name, direction, price, lots, fee)
+                message = f"已开仓: {name} {lots} 手"
+            else:
+                # 卖平多、买平空
+                trades, remaining = book.close(date_text, name, -direction, price, lots, fee, offset)
+                self.trade_recorder.add_trades(trades)
+                if self.account_store is not None:
+                    self.account_store.add_trades(trades)
+                self.mark_trades_changed()
+                realized = sum(trade['profit'] for trade in trades)
+                message = f"已平仓: {name} {lots - remaining} 手，实现盈亏 {realized:.2f} 元"
+                if remaining:
+                    QMessageBox.warning(self, "平仓", f"{remaining} 手找不到可平的持仓，已忽略")
+        except ValueError as e:
+            QMessageBox.warning(self, "输入错误", str(e))
+            return
+        self.save_positions()
+        
+        self.position_price_input.clear()
+        self.position_fee_input.clear()
+        self.position_lots_input.setText("1")
+        self.refresh.mark("positions")
+        self.statusBar().showMessage(message, 5000)
+    
+    def mark_positions(self):
+        prices = {}
+        for item in self.mark_prices_input.text().replace("，", ",").split(","):
+            if not item.strip():
+                continue
+            name, _, value = item.partition("=")
+            try:
+                prices[name.strip()] = float(value)
+            except ValueError:
+                QMessageBox.warning(self, "输入错误", f"价格格式应为 合约=价格: {item.strip()}")
+                return
+        self.update_position_table(prices)
+    
+    def save_positions(self):
+        """持仓簿变化后记入账户，已打开的 SQLite / 日志账户立即写入"""
+        lots = self.position_book.open_lots()
+        self.capital_manager.open_lots = lots
+        if self.account_store is not None:
+            self.account_store.set_positions(lots)
+        self.update_risk_monitor()
+    
+    def restore_positions(self):
+        """按账户中保存的持仓重建持仓簿；询问合约乘数时取消的品种不载入"""
+        lots = self.capital_manager.open_lots
+        if not self.ask_multipliers(lot[0] for lot in lots):
+            lots = [lot for lot in lots if contract_multiplier(lot[0], self.statement_multipliers) is not None]
+            self.statusBar().showMessage("部分持仓缺少合约乘数，未载入持仓页", 7000)
+        self.position_book = PositionBook(multipliers=self.statement_multipliers)
+        self.position_book.restore_lots(lots)
+        self.update_risk_monitor()
+        self.refresh.mark("positions")
+    
+    def ask_multipliers(self, names):
+        """逐个询问规格表中没有的品种的合约乘数，取消时返回 False"""
+        for product in missing_multipliers(names, self.statement_multipliers):
+            value, ok = QInputDialog.getDouble(
+                self, "合约乘数", f"请输入 {product} 的合约乘数（每点每手金额）:", 10, 0.0001, 1e7, 4
+            )
+            if not ok:
+                return False
+            self.statement_multipliers[product] = value
+        return True
+    
+    @timed("update_position_table")
+    def update_position_table(self, prices=None):
+        """整个持仓簿一次盯市，表格只列未平的开仓"""
+        book = self.position_book
+        profits = book.mark(prices or {})
+        rows = [row for row, left in enumerate(book.lots) if left > 0]
+        self.position_table.setRowCount(len(rows))
+        for table_row, row in enumerate(rows):
+            name_id = book.name_ids[row]
+            profit = profits[row]
+            values = (book.names[name_id], "多" if book.sides[row] > 0 else "空", book.dates[row],
+                      f"{book.open_prices[row]:.2f}", str(book.lots[row]),
+                      f"{book.last_prices[name_id]:.2f}", f"{profit:.2f}")
+            for column, value in enumerate(values):
+                self.position_table.setItem(table_row, column, QTableWidgetItem(value))
+            self.position_table.item(table_row, 6).setForeground(
+                QColor(Qt.GlobalColor.darkGreen) if profit >= 0 else QColor(Qt.GlobalColor.red)
+            )
+        total = sum(profits[row] for row in rows)
+        self.unrealized_label.setText(f"浮动盈亏: {total:.2f} 元")
+    
+    def update_spec_label(self, name):
+        spec = self.contracts.get(name.strip()) if name.strip() else None
+        if spec is None:
+            self.spec_label.setText("规格表中无此品种，请自定义合约乘数" if name.strip() else "")
+            return
+        if spec.fee_mode == "fixed":
+            fees = [f"{value:g}" for value in (spec.open_fee, spec.close_fee, spec.close_today_fee)]
+            fee_unit = "元/手"
+        else:
+            fees = [f"{value * 10000:g}" for value in (spec.open_fee, spec.close_fee, spec.close_today_fee)]
+            fee_unit = "‱成交额"
+        self.spec_label.setText(
+            f"{spec.product}: 乘数 {spec.multiplier:g}，最小变动 {spec.tick_size:g}，"
+            f"手续费 开 {fees[0]} / 平 {fees[1]} / 平今 {fees[2]} {fee_unit}，"
+            f"保证金率 {spec.margin_rate:.0%}"
+        )
+    
+    def set_margin(self):
+        margin_text = self.margin_input.text().strip()
+        if not margin_text:
+            QMessageBox.warning(self, "输入错误", "请输入保证金金额")
+            return
+        
+        try:
+            margin = float(margin_text)
+            success, message = self.capital_manager.set_margin(margin)
+            if success:
+                if self.account_store is not None:
+                    self.account_store.add_capital(self.capital_manager.transactions[-1:])
+                    self.account_store.set_margin(margin)
+                self.mark_capital_changed()
+                if message:
+                    self.risk_label.setText(message)
+                    self.statusBar().showMessage(message, 5000)
+                self.margin_input.clear()
+            else:
+                QMessageBox.warning(self, "操作失败", message)
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的保证金金额")
+    
+    @timed("update_trade_table")
+    def update_trade_table(self):
+        self.trade_model.set_trades(self.trade_recorder.trades)
+    
+    @timed("update_daily_profit")
+    def update_daily_profit(self):
+        if not self.trade_recorder.trades:
+            self.daily_profit_label.setText("0.00 元")
+            return
+            
+        # 获取当前日期或最后交易日期
+        last_date = self.trade_recorder.trades[-1]['date']
+        daily_profit = self.trade_recorder.calculate_daily_profit(last_date)
+        
+        self.daily_profit_label.setText(f"{daily_profit:.2f} 元")
+        if daily_profit >= 0:
+            self.daily_profit_label.setStyleSheet("color: darkgreen; font-size: 16px; font-weight: bold;")
+        else:
+            self.daily_profit_label.setStyleSheet("color: red; font-size: 16px; font-weight: bold;")
+    
+    @timed("update_capital_table")
+    def update_capital_table(self):
+        # 记录只会追加，同一账户只补绘新增的行；换了账户才整表重绘
+        transactions = self.capital_manager.transactions
+        start = self._capital_rows_drawn if self._capital_table_source is transactions else 0
+        if start > len(transactions):
+            start = 0
+        self.capital_table.setRowCount(len(transactions))
+        for row in range(start, len(transactions)):
+            trans_type, amount, time = transactions[row]
+            self.capital_table.setItem(row, 0, QTableWidgetItem(trans_type))
+            
+            amount_item = QTableWidgetItem(f"{amount:.2f}")
+            # 保证金记录的金额是变化后的占用，不按正负着色
+            if trans_type != MARGIN:
+                amount_item.setForeground(
+                    QColor(Qt.GlobalColor.darkGreen) if amount >= 0 else QColor(Qt.GlobalColor.red)
+                )
+            self.capital_table.setItem(row, 1, amount_item)
+            
+            self.capital_table.setItem(row, 2, QTableWidgetItem(time))
+        self._capital_table_source = transactions
+        self._capital_rows_drawn = len(transactions)
+    
+    @timed("update_capital_labels")
+    def update_capital_labels(self):
+        # 总资金含已实现盈亏，交易变动后只需刷新这几个标签
+        self.balance_label.setText(
+            f"总资金: {self.capital_manager.balance:.2f} 元（入金净额 {self.capital_manager.cash:.2f}，"
+            f"已实现盈亏 {self.capital_manager.realized_profit():.2f}）"
+        )
+        self.margin_label.setText(f"保证金占用: {self.capital_manager.margin:.2f} 元")
+        self.ratio_label.setText(f"保证金比例: {self.capital_manager.margin_ratio():.1f}%")
+        self.available_label.setText(f"可用资金: {self.capital_manager.available_balance():.2f} 元")
+        
+        if self.risk_monitor is not None:
+            # 监控中由帧定时器按行情刷新保证金相关的显示，总资金变化立即计入
+            self.risk_monitor.set_balance(self.capital_manager.balance)
+            self.risk_monitor.reset()
+            self._risk_drawn = None
+            self.refresh_risk_view()
+        else:
+            self.show_risk_ratio(self.capital_manager.margin_ratio())
+    
+    def show_risk_ratio(self, ratio):
+        # 检查风险
+        if ratio >= WARNING_RATIO:
+            self.risk_label.setText(f"请注意风险：保证金占用{ratio:.1f}%！")
+            self.risk_label.setStyleSheet("color: red; font-weight: bold; font-size: 14px;")
+        else:
+            self.risk_label.setText("")
+    
+    def toggle_risk_monitor(self):
+        if self.risk_worker is not None:
+            self.stop_risk_monitor()
+            return
+        positions = self.position_book.open_lots()
+        if not positions:
+            QMessageBox.information(self, "风险监控", "当前没有持仓，请在持仓页开仓或导入成交明细。")
+            return
+
+        if self.risk_feed_combo.currentText() == "回放行情文件":
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "选择行情文件（时间,合约,价格）", "", "CSV Files (*.csv);;All Files (*)"
+            )
+            if not file_path:
+                return
+            feed = ReplayFeed(file_path, speed=1.0, max_gap=self.REPLAY_MAX_GAP)
+        else:
+            # 从各合约最近的开仓价开始随机游走
+            feed = SimulatedFeed({lot[0]: lot[3] for lot in positions},
+                                 interval=self.SIMULATED_TICK_INTERVAL)
+        try:
+            self.risk_monitor = RiskMonitor(self.capital_manager.balance, positions, self.contracts,
+                                            self.statement_multipliers)
+        except ValueError as e:
+            QMessageBox.warning(self, "风险监控", str(e))
+            return
+        
+        self.risk_worker = TickFeedWorker(self.risk_monitor, feed, self)
+        self.risk_worker.warning_crossed.connect(self.on_risk_warning)
+        self.risk_worker.finished.connect(self.on_risk_feed_finished)
+        self.risk_worker.start()
+        self._risk_drawn = None
+        self.risk_frame_timer.start()
+        self.risk_button.setText("⏹ 停止监控")
+        # 开始时已超过预警线的情况
+        if self.risk_monitor.in_warning:
+            self.on_risk_warning(self.risk_monitor.snapshot[5], "")
+    
+    def update_risk_monitor(self):
+        """监控运行中持仓或总资金变化后立即计入，不必重新开始监控"""
+        monitor = self.risk_monitor
+        if monitor is None:
+            return
+        monitor.set_balance(self.capital_manager.balance)
+        try:
+            monitor.reset(self.position_book.open_lots())
+        except ValueError as e:
+            QMessageBox.warning(self, "风险监控", f"{e}，已停止监控")
+            self.stop_risk_monitor()
+            return
+        self._risk_drawn = None
+        self.refresh_risk_view()
+    
+    def stop_risk_monitor(self):
+        if self.risk_worker is None:
+            return
+        self.risk_worker.stop()
+        self.risk_worker.wait()
+    
+    def on_risk_feed_finished(self):
+        worker, self.risk_worker = self.risk_worker, None
+        self.risk_frame_timer.stop()
+        self.refresh_risk_view()
+        self.risk_monitor = None
+        self.risk_button.setText("📡 开始监控")
+        if worker is not None and worker.error:
+            QMessageBox.critical(self, "风险监控", f"行情源出错: {worker.error}")
+    
+    def on_risk_warning(self, ratio, moment):
+        # 越过预警线的那一跳即提示，不等下一帧
+        message = f"请注意风险：保证金占用{ratio:.1f}%！" if ratio != float('inf') else "请注意风险：权益已为负！"
+        self.risk_label.setText(message)
+        self.risk_label.setStyleSheet("color: red; font-weight: bold; font-size: 14px;")
+        self.statusBar().showMessage(f"{moment} {message}".strip(), 5000)
+    
+    def refresh_risk_view(self):
+        """帧定时器回调：只有行情更新过时才重绘保证金相关的几个标签"""
+        monitor = self.risk_monitor
+        if monitor is None:
+            return
+        snapshot = monitor.snapshot
+        if snapshot is self._risk_drawn:
+            return
+        self._risk_drawn = snapshot
+        moment, margin, floating_profit, equity, available, ratio = snapshot
+        self.margin_label.setText(f"保证金占用: {margin:.2f} 元")
+        self.ratio_label.setText(f"保证金比例: {ratio:.1f}%" if equity > 0 else "保证金比例: 权益已为负")
+        self.available_label.setText(f"可用资金: {available:.2f} 元")
+        self.risk_status_label.setText(
+            f"{moment} 浮动盈亏 {floating_profit:.2f} 元，权益 {equity:.2f} 元，已处理 {monitor.tick_count} 跳"
+        )
+        if ratio < WARNING_RATIO:
+            self.risk_label.setText("")
+    
+    def save_data(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "保存数据", "", "CSV Files (*.csv);;快照文件 (*.snap);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            with profiler.span("save_data"):
+                if file_path.lower().endswith(SNAPSHOT_SUFFIX):
+                    write_snapshot(file_path, self.capital_manager, self.trade_recorder)
+                else:
+                    # 确保文件扩展名正确
+                    if not file_path.lower().endswith('.csv'):
+                        file_path += '.csv'
+                    write_csv(file_path, self.capital_manager, self.trade_recorder)
+            
+            self.statusBar().showMessage(f"数据已成功保存到: {file_path}", 7000)
+            QMessageBox.information(self, "保存成功", f"数据已成功保存到:\n{file_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "保存失败", f"保存数据时出错: {str(e)}")
+    
+    def load_data(self):
+        if self.load_worker is not None:
+            QMessageBox.warning(self, "正在加载", "请等待当前数据加载完成")
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "加载数据", "", "CSV Files (*.csv);;快照文件 (*.snap);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        # 加载文件会替换内存中的数据，与已打开的账户脱离
+        self.close_account()
+        if file_path.lower().endswith(SNAPSHOT_SUFFIX):
+            self.load_snapshot(file_path)
+            return
+        
+        self.trade_recorder = TradeRecorder()
+        self.capital_manager = CapitalManager(self.trade_recorder)
+        self.refresh.mark("trades")
+        self.start_load_worker(file_path)
+    
+    def merge_data(self):
+        """把文件中账户里还没有的资金和交易记录追加进来，重复记录按内容哈希跳过"""
+        if self.load_worker is not None:
+            QMessageBox.warning(self, "正在加载", "请等待当前数据加载完成")
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "合并数据", "",
+            "账户文件 (*.csv *.snap *.db *.ledger);;CSV Files (*.csv);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        self.load_merge = {'capital': {}, 'trades': {}, 'added': 0, 'skipped': 0, 'open_lots': []}
+        if file_path.lower().endswith(SNAPSHOT_SUFFIX) or is_store_path(file_path):
+            try:
+                with profiler.span("merge_data.load"):
+                    capital_manager, trade_recorder = load_account(file_path)
+                self.on_load_batch(capital_manager.transactions, trade_recorder.trades)
+                self.load_merge['open_lots'] = capital_manager.open_lots
+            except Exception as e:
+                self.load_merge = None
+                QMessageBox.critical(self, "合并失败", f"合并数据时出错: {str(e)}")
+                return
+            self.finish_load(file_path)
+            return
+        self.start_load_worker(file_path)
+    
+    def start_load_worker(self, file_path):
+        # 后台分块解析，每批数据到达后立即显示
+        self.load_worker = CsvLoadWorker(file_path, self)
+        self.load_worker.batch_ready.connect(self.on_load_batch)
+        self.load_worker.finished.connect(self.on_load_finished)
+        
+        self.load_progress = QProgressDialog("正在加载数据...", "取消", 0, 100, self)
+        self.load_progress.setWindowTitle("加载数据")
+        self.load_progress.setMinimumDuration(300)
+        self.load_progress.canceled.connect(self.load_worker.requestInterruption)
+        self.load_worker.progress.connect(self.load_progress.setValue)
+        
+        self.load_worker.start()
+    
+    @timed("load_data.batch")
+    def on_load_batch(self, capital_rows, trades):
+        merge = self.load_merge
+        if merge is not None:
+            received = len(capital_rows) + len(trades)
+            capital_rows = self.capital_manager.unseen(capital_rows, merge['capital'])
+            trades = self.trade_recorder.unseen(trades, merge['trades'])
+            merge['added'] += len(capital_rows) + len(trades)
+            merge['skipped'] += received - len(capital_rows) - len(trades)
+        self.capital_manager.restore_transactions(capital_rows)
+        self.trade_recorder.add_trades(trades)
+        if merge is not None and self.account_store is not None:
+            self.account_store.add_capital(capital_rows)
+            self.account_store.add_trades(trades)
+        # 同一轮事件循环中到达的多批只通知一次表格
+        self.refresh.mark("trades")
+        profiler.count("load_data.rows", len(capital_rows) + len(trades))
+    
+    def on_load_finished(self):
+        worker = self.load_worker
+        self.load_worker = None
+        cancelled = worker.isInterruptionRequested()
+        self.load_progress.close()
+        worker.deleteLater()
+        
+        if worker.error is not None:
+            self.load_merge = None
+            QMessageBox.critical(self, "加载失败", f"加载数据时出错: {worker.error}")
+            return
+        if self.load_merge is not None:
+            self.load_merge['open_lots'] = worker.open_lots
+        else:
+            self.capital_manager.open_lots = worker.open_lots
+        self.finish_load(worker.file_path, cancelled)
+    
+    def load_snapshot(self, file_path):
+        try:
+            with profiler.span("load_data.snapshot"):
+                self.capital_manager, self.trade_recorder = read_snapshot(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "加载失败", f"加载数据时出错: {str(e)}")
+            return
+        self.finish_load(file_path)
+    
+    @timed("load_data.finish")
+    def finish_load(self, file_path, cancelled=False):
+        self.mark_trades_changed()
+        self.mark_capital_changed()
+        
+        merge, self.load_merge = self.load_merge, None
+        if merge is not None:
+            # 文件中的持仓并入持仓簿，已有的开仓跳过
+            merged = self.merge_positions(merge['open_lots'])
+            merge['added'] += merged
+            merge['skipped'] += len(merge['open_lots']) - merged
+            state = "已取消" if cancelled else "已完成"
+            self.statusBar().showMessage(f"{state}合并 {file_path}", 7000)
+            QMessageBox.information(
+                self, "合并完成",
+                f"{state}合并：新增 {merge['added']} 条记录，跳过重复 {merge['skipped']} 条"
+            )
+            return
+        
+        self.restore_positions()
+        count = len(self.trade_recorder.trades)
+        if cancelled:
+            self.statusBar().showMessage(f"已取消加载 {file_path}，已载入 {count} 条交易记录", 7000)
+            return
+        self.remember_account(file_path)
+        self.statusBar().showMessage(f"成功从 {file_path} 加载数据", 7000)
+        QMessageBox.information(self, "加载成功", f"已成功加载 {count} 条交易记录")
+    
+    @pyqtSlot()
+    @timed("import_statement")
+    def import_statement(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "导入成交明细", "", "成交明细 (*.csv *.txt);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        lots = self.position_book.open_lots()
+        try:
+            fills = parse_statement(file_path)
+            if not self.ask_multipliers(fills['instrument']):
+                return
+            # 累计的成交明细可重复导入，账户中已有体现的成交跳过；其余与持仓簿中的持仓一起配对
+            remaining = unapplied_fills(fills, self.trade_recorder, lots, self.statement_multipliers)
+            result = pair_fills(remaining, self.statement_multipliers, lots)
+        except Exception as e:
+            QMessageBox.critical(self, "导入失败", f"导入成交明细时出错: {str(e)}")
+            return
+        result.fill_count = len(fills['date'])
+        result.duplicates = result.fill_count - len(remaining['date'])
+        
+        # 整批写入账户（一个事务），界面只刷新一次
+        trades = result.trades
+        self.trade_recorder.add_trades(trades)
+        if self.account_store is not None:
+            self.account_store.add_trades(trades)
+        self.mark_trades_changed()
+        
+        # 持仓簿整体替换为配对后的持仓
+        if result.open_lots != lots:
+            self.position_book = PositionBook(multipliers=self.statement_multipliers)
+            self.position_book.restore_lots(result.open_lots)
+            self.save_positions()
+            self.refresh.mark("positions")
+        
+        message = f"读取 {result.fill_count} 笔成交，新增 {len(trades)} 条交易记录"
+        if result.duplicates:
+            message += f"，跳过账户中已有的 {result.duplicates} 笔成交"
+        if result.open_lots:
+            message += f"\n持仓页现有 {sum(lot[4] for lot in result.open_lots)} 手持仓"
+        if result.unmatched:
+            message += f"\n{sum(lot[2] for lot in result.unmatched)} 手平仓找不到对应开仓，已跳过"
+        self.statusBar().showMessage(f"已导入成交明细: {file_path}", 7000)
+        QMessageBox.information(self, "导入成功", message)
+    
+    def merge_positions(self, lots):
+        """把持仓簿中还没有的开仓并入并记入账户，返回并入的笔数"""
+        added = unseen_lots(self.position_book.open_lots(), lots)
+        if not added or not self.ask_multipliers(lot[0] for lot in added):
+            return 0
+        for name, side, open_date, open_price, count, fee in added:
+            self.position_book.open(open_date, name, side, open_price, count, fee)
+        self.save_positions()
+        self.refresh.mark("positions")
+        return len(added)
+    
+    @pyqtSlot()
+    @timed("recompute_profits")
+    def recompute_profits(self):
+        try:
+            bounds = []
+            for line_edit in (self.recompute_start_input, self.recompute_end_input):
+                text = line_edit.text().strip()
+                bounds.append(datetime.strptime(text, "%Y-%m-%d").toordinal() if text else None)
+            scale = 1.0
+            old_text = self.recompute_old_multiplier.text().strip()
+            new_text = self.recompute_new_multiplier.text().strip()
+            if old_text or new_text:
+                old_multiplier, new_multiplier = float(old_text), float(new_text)
+                if old_multiplier <= 0 or new_multiplier <= 0:
+                    raise ValueError("合约乘数必须大于 0")
+                scale = new_multiplier / old_multiplier
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "日期格式应为 YYYY-MM-DD，原乘数和新乘数须同时填写正数")
+            return
+        
+        product = self.recompute_product_input.text().strip() or None
+        rows = self.trade_recorder.select_rows(product, *bounds)
+        if not rows:
+            QMessageBox.information(self, "批量重算", "没有符合条件的交易记录")
+            return
+        registry = self.contracts if self.recompute_fees_checkbox.isChecked() else None
+        reply = QMessageBox.question(
+            self, "批量重算", f"将重算 {len(rows)} 条交易记录的盈亏，是否继续？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        try:
+            changed = self.trade_recorder.recompute_profits(rows, scale, registry)
+            if changed and self.account_store is not None:
+                trades = self.trade_recorder.trades
+                self.account_store.update_trades(changed, [trades[row] for row in changed])
+        except Exception as e:
+            QMessageBox.critical(self, "重算失败", f"批量重算时出错: {str(e)}")
+            return
+        
+        # 所有聚合已在 recompute_profits 中统一重建，界面各处只刷新一次
+        self.trade_model.reset_rows()
+        self.mark_trades_changed()
+        self.statusBar().showMessage(f"已重算 {len(rows)} 条交易记录，其中 {len(changed)} 条有变化", 7000)
+    
+    def open_account(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "打开或新建账户", "", "SQLite 账户 (*.db);;日志账户 (*.ledger);;All Files (*)",
+            options=QFileDialog.Option.DontConfirmOverwrite
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            store = open_store(file_path)
+            if store.is_empty():
+                # 新账户：把当前内存中的数据导入进去
+                store.save_from(self.capital_manager, self.trade_recorder)
+            else:
+                trade_recorder = TradeRecorder()
+                capital_manager = CapitalManager(trade_recorder)
+                store.load_into(capital_manager, trade_recorder)
+                self.capital_manager = capital_manager
+                self.trade_recorder = trade_recorder
+        except Exception as e:
+            QMessageBox.critical(self, "打开失败", f"打开账户时出错: {str(e)}")
+            return
+        
+        self.close_account()
+        self.account_store = store
+        self.restore_positions()
+        self.remember_account(file_path)
+        self.mark_trades_changed()
+        self.mark_capital_changed()
+        self.statusBar().showMessage(f"已打开账户: {file_path}，共 {len(self.trade_recorder.trades)} 条交易记录", 7000)
+    
+    def remember_account(self, file_path):
+        self.settings.setValue(self.LAST_ACCOUNT_KEY, file_path)
+    
+    def restore_last_account(self):
+        """启动后在后台打开上次使用的账户或数据文件，窗口先显示出来，读完后再填充"""
+        file_path = self.settings.value(self.LAST_ACCOUNT_KEY, "", type=str)
+        if not file_path or not os.path.exists(file_path) or self.restore_worker is not None:
+            return
+        self._restore_base = self.trade_recorder
+        self.restore_worker = AccountOpenWorker(file_path, self)
+        self.restore_worker.finished.connect(self.on_restore_finished)
+        self.statusBar().showMessage(f"正在打开上次的账户: {file_path}")
+        self.restore_worker.start()
+    
+    def on_restore_finished(self):
+        worker, self.restore_worker = self.restore_worker, None
+        base, self._restore_base = self._restore_base, None
+        if worker is None:
+            return
+        worker.deleteLater()
+        if worker.error is not None:
+            self.statusBar().showMessage(f"打开上次的账户失败: {worker.error}", 7000)
+            return
+        # 打开期间已经录入、加载或打开了别的数据时不覆盖
+        if (self.trade_recorder is not base or self.trade_recorder.trades or self.capital_manager.transactions
+                or self.account_store is not None or self.load_worker is not None):
+            if worker.store is not None:
+                worker.store.close()
+            self.statusBar().showMessage(f"已有数据，未打开上次的账户: {worker.file_path}", 7000)
+            return
+        self.capital_manager = worker.capital_manager
+        self.trade_recorder = worker.trade_recorder
+        self.account_store = worker.store
+        self.restore_positions()
+        self.mark_trades_changed()
+        self.mark_capital_changed()
+        self.statusBar().showMessage(
+            f"已打开上次的账户: {worker.file_path}，共 {len(self.trade_recorder.trades)} 条交易记录", 7000
+        )
+    
+    def close_account(self):
+        if self.account_store is not None:
+            self.account_store.close()
+            self.account_store = None
+    
+    def closeEvent(self, event):
+        self.stop_risk_monitor()
+        if self.load_worker is not None:
+            # 加载到一半的数据不再显示，线程退出之前不能销毁
+            worker, self.load_worker = self.load_worker, None
+            worker.batch_ready.disconnect()
+            worker.finished.disconnect()
+            worker.requestInterruption()
+            worker.wait()
+            self.load_progress.close()
+            self.load_merge = None
+        if self.restore_worker is not None:
+            # 读到一半的账户不再使用，等后台线程结束后关闭
+            worker, self.restore_worker = self.restore_worker, None
+            worker.wait()
+            if worker.store is not None:
+                worker.store.close()
+        self.close_account()
+        super().closeEvent(event)
+    
+    @timed("apply_history_filter")
+    def apply_history_filter(self, *_):
+        self.history_filter_timer.stop()
+        bounds = []
+        invalid = False
+        for line_edit in (self.history_start_filter, self.history_end_filter):
+            text = line_edit.text().strip()
+            try:
+                bounds.append(datetime.strptime(text, "%Y-%m-%d").toordinal() if text else None)
+            except ValueError:
+                # 日期未输完整时先忽略该条件
+                bounds.append(None)
+                invalid = True
+        sign = {"盈利": 1, "亏损": -1}.get(self.history_sign_filter.currentText(), 0)
+        self.history_model.set_filter(self.history_name_filter.text().strip(), bounds[0], bounds[1], sign)
+        
+        text = f"{self.history_model.rowCount()} / {len(self.trade_recorder.trades)} 条"
+        if invalid:
+            text += "（日期格式应为 YYYY-MM-DD）"
+        self.history_filter_label.setText(text)
+    
+    @timed("update_calendar")
+    def update_calendar(self, *_):
+        """更新日历中每日盈利的显示，只处理当前显示的月份"""
+        # 清除所有格式（只有上次显示月份的少量日期带格式）
+        self.calendar.setDateTextFormat(QDate(), self.calendar_empty_format)
+        
+        month_profits = self.trade_recorder.get_month_profits(
+            self.calendar.yearShown(), self.calendar.monthShown()
+        )
+        for ordinal, profit in month_profits:
+            day = date.fromordinal(ordinal)
+            fmt = self.calendar_profit_format if profit >= 0 else self.calendar_loss_format
+            self.calendar.setDateTextFormat(QDate(day.year, day.month, day.day), fmt)
+    
+    def on_tab_changed(self, index):
+        page = self.tabs.widget(index)
+        for attr, *_ in self.TABS:
+            if getattr(self, attr) is page:
+                self.ensure_tab(attr)
+        if page is self.summary_tab:
+            self.update_summary_views()
+    
+    def update_summary_views(self):
+        # 汇总页不可见时不重绘，切换过去时再刷新
+        if self.tabs.currentWidget() is not self.summary_tab:
+            return
+        self.update_summary_table()
+        self.update_leaderboard()
+        self.update_performance_view()
+    
+    @timed("update_performance_view")
+    def update_performance_view(self):
+        """权益曲线和绩效指标均已随交易增量维护，这里只做显示"""
+        stats = self.trade_recorder.performance
+        self.equity_curve.set_curve(stats.equity)
+        profit_factor = "∞" if stats.profit_factor == float('inf') else f"{stats.profit_factor:.2f}"
+        self.performance_label.setText(
+            f"累计盈亏: {stats.total_profit:.2f} 元\n"
+            f"交易笔数: {stats.count}  胜率: {stats.win_rate:.1f}%\n"
+            f"平均盈利: {stats.average_win:.2f} 元\n"
+            f"平均亏损: {stats.average_loss:.2f} 元\n"
+            f"盈亏比(总盈利/总亏损): {profit_factor}\n"
+            f"单笔盈亏标准差: {stats.std:.2f} 元\n"
+            f"最大回撤: {stats.max_drawdown:.2f} 元\n"
+            f"当前回撤: {stats.current_drawdown:.2f} 元\n"
+            f"年化夏普(按日): {stats.sharpe:.2f}"
+        )
+    
+    @timed("update_leaderboard")
+    def update_leaderboard(self, *_):
+        by_product = self.leaderboard_combo.currentText() == "按品种"
+        rows = self.trade_recorder.leaderboard(by_product)
+        self.leaderboard_table.setRowCount(len(rows))
+        for row, (name, stats) in enumerate(rows):
+            self.leaderboard_table.setItem(row, 0, QTableWidgetItem(name))
+            self.leaderboard_table.setItem(row, 1, QTableWidgetItem(str(stats.count)))
+            self.leaderboard_table.setItem(row, 2, QTableWidgetItem(str(stats.wins)))
+            self.leaderboard_table.setItem(row, 3, QTableWidgetItem(f"{stats.win_rate:.1f}%"))
+            self.leaderboard_table.setItem(row, 4, QTableWidgetItem(f"{stats.fees:.2f}"))
+            
+            profit_item = QTableWidgetItem(f"{stats.profit:.2f}")
+            if stats.profit >= 0:
+                profit_item.setForeground(QColor(Qt.GlobalColor.darkGreen))
+            else:
+                profit_item.setForeground(QColor(Qt.GlobalColor.red))
+            self.leaderboard_table.setItem(row, 5, profit_item)
+    
+    @timed("update_summary_table")
+    def update_summary_table(self, *_):
+        """按所选周期汇总盈亏，每个区间由日期累计和直接查询"""
+        bounds = self.trade_recorder.date_bounds()
+        try:
+            start_text = self.summary_start_input.text().strip()
+            end_text = self.summary_end_input.text().strip()
+            start = datetime.strptime(start_text, "%Y-%m-%d").toordinal() if start_text else None
+            end = datetime.strptime(end_text, "%Y-%m-%d").toordinal() if end_text else None
+        except ValueError:
+            QMessageBox.warning(self, "日期格式错误", "请使用 YYYY-MM-DD 格式")
+            return
+        
+        if bounds is None:
+            self.summary_table.setRowCount(0)
+            self.summary_total_label.setText("暂无交易记录")
+            return
+        start = bounds[0] if start is None else start
+        end = bounds[1] if end is None else end
+        
+        period = self.SUMMARY_PERIODS[self.summary_period_combo.currentText()]
+        rows = self.trade_recorder.rollup(period, start, end)
+        self.summary_table.setRowCount(len(rows))
+        for row, (label, totals) in enumerate(rows):
+            count = int(totals['count'])
+            win_rate = totals['wins'] / count * 100 if count else 0.0
+            self.summary_table.setItem(row, 0, QTableWidgetItem(label))
+            self.summary_table.setItem(row, 1, QTableWidgetItem(str(count)))
+            self.summary_table.setItem(row, 2, QTableWidgetItem(str(int(totals['wins']))))
+            self.summary_table.setItem(row, 3, QTableWidgetItem(f"{win_rate:.1f}%"))
+            self.summary_table.setItem(row, 4, QTableWidgetItem(f"{totals['fees']:.2f}"))
+            
+            profit_item = QTableWidgetItem(f"{totals['profit']:.2f}")
+            if totals['profit'] >= 0:
+                profit_item.setForeground(QColor(Qt.GlobalColor.darkGreen))
+            else:
+                profit_item.setForeground(QColor(Qt.GlobalColor.red))
+            self.summary_table.setItem(row, 5, profit_item)
+        
+        totals = self.trade_recorder.range_summary(start, end)
+        self.summary_total_label.setText(
+            f"{date.fromordinal(start)} 至 {date.fromordinal(end)}：共 {int(totals['count'])} 笔，"
+            f"手续费 {totals['fees']:.2f} 元，盈亏 {totals['profit']:.2f} 元"
+        )
+    
+    def on_calendar_date_selected(self):
+        """当选择日历日期时显示该日的盈利"""
+        selected_date = self.calendar.selectedDate()
+        date_str = selected_date.toString("yyyy-MM-dd")
+        daily_profit = self.trade_recorder.calculate_daily_profit(date_str)
+        
+        if daily_profit == 0:
+            self.calendar_profit_label.setText(f"{date_str} 没有交易记录")
+            self.calendar_profit_label.setStyleSheet("background-color: #e0e0e0; padding: 10px; border-radius: 5px;")
+        else:
+            if daily_profit >= 0:
+                color = "#4CAF50"
+                text_color = "white"
+                result = "盈利"
+            else:
+                color = "#F44336"
+                text_color = "white"
+                result = "亏损"
+            
+            self.calendar_profit_label.setText(
+                f"{date_str} {result} {abs(daily_profit):.2f} 元\n"
+                f"日终总资金 {self.capital_manager.balance_at(date_str):.2f} 元"
+            )
+            self.calendar_profit_label.setStyleSheet(
+                f"background-color: {color}; color: {text_color}; "
+                "padding: 10px; border-radius: 5px; font-weight: bold;"
+            )
+
+def startup_report(started=_IMPORT_STARTED):
+    """--profile-startup 的输出：启动以来记录的各阶段（开始时刻相对导入本模块），按开始时间排列"""
+    lines = [f"{'开始(ms)':>9}{'耗时(ms)':>10}  阶段"]
+    for name, start, duration, _ in sorted(profiler.events, key=lambda event: event[1]):
+        lines.append(f"{(start - started) * 1000:9.1f}{duration * 1000:10.1f}  {name}")
+    lines.append(f"startup.total {(time.perf_counter() - started) * 1000:.1f} ms")
+    return "\n".join(lines)
+
+def _write_startup_report(target, text):
+    # 无控制台的打包程序没有 stderr，此时只能写到文件
+    if target != "-":
+        with open(target, 'a', encoding='utf-8') as file:
+            file.write(text + "\n")
+    elif sys.stderr is not None:
+        print(text, file=sys.stderr, flush=True)
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    parser = argparse.ArgumentParser(prog="期货记账软件", add_help=False)
+    parser.add_argument("--profile-startup", nargs="?", const="-", metavar="文件",
+                        help="第一轮事件循环后输出启动各阶段耗时，默认写到 stderr")
+    options, qt_args = parser.parse_known_args(argv[1:])
+    if options.profile_startup:
+        profiler.enabled = True
+        profiler.record("startup.import", _IMPORT_STARTED, time.perf_counter() - _IMPORT_STARTED)
+    
+    with profiler.span("startup.application"):
+        app = QApplication(argv[:1] + qt_args)
+        # 设置应用样式
+        app.setStyle("Fusion")
+        
+        # 设置全局字体
+        font = QFont("Microsoft YaHei UI", 10)
+        app.setFont(font)
+    
+    with profiler.span("startup.window"):
+        window = FuturesAccountingApp()
+    with profiler.span("startup.show"):
+        window.show()
+    # 窗口显示之后再打开上次的账户
+    QTimer.singleShot(0, window.restore_last_account)
+    if options.profile_startup:
+        def report():
+            _write_startup_report(options.profile_startup, startup_report())
+            worker = window.restore_worker
+            if worker is not None:
+                # 后台打开账户不阻塞第一帧，读完后补一行
+                worker.finished.connect(lambda: _write_startup_report(
+                    options.profile_startup,
+                    f"startup.restore {profiler.durations['startup.restore'][-1] * 1000:.1f} ms（后台）"
+                ))
+        QTimer.singleShot(0, report)
+    return app.exec()